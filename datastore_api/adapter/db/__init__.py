@@ -1,14 +1,23 @@
-from typing import Protocol
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Protocol, TypeVar
 
 from datastore_api.adapter.db.models import (
+    Changes,
     Datastore,
     Job,
+    JobEvent,
+    JobLogEntry,
     JobStatus,
     MaintenanceStatus,
     Operation,
     Target,
 )
 from datastore_api.adapter.db.sqlite import SqliteDbClient
+from datastore_api.common.exceptions import JobExistsException
 from datastore_api.config import environment
 
 
@@ -21,11 +30,41 @@ class DatabaseClient(Protocol):
         status: JobStatus | None,
         operations: list[Operation] | None,
         ignore_completed: bool = False,
+        limit: int | None = None,
+        after_job_id: str | None = None,
+        newest_first: bool = False,
+        include_logs: bool = False,
+        include_bump_manifestos: bool = False,
     ) -> list[Job]: ...
     def get_jobs_for_target(
-        self, *, name: str, datastore_id: int
+        self,
+        *,
+        name: str,
+        datastore_id: int,
+        limit: int | None = None,
+        after_job_id: str | None = None,
+        newest_first: bool = False,
+        include_logs: bool = False,
+        include_bump_manifestos: bool = False,
     ) -> list[Job]: ...
+    def get_job_logs(
+        self,
+        job_id: int | str,
+        after_log_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobLogEntry]: ...
+    def get_job_events(
+        self,
+        after_event_id: int,
+        datastore_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobEvent]: ...
+    def get_latest_job_event_id(self) -> int: ...
+    def get_changes(self, after_change_seq: int, limit: int) -> Changes: ...
     def insert_new_job(self, new_job: Job) -> Job: ...
+    def insert_new_jobs(
+        self, new_jobs: list[Job]
+    ) -> list[Job | JobExistsException]: ...
     def update_job(
         self,
         *,
@@ -38,7 +77,18 @@ class DatabaseClient(Protocol):
         self, msg: str, paused: bool
     ) -> MaintenanceStatus: ...
     def get_latest_maintenance_status(self) -> MaintenanceStatus: ...
-    def get_maintenance_history(self) -> list[MaintenanceStatus]: ...
+    def get_maintenance_history(
+        self,
+        limit: int | None = None,
+        before_maintenance_id: str | None = None,
+    ) -> list[MaintenanceStatus]: ...
+    def claim_jobs(
+        self,
+        limit: int,
+        operations: list[Operation] | None = None,
+    ) -> list[Job]: ...
+    def archive_jobs(self, created_before: datetime, limit: int) -> int: ...
+    def compact(self) -> None: ...
     def initialize_maintenance(self) -> MaintenanceStatus: ...
     def get_targets(self, datastore_id: int) -> list[Target]: ...
     def update_target(self, job: Job) -> None: ...
@@ -59,5 +109,98 @@ class DatabaseClient(Protocol):
     def delete_datastore(self, datastore_id: int) -> None: ...
 
 
+T = TypeVar("T")
+
+
+class AsyncDatabaseClient(Protocol):
+    async def get_datastores(self) -> list[Datastore]: ...
+    async def get_datastore(self, datastore_id: int) -> Datastore: ...
+    async def delete_datastore(self, datastore_id: int) -> None: ...
+    async def claim_jobs(
+        self,
+        limit: int,
+        operations: list[Operation] | None = None,
+    ) -> list[Job]: ...
+    async def get_job_events(
+        self,
+        after_event_id: int,
+        datastore_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobEvent]: ...
+    async def get_latest_job_event_id(self) -> int: ...
+    async def run(self, function: Callable[[DatabaseClient], T]) -> T: ...
+
+
+# Blocking database calls from async route handlers run here, and not in
+# the event loop, nor in the thread pool shared with the sync handlers
+_database_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="database"
+)
+
+
+class ExecutorDatabaseClient:
+    """
+    Awaitable access to a blocking DatabaseClient, for async route handlers.
+    Calls run in a dedicated thread pool, so a slow query never blocks the
+    event loop of the worker.
+    """
+
+    def __init__(self, database_client: DatabaseClient) -> None:
+        self._database_client = database_client
+
+    async def _call(self, function: Callable[..., T], *args: object) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            _database_executor, partial(function, *args)
+        )
+
+    async def get_datastores(self) -> list[Datastore]:
+        return await self._call(self._database_client.get_datastores)
+
+    async def get_datastore(self, datastore_id: int) -> Datastore:
+        return await self._call(
+            self._database_client.get_datastore, datastore_id
+        )
+
+    async def delete_datastore(self, datastore_id: int) -> None:
+        return await self._call(
+            self._database_client.delete_datastore, datastore_id
+        )
+
+    async def claim_jobs(
+        self,
+        limit: int,
+        operations: list[Operation] | None = None,
+    ) -> list[Job]:
+        return await self._call(
+            self._database_client.claim_jobs, limit, operations
+        )
+
+    async def get_job_events(
+        self,
+        after_event_id: int,
+        datastore_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobEvent]:
+        return await self._call(
+            self._database_client.get_job_events,
+            after_event_id,
+            datastore_id,
+            limit,
+        )
+
+    async def get_latest_job_event_id(self) -> int:
+        return await self._call(self._database_client.get_latest_job_event_id)
+
+    async def run(self, function: Callable[[DatabaseClient], T]) -> T:
+        """
+        Runs function with the blocking client in the thread pool, for
+        operations made up of several database calls.
+        """
+        return await self._call(function, self._database_client)
+
+
+_database_client = SqliteDbClient(environment.sqlite_url)
+
+
 def get_database_client() -> DatabaseClient:
-    return SqliteDbClient(environment.sqlite_url)
+    return _database_client
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import StrEnum
 
-from pydantic import field_serializer, model_validator
+from pydantic import Field, field_serializer, model_validator
 
 from datastore_api.common.models import CamelModel
 
@@ -75,9 +75,9 @@ class JobParameters(CamelModel, use_enum_values=True):
     @model_validator(mode="after")
     def validate_job_type(self: "JobParameters") -> "JobParameters":
         operation: Operation = self.operation
+        # The bump manifesto is left out of job listings, so is not required
         if operation == Operation.BUMP and (
-            self.bump_manifesto is None
-            or self.description is None
+            self.description is None
             or self.bump_from_version is None
             or self.bump_to_version is None
             or self.target != "DATASTORE"
@@ -101,6 +101,24 @@ class Log(CamelModel, extra="forbid"):
         return at.isoformat()
 
 
+class JobLogEntry(Log):
+    log_id: int
+
+
+STATUS_LOG_PREFIX = "Set status: "
+
+
+class JobEvent(JobLogEntry, use_enum_values=True):
+    """
+    A job log entry together with the job it belongs to. The status is
+    set when the entry records a status transition of the job.
+    """
+
+    job_id: str
+    datastore_rdn: str
+    status: JobStatus | None = None
+
+
 class Job(CamelModel, use_enum_values=True):
     job_id: str | int
     status: JobStatus
@@ -140,6 +158,8 @@ class MaintenanceStatus(CamelModel):
     paused: bool
     msg: str
     timestamp: str
+    # Only used as the cursor of the history pages, not part of the response
+    maintenance_id: int | None = Field(default=None, exclude=True)
 
 
 class Datastore(CamelModel):
@@ -149,3 +169,18 @@ class Datastore(CamelModel):
     directory: str
     name: str
     bump_enabled: bool
+
+
+class Changes(CamelModel):
+    """
+    The jobs, job log entries and targets changed after a change cursor,
+    the ids of the jobs archived, along with their logs, since then, and
+    the cursor to pass to get the changes after these.
+    """
+
+    jobs: list[Job] = []
+    job_logs: list[JobEvent] = []
+    targets: list[Target] = []
+    archived_job_ids: list[str] = []
+    cursor: int
+    has_more: bool
@@ -1,12 +1,21 @@
 import json
 import logging
+import os
 import sqlite3
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
 from datastore_api.adapter.db.models import (
+    STATUS_LOG_PREFIX,
+    Changes,
     Datastore,
     Job,
+    JobEvent,
+    JobLogEntry,
     JobParameters,
     JobStatus,
     Log,
@@ -15,12 +24,17 @@ from datastore_api.adapter.db.models import (
     Target,
     UserInfo,
 )
+from datastore_api.adapter.db.write_queue import WriteQueue
+from datastore_api.adapter.local_storage.generation_counter import (
+    database_generations,
+)
 from datastore_api.common.exceptions import (
     DatastoreNotFoundException,
     JobAlreadyCompleteException,
     JobExistsException,
     NotFoundException,
 )
+from datastore_api.config import environment
 
 logger = logging.getLogger()
 
@@ -29,29 +43,254 @@ sqlite3.register_converter(
     "timestamp", lambda s: datetime.fromisoformat(s.decode())
 )
 
+DATASTORE_REGISTRY_KEY = "datastore_registry"
+MAINTENANCE_STATUS_KEY = "maintenance_status"
+
+UPSERT_TARGET_SQL = """
+    INSERT INTO target (
+        name,
+        datastore_id,
+        status,
+        last_updated_at,
+        last_updated_by,
+        action,
+        change_seq
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(name, datastore_id) DO UPDATE SET
+        status = excluded.status,
+        last_updated_at = excluded.last_updated_at,
+        last_updated_by = excluded.last_updated_by,
+        action = excluded.action,
+        change_seq = excluded.change_seq
+"""
+
+# The log of a job as a json array, built by a correlated subquery
+LOGS_JSON_COLUMN = """
+    COALESCE((
+        SELECT json_group_array(
+            json_object(
+                'at', job_log_row.at,
+                'message', job_log_row.msg
+            )
+        )
+        FROM (
+            SELECT at, msg
+            FROM job_log
+            WHERE job_log.job_id = j.job_id
+            ORDER BY at ASC
+        ) AS job_log_row
+    ), '[]')
+"""
+ARCHIVED_LOGS_JSON_COLUMN = """
+    COALESCE((
+        SELECT json_group_array(
+            json_object(
+                'at', job_log_row.at,
+                'message', job_log_row.msg
+            )
+        )
+        FROM (
+            SELECT at, msg
+            FROM job_log_archive
+            WHERE job_log_archive.job_id = j.job_id
+            ORDER BY at ASC
+        ) AS job_log_row
+    ), '[]')
+"""
+
+# Compaction rewrites the database file once this share of it is unused
+VACUUM_FREE_PAGE_RATIO = 0.25
+
+_JOB_LIST_ADAPTER = TypeAdapter(list[Job])
+
+
+def enable_wal_journal(db_path: Path) -> None:
+    """
+    Switches the database to write-ahead logging, which lets readers run
+    while a write transaction is in progress. The journal mode is stored
+    in the database file, so this only needs to run once at startup.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if journal_mode != "wal":
+            logger.warning(
+                f"Could not enable WAL for {db_path}: {journal_mode}"
+            )
+    finally:
+        conn.close()
+
+
+def _dump_job_parameters(job: Job) -> str:
+    """
+    Returns the parameters of a job as json, without the bump manifesto,
+    which is stored in a table of its own.
+    """
+    return json.dumps(
+        job.parameters.model_dump(by_alias=True, exclude={"bump_manifesto"})
+    )
+
+
+def _job_json_column(include_logs: bool, include_bump_manifestos: bool) -> str:
+    """
+    Returns a column with the job of each row as json in the shape of Job,
+    for rows of job j joined with datastore d and job_bump_manifesto m.
+    Lists of jobs are built in sqlite and validated from json in a single
+    call, which is several times faster than building them job by job.
+    """
+    parameters = (
+        "json_patch(j.parameters, "
+        "json_object('bumpManifesto', json(m.manifesto)))"
+        if include_bump_manifestos
+        else "json(j.parameters)"
+    )
+    return f"""
+        json_object(
+            'jobId', CAST(j.job_id AS TEXT),
+            'status', j.status,
+            'parameters', {parameters},
+            'createdAt', replace(j.created_at, ' ', 'T'),
+            'createdBy', json(j.created_by),
+            'log', json({LOGS_JSON_COLUMN if include_logs else "'[]'"}),
+            'datastoreRdn', d.rdn
+        )
+    """
+
+
+def _jobs_from_json_rows(job_rows: list[sqlite3.Row]) -> list[Job]:
+    """
+    Returns the jobs of rows selected with _job_json_column. The rows are
+    still fully validated, not built with model_construct: constructing the
+    nested models in Python was measured about twice as slow as validating
+    the whole list from json in pydantic-core, and validation also keeps
+    the enums and datetimes typed as the rest of the code expects.
+    """
+    return _JOB_LIST_ADAPTER.validate_json(
+        "[" + ",".join(job_row["job_json"] for job_row in job_rows) + "]"
+    )
+
+
+def _job_parameters_from_row(job_row: sqlite3.Row) -> dict:
+    """
+    Returns the parameters of a job row, with the bump manifesto selected
+    alongside them, if any, put back in.
+    """
+    parameters = json.loads(job_row["parameters"])
+    if job_row["bump_manifesto"] is not None:
+        parameters["bumpManifesto"] = json.loads(job_row["bump_manifesto"])
+    return parameters
+
+
+def _job_event_from_row(
+    row: sqlite3.Row, id_to_rdn_map: dict[int, str]
+) -> JobEvent:
+    message = row["msg"]
+    return JobEvent(
+        log_id=row["job_log_id"],
+        at=row["at"],
+        message=message,
+        job_id=str(row["job_id"]),
+        datastore_rdn=id_to_rdn_map[row["datastore_id"]],
+        status=message.removeprefix(STATUS_LOG_PREFIX)
+        if message.startswith(STATUS_LOG_PREFIX)
+        else None,
+    )
+
+
+def _maintenance_status_from_row(row: sqlite3.Row) -> MaintenanceStatus:
+    return MaintenanceStatus(
+        maintenance_id=row["maintenance_id"],
+        msg=row["msg"],
+        paused=bool(row["paused"]),
+        timestamp=str(row["timestamp"]),
+    )
+
+
+@dataclass
+class _DatastoreRegistry:
+    generation: int
+    active_by_id: dict[int, Datastore] = field(default_factory=dict)
+    active_by_rdn: dict[str, Datastore] = field(default_factory=dict)
+    # Includes deleted datastores, which old jobs and targets still refer to
+    rdn_by_id: dict[int, str] = field(default_factory=dict)
+
 
 class SqliteDbClient:
+    """
+    Keeps one long-lived connection per thread, so a client can be shared
+    by the whole process. Methods called while another method is running
+    in the same thread, such as datastore lookups, use the same connection
+    and thereby take part in the caller's transaction.
+    All writes go through a single writer thread (see WriteQueue), while
+    reads run on the calling thread and, in WAL mode, never wait for it.
+    Datastores are looked up in a registry cached in memory, which every
+    process reloads when a datastore is inserted or deleted. The latest
+    maintenance status is cached the same way.
+    """
+
     db_path: Path
 
     def __init__(self, db_url: str) -> None:
         self.db_path = Path(db_url.replace("sqlite://", ""))
+        self._local = threading.local()
+        self._writes = WriteQueue(self._conn)
+        self._datastore_registry: _DatastoreRegistry | None = None
+        self._latest_maintenance_status: (
+            tuple[int, MaintenanceStatus] | None
+        ) = None
 
     def _conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(
-            self.db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-            isolation_level=None,
-        )
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
+        """
+        Returns the connection of the calling thread, opening it on first
+        use. A connection inherited from a parent process through fork is
+        never used, as sqlite connections must not cross a fork.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.db_path,
+                detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                isolation_level=None,
+                timeout=environment.sqlite_busy_timeout_ms / 1000,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
         return conn
 
+    def close(self) -> None:
+        """
+        Stops the writer thread and closes the connection of the calling
+        thread, if it has one.
+        """
+        self._writes.stop()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def _next_change_seq(self, cursor: sqlite3.Cursor) -> int:
+        """
+        Returns the next value of the change sequence, which every write
+        stamps on the jobs, job log entries and targets it changes. Writes
+        hold the write lock, so values are committed in increasing order.
+        """
+        return cursor.execute(
+            """
+            UPDATE change_sequence SET seq = seq + 1
+            RETURNING seq
+            """
+        ).fetchone()["seq"]
+
     def _get_job_row_with_logs(
         self, cursor: sqlite3.Cursor, job_id: int | str
     ) -> sqlite3.Row | None:
         job_id = int(job_id)
         job_row = cursor.execute(
-            """
+            f"""
             SELECT
                 j.job_id,
                 j.status,
@@ -59,58 +298,67 @@ class SqliteDbClient:
                 j.created_at,
                 j.created_by,
                 j.datastore_id,
-                COALESCE((
-                    SELECT json_group_array(
-                        json_object(
-                            'at', job_log_row.at,
-                            'message', job_log_row.msg
-                        )
-                    )
-                    FROM (
-                        SELECT at, msg
-                        FROM job_log
-                        WHERE job_log.job_id = j.job_id
-                        ORDER BY at ASC
-                    ) AS job_log_row
-                ), '[]') AS logs_json
+                m.manifesto AS bump_manifesto,
+                {LOGS_JSON_COLUMN} AS logs_json
             FROM job j
+            LEFT JOIN job_bump_manifesto m ON m.job_id = j.job_id
             WHERE j.job_id = ?;
             """,
             (job_id,),
         ).fetchone()
         return job_row
 
+    def _get_archived_job_row_with_logs(
+        self, cursor: sqlite3.Cursor, job_id: int
+    ) -> sqlite3.Row | None:
+        return cursor.execute(
+            f"""
+            SELECT
+                j.job_id,
+                j.status,
+                j.parameters,
+                j.created_at,
+                j.created_by,
+                j.datastore_id,
+                NULL AS bump_manifesto,
+                {ARCHIVED_LOGS_JSON_COLUMN} AS logs_json
+            FROM job_archive j
+            WHERE j.job_id = ?;
+            """,
+            (job_id,),
+        ).fetchone()
+
     def get_job(self, job_id: int | str) -> Job:
         """
-        Returns job with matching job_id from database.
+        Returns job with matching job_id from database, including archived
+        jobs.
         Raises NotFoundException if no such job is found.
         """
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            job_id = int(job_id)
-            job_row = self._get_job_row_with_logs(cursor, job_id)
-            if not job_row:
-                raise NotFoundException(f"No job found for jobId: {job_id}")
+        cursor = conn.cursor()
+        job_id = int(job_id)
+        job_row = self._get_job_row_with_logs(
+            cursor, job_id
+        ) or self._get_archived_job_row_with_logs(cursor, job_id)
+        if not job_row:
+            raise NotFoundException(f"No job found for jobId: {job_id}")
 
-            return Job(
-                job_id=str(job_row["job_id"]),
-                status=job_row["status"],
-                parameters=JobParameters.model_validate(
-                    json.loads(job_row["parameters"])
-                ),
-                created_at=job_row["created_at"].isoformat(),
-                created_by=UserInfo.model_validate(
-                    json.loads(job_row["created_by"])
-                ),
-                log=[
-                    Log(at=row["at"], message=row["message"])
-                    for row in json.loads(job_row["logs_json"])
-                ],
-                datastore_rdn=self.get_datastore(job_row["datastore_id"]).rdn,
-            )
-        finally:
-            conn.close()
+        return Job(
+            job_id=str(job_row["job_id"]),
+            status=job_row["status"],
+            parameters=JobParameters.model_validate(
+                _job_parameters_from_row(job_row)
+            ),
+            created_at=job_row["created_at"].isoformat(),
+            created_by=UserInfo.model_validate(
+                json.loads(job_row["created_by"])
+            ),
+            log=[
+                Log(at=row["at"], message=row["message"])
+                for row in json.loads(job_row["logs_json"])
+            ],
+            datastore_rdn=self.get_datastore(job_row["datastore_id"]).rdn,
+        )
 
     def get_jobs(
         self,
@@ -118,135 +366,312 @@ class SqliteDbClient:
         operations: list[Operation] | None,
         ignore_completed: bool = False,
         datastore_id: int | None = None,
+        limit: int | None = None,
+        after_job_id: str | None = None,
+        newest_first: bool = False,
+        include_logs: bool = False,
+        include_bump_manifestos: bool = False,
     ) -> list[Job]:
         """
-        Returns list of jobs with matching status from database.
+        Returns list of jobs with matching status from database, ordered by
+        job_id, descending if newest_first is set. Returns at most limit
+        jobs, starting after after_job_id in that order.
+        The logs of the jobs are left empty unless include_logs is set, and
+        bump manifestos left out unless include_bump_manifestos is set.
         """
-        where_conditions = []
+        conditions = []
+        parameters: list[str | int] = []
         if datastore_id is not None:
-            where_conditions.append(f"datastore_id = '{datastore_id}'")
+            conditions.append("j.datastore_id = ?")
+            parameters.append(datastore_id)
         if status is not None:
-            where_conditions.append(f"status = '{status}'")
+            conditions.append("j.status = ?")
+            parameters.append(str(status))
         if ignore_completed:
-            where_conditions.append("status NOT IN ('completed', 'failed')")
+            conditions.append("j.status NOT IN ('completed', 'failed')")
         if operations is not None:
-            in_clause = ",".join([f"'{str(op)}'" for op in operations])
-            where_conditions.append(
-                f"json_extract(parameters, '$.operation')  IN ({in_clause})"
+            conditions.append(
+                f"j.operation IN ({','.join('?' for _ in operations)})"
             )
+            parameters.extend(str(operation) for operation in operations)
+        if after_job_id is not None:
+            conditions.append(f"j.job_id {'<' if newest_first else '>'} ?")
+            parameters.append(int(after_job_id))
         where_conditions = (
-            "WHERE " + " AND ".join(where_conditions)
-            if where_conditions
-            else ""
+            "WHERE " + " AND ".join(conditions) if conditions else ""
         )
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            job_rows = cursor.execute(
-                f"""
-                SELECT
-                    j.job_id,
-                    j.status,
-                    j.parameters,
-                    j.created_at,
-                    j.created_by,
-                    j.datastore_id,
-                    COALESCE((
-                        SELECT json_group_array(
-                            json_object(
-                                'at', job_log_row.at,
-                                'message', job_log_row.msg
-                            )
-                        )
-                        FROM (
-                            SELECT at, msg
-                            FROM job_log
-                            WHERE job_log.job_id = j.job_id
-                            ORDER BY at ASC
-                        ) AS job_log_row
-                    ), '[]') AS logs_json
-                FROM job j
-                {where_conditions}
-                """,
-            ).fetchall()
-            if not job_rows:
-                return []
-            id_to_rdn_map = self._get_datastore_id_to_rdn_map()
-            return [
-                Job(
-                    job_id=str(job_row["job_id"]),
-                    status=job_row["status"],
-                    parameters=json.loads(job_row["parameters"]),
-                    created_at=job_row["created_at"].isoformat(),
-                    created_by=json.loads(job_row["created_by"]),
-                    log=[
-                        Log(at=row["at"], message=row["message"])
-                        for row in json.loads(job_row["logs_json"])
-                    ],
-                    datastore_rdn=id_to_rdn_map[job_row["datastore_id"]],
-                )
-                for job_row in job_rows
-            ]
-        finally:
-            conn.close()
+        cursor = conn.cursor()
+        job_rows = cursor.execute(
+            f"""
+            SELECT
+                {_job_json_column(include_logs, include_bump_manifestos)}
+                AS job_json
+            FROM job j
+            LEFT JOIN datastore d ON d.datastore_id = j.datastore_id
+            LEFT JOIN job_bump_manifesto m ON m.job_id = j.job_id
+            {where_conditions}
+            ORDER BY j.job_id {"DESC" if newest_first else "ASC"}
+            LIMIT ?
+            """,
+            (*parameters, limit if limit is not None else -1),
+        ).fetchall()
+        return _jobs_from_json_rows(job_rows)
 
-    def get_jobs_for_target(self, name: str, datastore_id: int) -> list[Job]:
+    def get_jobs_for_target(
+        self,
+        name: str,
+        datastore_id: int,
+        limit: int | None = None,
+        after_job_id: str | None = None,
+        newest_first: bool = False,
+        include_logs: bool = False,
+        include_bump_manifestos: bool = False,
+    ) -> list[Job]:
         """
         Returns list of jobs with matching target name for database.
         Including datastore bump jobs that include the name in
-        datastructureUpdates.
+        datastructureUpdates. Ordered, paginated and with logs and bump
+        manifestos like get_jobs.
         """
+        conditions = ["j.target = ?", "j.datastore_id = ?"]
+        parameters: list[str | int] = [name, datastore_id]
+        if after_job_id is not None:
+            conditions.append(f"j.job_id {'<' if newest_first else '>'} ?")
+            parameters.append(int(after_job_id))
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            job_rows = cursor.execute(
+        cursor = conn.cursor()
+        job_rows = cursor.execute(
+            f"""
+            SELECT
+                {_job_json_column(include_logs, include_bump_manifestos)}
+                AS job_json
+            FROM job j
+            LEFT JOIN datastore d ON d.datastore_id = j.datastore_id
+            LEFT JOIN job_bump_manifesto m ON m.job_id = j.job_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY j.job_id {"DESC" if newest_first else "ASC"}
+            LIMIT ?;
+            """,
+            (*parameters, limit if limit is not None else -1),
+        ).fetchall()
+        return _jobs_from_json_rows(job_rows)
+
+    def get_job_logs(
+        self,
+        job_id: int | str,
+        after_log_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobLogEntry]:
+        """
+        Returns the log entries of a job in the order they were written,
+        at most limit entries starting after after_log_id. The logs of
+        archived jobs are read from the archive.
+        Raises NotFoundException if no such job is found.
+        """
+        cursor = self._conn().cursor()
+        job_id = int(job_id)
+        if cursor.execute(
+            "SELECT 1 FROM job WHERE job_id = ?", (job_id,)
+        ).fetchone():
+            log_table = "job_log"
+        elif cursor.execute(
+            "SELECT 1 FROM job_archive WHERE job_id = ?", (job_id,)
+        ).fetchone():
+            log_table = "job_log_archive"
+        else:
+            raise NotFoundException(f"No job found for jobId: {job_id}")
+        rows = cursor.execute(
+            f"""
+            SELECT job_log_id, at, msg
+            FROM {log_table}
+            WHERE job_id = ? AND job_log_id > ?
+            ORDER BY job_log_id
+            LIMIT ?
+            """,
+            (
+                job_id,
+                after_log_id if after_log_id is not None else 0,
+                limit if limit is not None else -1,
+            ),
+        ).fetchall()
+        return [
+            JobLogEntry(
+                log_id=row["job_log_id"], at=row["at"], message=row["msg"]
+            )
+            for row in rows
+        ]
+
+    def get_job_events(
+        self,
+        after_event_id: int,
+        datastore_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[JobEvent]:
+        """
+        Returns the job log entries written after after_event_id, in the
+        order they were written, as events of the jobs they belong to.
+        """
+        query = """
+            SELECT l.job_log_id, l.at, l.msg, j.job_id, j.datastore_id
+            FROM job_log AS l
+            JOIN job AS j ON j.job_id = l.job_id
+            WHERE l.job_log_id > ?
+        """
+        params: list = [after_event_id]
+        if datastore_id is not None:
+            query += " AND j.datastore_id = ?"
+            params.append(datastore_id)
+        query += " ORDER BY l.job_log_id LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        rows = self._conn().cursor().execute(query, params).fetchall()
+        id_to_rdn_map = self._get_datastore_id_to_rdn_map()
+        return [_job_event_from_row(row, id_to_rdn_map) for row in rows]
+
+    def get_latest_job_event_id(self) -> int:
+        """
+        Returns the id of the latest job log entry, or 0 if there is none.
+        """
+        row = (
+            self._conn()
+            .cursor()
+            .execute("SELECT max(job_log_id) AS event_id FROM job_log")
+            .fetchone()
+        )
+        return row["event_id"] or 0
+
+    def get_changes(self, after_change_seq: int, limit: int) -> Changes:
+        """
+        Returns the jobs, job log entries and targets changed after
+        after_change_seq, in their current state, and the ids of the jobs
+        archived since then. Archived jobs are no longer returned by
+        get_jobs, and their logs no longer by get_job_events. Returns the
+        changes of at most limit write transactions, and never only part
+        of the changes of one, so that no change is skipped by the next
+        call.
+        """
+        cursor = self._conn().cursor()
+        change_seqs = [
+            row["change_seq"]
+            for row in cursor.execute(
                 """
-                SELECT
-                    j.job_id,
-                    j.status,
-                    j.parameters,
-                    j.created_at,
-                    j.created_by,
-                    j.datastore_id,
-                    COALESCE((
-                        SELECT json_group_array(
-                            json_object(
-                                'at', job_log_row.at,
-                                'message', job_log_row.msg
-                            )
-                        )
-                        FROM (
-                            SELECT at, msg
-                            FROM job_log
-                            WHERE job_log.job_id = j.job_id
-                            ORDER BY at ASC
-                        ) AS job_log_row
-                    ), '[]') AS logs_json
-                FROM job j
-                WHERE j.target = ? AND j.datastore_id = ?;
+                SELECT change_seq FROM (
+                    SELECT DISTINCT change_seq FROM job
+                    WHERE change_seq > :after
+                    ORDER BY change_seq LIMIT :limit
+                )
+                UNION
+                SELECT change_seq FROM (
+                    SELECT DISTINCT change_seq FROM job_log
+                    WHERE change_seq > :after
+                    ORDER BY change_seq LIMIT :limit
+                )
+                UNION
+                SELECT change_seq FROM (
+                    SELECT DISTINCT change_seq FROM target
+                    WHERE change_seq > :after
+                    ORDER BY change_seq LIMIT :limit
+                )
+                UNION
+                SELECT change_seq FROM (
+                    SELECT DISTINCT change_seq FROM job_archive
+                    WHERE change_seq > :after
+                    ORDER BY change_seq LIMIT :limit
+                )
+                ORDER BY change_seq
+                LIMIT :limit
                 """,
-                (name, datastore_id),
-            ).fetchall()
-            if not job_rows:
-                return []
-            id_to_rdn_map = self._get_datastore_id_to_rdn_map()
-            return [
-                Job(
-                    job_id=str(job_row["job_id"]),
-                    status=job_row["status"],
-                    parameters=json.loads(job_row["parameters"]),
-                    created_at=job_row["created_at"].isoformat(),
-                    created_by=json.loads(job_row["created_by"]),
-                    log=[
-                        Log(at=row["at"], message=row["message"])
-                        for row in json.loads(job_row["logs_json"])
-                    ],
-                    datastore_rdn=id_to_rdn_map[job_row["datastore_id"]],
+                {"after": after_change_seq, "limit": limit + 1},
+            )
+        ]
+        if not change_seqs:
+            return Changes(cursor=after_change_seq, has_more=False)
+        has_more = len(change_seqs) > limit
+        until_change_seq = change_seqs[:limit][-1]
+        change_range = (after_change_seq, until_change_seq)
+        id_to_rdn_map = self._get_datastore_id_to_rdn_map()
+        job_rows = cursor.execute(
+            f"""
+            SELECT {_job_json_column(False, False)} AS job_json
+            FROM job j
+            LEFT JOIN datastore d ON d.datastore_id = j.datastore_id
+            WHERE j.change_seq > ? AND j.change_seq <= ?
+            ORDER BY j.change_seq, j.job_id
+            """,
+            change_range,
+        ).fetchall()
+        job_log_rows = cursor.execute(
+            """
+            SELECT l.job_log_id, l.at, l.msg, j.job_id, j.datastore_id
+            FROM job_log AS l
+            JOIN job AS j ON j.job_id = l.job_id
+            WHERE l.change_seq > ? AND l.change_seq <= ?
+            ORDER BY l.job_log_id
+            """,
+            change_range,
+        ).fetchall()
+        target_rows = cursor.execute(
+            """
+            SELECT
+                name,
+                datastore_id,
+                status,
+                action,
+                last_updated_at,
+                last_updated_by
+            FROM target
+            WHERE change_seq > ? AND change_seq <= ?
+            ORDER BY change_seq, name
+            """,
+            change_range,
+        ).fetchall()
+        archived_job_rows = cursor.execute(
+            """
+            SELECT job_id FROM job_archive
+            WHERE change_seq > ? AND change_seq <= ?
+            ORDER BY change_seq, job_id
+            """,
+            change_range,
+        ).fetchall()
+        return Changes(
+            jobs=_jobs_from_json_rows(job_rows),
+            job_logs=[
+                _job_event_from_row(row, id_to_rdn_map) for row in job_log_rows
+            ],
+            targets=[
+                Target(
+                    name=target_row["name"],
+                    status=target_row["status"],
+                    action=target_row["action"].split(","),
+                    last_updated_at=target_row["last_updated_at"].isoformat(),
+                    last_updated_by=UserInfo(
+                        **json.loads(target_row["last_updated_by"])
+                    ),
+                    datastore_rdn=id_to_rdn_map[target_row["datastore_id"]],
                 )
-                for job_row in job_rows
-            ]
-        finally:
-            conn.close()
+                for target_row in target_rows
+            ],
+            archived_job_ids=[str(row["job_id"]) for row in archived_job_rows],
+            cursor=until_change_seq,
+            has_more=has_more,
+        )
+
+    def _insert_bump_manifestos(
+        self, cursor: sqlite3.Cursor, jobs: list[Job]
+    ) -> None:
+        cursor.executemany(
+            "INSERT INTO job_bump_manifesto (job_id, manifesto) VALUES (?, ?)",
+            [
+                (
+                    int(job.job_id),
+                    job.parameters.bump_manifesto.model_dump_json(
+                        by_alias=True
+                    ),
+                )
+                for job in jobs
+                if job.parameters.bump_manifesto is not None
+            ],
+        )
 
     def insert_new_job(self, new_job: Job) -> Job:
         """
@@ -254,10 +679,8 @@ class SqliteDbClient:
         returns job_id of created job.
         Raises JobExistsException if job already exists in database.
         """
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+
+        def write(cursor: sqlite3.Cursor) -> Job:
             datastore_id = self.get_datastore_id_from_rdn(new_job.datastore_rdn)
             cursor.execute(
                 """
@@ -279,38 +702,153 @@ class SqliteDbClient:
                         status,
                         parameters,
                         created_at,
-                        created_by
+                        created_by,
+                        change_seq
                     )
                     VALUES
-                    ( ?, ?, ?, ?, ?, ?)
+                    ( ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         new_job.parameters.target,
                         datastore_id,
                         new_job.status,
-                        json.dumps(
-                            new_job.parameters.model_dump(by_alias=True)
-                        ),
+                        _dump_job_parameters(new_job),
                         new_job.created_at,
                         json.dumps(
                             new_job.created_by.model_dump(by_alias=True)
                         ),
+                        self._next_change_seq(cursor),
                     ),
                 )
                 job_id = cursor.lastrowid
-                conn.commit()
                 new_job.job_id = str(job_id)
+                self._insert_bump_manifestos(cursor, [new_job])
                 return new_job
             else:
-                conn.rollback()
                 raise JobExistsException(
                     f"Job already in progress for {new_job.parameters.target}"
                 )
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+
+        return self._writes.submit(write)
+
+    def insert_new_jobs(
+        self, new_jobs: list[Job]
+    ) -> list[Job | JobExistsException]:
+        """
+        Creates the new jobs, and updates their targets, in one transaction.
+        Returns the created job, with its job_id, for each job in new_jobs,
+        or a JobExistsException if a job for the same target is already in
+        progress. This includes jobs earlier in new_jobs.
+        """
+
+        def write(cursor: sqlite3.Cursor) -> list[Job | JobExistsException]:
+            datastore_ids = {
+                rdn: self.get_datastore_id_from_rdn(rdn)
+                for rdn in {new_job.datastore_rdn for new_job in new_jobs}
+            }
+            keys = [
+                (
+                    new_job.parameters.target,
+                    datastore_ids[new_job.datastore_rdn],
+                )
+                for new_job in new_jobs
+            ]
+            in_progress = {
+                (row["target"], row["datastore_id"])
+                for row in cursor.execute(
+                    """
+                    SELECT DISTINCT target, datastore_id FROM job
+                    WHERE (target, datastore_id) IN (
+                        SELECT
+                            json_extract(value, '$[0]'),
+                            json_extract(value, '$[1]')
+                        FROM json_each(?)
+                    )
+                    AND status NOT IN ('completed', 'failed')
+                    """,
+                    (json.dumps(keys),),
+                )
+            }
+            results: list[Job | JobExistsException] = []
+            created: list[tuple[Job, int]] = []
+            for new_job, key in zip(new_jobs, keys):
+                if key in in_progress:
+                    results.append(
+                        JobExistsException(
+                            "Job already in progress for "
+                            f"{new_job.parameters.target}"
+                        )
+                    )
+                else:
+                    in_progress.add(key)
+                    created.append((new_job, key[1]))
+                    results.append(new_job)
+            if not created:
+                return results
+            change_seq = self._next_change_seq(cursor)
+            cursor.executemany(
+                """
+                INSERT INTO job
+                (
+                    target,
+                    datastore_id,
+                    status,
+                    parameters,
+                    created_at,
+                    created_by,
+                    change_seq
+                )
+                VALUES
+                ( ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        new_job.parameters.target,
+                        datastore_id,
+                        new_job.status,
+                        _dump_job_parameters(new_job),
+                        new_job.created_at,
+                        json.dumps(
+                            new_job.created_by.model_dump(by_alias=True)
+                        ),
+                        change_seq,
+                    )
+                    for new_job, datastore_id in created
+                ],
+            )
+            # The write lock is held, so the new jobs got consecutive ids
+            last_job_id = cursor.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'job'"
+            ).fetchone()["seq"]
+            first_job_id = last_job_id - len(created) + 1
+            for offset, (new_job, _) in enumerate(created):
+                new_job.job_id = str(first_job_id + offset)
+            self._insert_bump_manifestos(
+                cursor, [new_job for new_job, _ in created]
+            )
+            now = datetime.now()
+            cursor.executemany(
+                UPSERT_TARGET_SQL,
+                [
+                    (
+                        new_job.parameters.target,
+                        datastore_id,
+                        new_job.status,
+                        now,
+                        json.dumps(
+                            new_job.created_by.model_dump(
+                                exclude_none=True, by_alias=True
+                            )
+                        ),
+                        ",".join(new_job.get_action()),
+                        change_seq,
+                    )
+                    for new_job, datastore_id in created
+                ],
+            )
+            return results
+
+        return self._writes.submit(write)
 
     def update_job(
         self,
@@ -323,10 +861,8 @@ class SqliteDbClient:
         Updates job with supplied job_id with new status, log, or description.
         Ensures atomic, isolated update.
         """
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+
+        def write(cursor: sqlite3.Cursor) -> Job:
             job_row = self._get_job_row_with_logs(cursor, job_id)
             if job_row is None:
                 raise NotFoundException(f"Could not find job with id {job_id}")
@@ -334,6 +870,11 @@ class SqliteDbClient:
                 raise JobAlreadyCompleteException(
                     f"Job with id {job_id} has already been completed"
                 )
+            change_seq = self._next_change_seq(cursor)
+            cursor.execute(
+                "UPDATE job SET change_seq = ? WHERE job_id = ?",
+                (change_seq, int(job_id)),
+            )
             if description is not None:
                 cursor.execute(
                     """
@@ -345,68 +886,283 @@ class SqliteDbClient:
                 )
                 cursor.execute(
                     """
-                    INSERT INTO job_log (job_id, msg, at)
-                    VALUES (?, ?, ?)
+                    INSERT INTO job_log (job_id, msg, at, change_seq)
+                    VALUES (?, ?, ?, ?)
                     """,
-                    (job_id, "Added update description", datetime.now()),
+                    (
+                        job_id,
+                        "Added update description",
+                        datetime.now(),
+                        change_seq,
+                    ),
+                )
+
+            if status is not None:
+                cursor.execute(
+                    "UPDATE job SET status = ? WHERE job_id = ?",
+                    (status, job_id),
+                )
+                cursor.execute(
+                    """
+                    INSERT INTO job_log (job_id, msg, at, change_seq)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        job_id,
+                        f"{STATUS_LOG_PREFIX}{status}",
+                        datetime.now(),
+                        change_seq,
+                    ),
+                )
+
+            if log is not None:
+                cursor.execute(
+                    """
+                    INSERT INTO job_log (job_id, msg, at, change_seq)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (job_id, log, datetime.now(), change_seq),
+                )
+            job_row = self._get_job_row_with_logs(cursor, job_id)
+            if job_row is None:
+                raise Exception(
+                    f"Could not find job with id {job_id} after update"
+                )
+            return Job(
+                job_id=str(job_row["job_id"]),
+                status=job_row["status"],
+                parameters=_job_parameters_from_row(job_row),
+                created_at=job_row["created_at"].isoformat(),
+                created_by=json.loads(job_row["created_by"]),
+                log=[
+                    Log(at=row["at"], message=row["message"])
+                    for row in json.loads(job_row["logs_json"])
+                ],
+                datastore_rdn=self.get_datastore(job_row["datastore_id"]).rdn,
+            )
+
+        return self._writes.submit(write)
+
+    def claim_jobs(
+        self,
+        limit: int,
+        operations: list[Operation] | None = None,
+    ) -> list[Job]:
+        """
+        Sets the status of the oldest queued jobs, at most limit of them and
+        optionally only those with a matching operation, to initiated, and
+        returns them without their logs. Selecting and updating the jobs in
+        one write transaction means a job is never claimed twice.
+        """
+
+        def write(cursor: sqlite3.Cursor) -> list[Job]:
+            conditions = ["status = ?"]
+            parameters: list[str | int] = [str(JobStatus.QUEUED)]
+            if operations is not None:
+                conditions.append(
+                    f"operation IN ({','.join('?' for _ in operations)})"
+                )
+                parameters.extend(str(operation) for operation in operations)
+            job_ids = [
+                row["job_id"]
+                for row in cursor.execute(
+                    f"""
+                    SELECT job_id FROM job
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY job_id
+                    LIMIT ?
+                    """,
+                    (*parameters, limit),
+                )
+            ]
+            if not job_ids:
+                return []
+            status = JobStatus.INITIATED
+            now = datetime.now()
+            change_seq = self._next_change_seq(cursor)
+            cursor.executemany(
+                "UPDATE job SET status = ?, change_seq = ? WHERE job_id = ?",
+                [(status, change_seq, job_id) for job_id in job_ids],
+            )
+            cursor.executemany(
+                """
+                INSERT INTO job_log (job_id, msg, at, change_seq)
+                VALUES (?, ?, ?, ?)
+                """,
+                [
+                    (job_id, f"{STATUS_LOG_PREFIX}{status}", now, change_seq)
+                    for job_id in job_ids
+                ],
+            )
+            job_rows = cursor.execute(
+                f"""
+                SELECT
+                    j.job_id,
+                    j.status,
+                    j.parameters,
+                    j.created_at,
+                    j.created_by,
+                    j.datastore_id,
+                    m.manifesto AS bump_manifesto
+                FROM job j
+                LEFT JOIN job_bump_manifesto m ON m.job_id = j.job_id
+                WHERE j.job_id IN ({",".join("?" for _ in job_ids)})
+                ORDER BY j.job_id
+                """,
+                job_ids,
+            ).fetchall()
+            id_to_rdn_map = self._get_datastore_id_to_rdn_map()
+            jobs = [
+                Job(
+                    job_id=str(job_row["job_id"]),
+                    status=job_row["status"],
+                    parameters=_job_parameters_from_row(job_row),
+                    created_at=job_row["created_at"].isoformat(),
+                    created_by=json.loads(job_row["created_by"]),
+                    datastore_rdn=id_to_rdn_map[job_row["datastore_id"]],
                 )
+                for job_row in job_rows
+            ]
+            cursor.executemany(
+                UPSERT_TARGET_SQL,
+                [
+                    (
+                        job.parameters.target,
+                        job_row["datastore_id"],
+                        job.status,
+                        now,
+                        json.dumps(
+                            job.created_by.model_dump(
+                                exclude_none=True, by_alias=True
+                            )
+                        ),
+                        ",".join(job.get_action()),
+                        change_seq,
+                    )
+                    for job, job_row in zip(jobs, job_rows)
+                ],
+            )
+            return jobs
 
-            if status is not None:
-                cursor.execute(
-                    "UPDATE job SET status = ? WHERE job_id = ?",
-                    (status, job_id),
-                )
-                cursor.execute(
-                    """
-                    INSERT INTO job_log (job_id, msg, at)
-                    VALUES (?, ?, ?)
-                    """,
-                    (job_id, f"Set status: {status}", datetime.now()),
-                )
+        return self._writes.submit(write)
 
-            if log is not None:
-                cursor.execute(
+    def archive_jobs(self, created_before: datetime, limit: int) -> int:
+        """
+        Moves at most limit completed or failed jobs created before
+        created_before, and their logs, to the archive tables. Returns the
+        number of jobs archived.
+        """
+
+        def write(cursor: sqlite3.Cursor) -> int:
+            job_ids = [
+                row["job_id"]
+                for row in cursor.execute(
                     """
-                    INSERT INTO job_log (job_id, msg, at)
-                    VALUES (?, ?, ?)
+                    SELECT job_id FROM job
+                    WHERE status IN ('completed', 'failed')
+                    AND created_at < ?
+                    ORDER BY job_id
+                    LIMIT ?
                     """,
-                    (job_id, log, datetime.now()),
+                    (created_before, limit),
                 )
-            conn.commit()
-            job_row = self._get_job_row_with_logs(cursor, job_id)
-            if job_row is None:
-                raise Exception(
-                    f"Could not find job with id {job_id} after update"
+            ]
+            if not job_ids:
+                return 0
+            placeholders = ",".join("?" for _ in job_ids)
+            cursor.execute(
+                f"""
+                INSERT INTO job_archive (
+                    job_id,
+                    target,
+                    datastore_id,
+                    status,
+                    created_at,
+                    created_by,
+                    parameters,
+                    archived_at,
+                    change_seq
                 )
-            return Job(
-                job_id=str(job_row["job_id"]),
-                status=job_row["status"],
-                parameters=json.loads(job_row["parameters"]),
-                created_at=job_row["created_at"].isoformat(),
-                created_by=json.loads(job_row["created_by"]),
-                log=[
-                    Log(at=row["at"], message=row["message"])
-                    for row in json.loads(job_row["logs_json"])
-                ],
-                datastore_rdn=self.get_datastore(job_row["datastore_id"]).rdn,
+                SELECT
+                    j.job_id,
+                    j.target,
+                    j.datastore_id,
+                    j.status,
+                    j.created_at,
+                    j.created_by,
+                    CASE
+                        WHEN m.manifesto IS NULL THEN j.parameters
+                        ELSE json_set(
+                            j.parameters, '$.bumpManifesto', json(m.manifesto)
+                        )
+                    END,
+                    ?,
+                    ?
+                FROM job j
+                LEFT JOIN job_bump_manifesto m ON m.job_id = j.job_id
+                WHERE j.job_id IN ({placeholders})
+                """,
+                (datetime.now(), self._next_change_seq(cursor), *job_ids),
             )
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise e
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+            cursor.execute(
+                f"""
+                INSERT INTO job_log_archive (job_log_id, job_id, msg, at)
+                SELECT job_log_id, job_id, msg, at
+                FROM job_log
+                WHERE job_id IN ({placeholders})
+                """,
+                job_ids,
+            )
+            cursor.execute(
+                f"DELETE FROM job_log WHERE job_id IN ({placeholders})",
+                job_ids,
+            )
+            cursor.execute(
+                f"""
+                DELETE FROM job_bump_manifesto
+                WHERE job_id IN ({placeholders})
+                """,
+                job_ids,
+            )
+            cursor.execute(
+                f"DELETE FROM job WHERE job_id IN ({placeholders})", job_ids
+            )
+            return len(job_ids)
+
+        return self._writes.submit(write)
+
+    def compact(self) -> None:
+        """
+        Updates the query planner statistics, and rewrites the database
+        file if a large share of it is unused, such as after archiving.
+        Runs on the writer thread, between batches of writes, as VACUUM
+        cannot run in a transaction.
+        """
+
+        def maintain(cursor: sqlite3.Cursor) -> None:
+            cursor.execute("ANALYZE")
+            page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+            free_page_count = cursor.execute(
+                "PRAGMA freelist_count"
+            ).fetchone()[0]
+            if (
+                page_count
+                and free_page_count / page_count >= VACUUM_FREE_PAGE_RATIO
+            ):
+                logger.info(
+                    f"Vacuuming {self.db_path}: "
+                    f"{free_page_count} of {page_count} pages unused"
+                )
+                cursor.execute("VACUUM")
+
+        self._writes.submit_outside_transaction(maintain)
 
     def initialize_maintenance(self) -> MaintenanceStatus:
         """
         Inserts an initial maintenance status row if table is empty
         """
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+
+        def write(cursor: sqlite3.Cursor) -> MaintenanceStatus:
             cursor.execute("SELECT COUNT(*) FROM maintenance")
             count = cursor.fetchone()[0]
             if count == 0:
@@ -426,81 +1182,94 @@ class SqliteDbClient:
                         timestamp,
                     ),
                 )
-                conn.commit()
-            cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT msg, paused, timestamp FROM maintenance
-                ORDER BY timestamp DESC
+                SELECT maintenance_id, msg, paused, timestamp FROM maintenance
+                ORDER BY timestamp DESC, maintenance_id DESC
                 LIMIT 1
                 """
             )
-            row = cursor.fetchone()
-            return MaintenanceStatus(
-                msg=row["msg"],
-                paused=bool(row["paused"]),
-                timestamp=str(row["timestamp"]),
-            )
-        except Exception as e:
-            conn.rollback()
-            raise e
+            return _maintenance_status_from_row(cursor.fetchone())
+
+        try:
+            return self._writes.submit(write)
         finally:
-            conn.close()
+            self._invalidate_latest_maintenance_status()
 
     def get_latest_maintenance_status(self) -> MaintenanceStatus:
         """
-        Retrieves the latest maintenance status, initializing if necessary
+        Retrieves the latest maintenance status, initializing if necessary.
+        The status is cached until a new status is set by any process, so
+        checking it costs a single stat of the generation counter.
         """
+        generation = database_generations.get(MAINTENANCE_STATUS_KEY)
+        cached = self._latest_maintenance_status
+        if cached is not None and cached[0] == generation:
+            return cached[1]
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                SELECT msg, paused, timestamp FROM maintenance
-                ORDER BY timestamp DESC
-                LIMIT 1
-                """
-            )
-            row = cursor.fetchone()
-            if row is None:
-                return self.initialize_maintenance()
+        row = conn.execute(
+            """
+            SELECT maintenance_id, msg, paused, timestamp FROM maintenance
+            ORDER BY timestamp DESC, maintenance_id DESC
+            LIMIT 1
+            """
+        ).fetchone()
+        if row is None:
+            return self.initialize_maintenance()
+        maintenance_status = _maintenance_status_from_row(row)
+        if not conn.in_transaction:
+            self._latest_maintenance_status = (generation, maintenance_status)
+        return maintenance_status
 
-            return MaintenanceStatus(
-                msg=row["msg"],
-                paused=bool(row["paused"]),
-                timestamp=str(row["timestamp"]),
-            )
-        finally:
-            conn.close()
+    def _invalidate_latest_maintenance_status(self) -> None:
+        self._latest_maintenance_status = None
+        database_generations.increment(MAINTENANCE_STATUS_KEY)
 
-    def get_maintenance_history(self) -> list[MaintenanceStatus]:
+    def get_maintenance_history(
+        self,
+        limit: int | None = None,
+        before_maintenance_id: str | None = None,
+    ) -> list[MaintenanceStatus]:
         """
-        Returns full history of maintenance entries, initializing if needed.
+        Returns the history of maintenance entries, newest first,
+        initializing if needed. Pages are read with limit, continuing
+        after the maintenance_id of the last entry of the previous page.
         """
-        conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
+        conditions = []
+        params: list = []
+        if before_maintenance_id is not None:
+            conditions.append(
                 """
-                SELECT msg, paused, timestamp FROM maintenance
-                ORDER BY timestamp DESC
+                (timestamp, maintenance_id) < (
+                    SELECT timestamp, maintenance_id FROM maintenance
+                    WHERE maintenance_id = ?
+                )
                 """
             )
-            rows = cursor.fetchall()
-            if rows:
-                return [
-                    MaintenanceStatus(
-                        msg=row["msg"],
-                        paused=bool(row["paused"]),
-                        timestamp=str(row["timestamp"]),
-                    )
-                    for row in rows
-                ]
-            else:
-                return [self.initialize_maintenance()]
-        finally:
-            conn.close()
+            params.append(int(before_maintenance_id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
+        conn = self._conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT maintenance_id, msg, paused, timestamp FROM maintenance
+            {where}
+            ORDER BY timestamp DESC, maintenance_id DESC
+            {limit_clause}
+            """,
+            params,
+        )
+        rows = cursor.fetchall()
+        if rows:
+            return [_maintenance_status_from_row(row) for row in rows]
+        elif before_maintenance_id is None:
+            return [self.initialize_maintenance()]
+        else:
+            return []
 
     def set_maintenance_status(
         self, msg: str, paused: bool
@@ -508,11 +1277,8 @@ class SqliteDbClient:
         """
         Inserts a new maintenance status record.
         """
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
-            timestamp = datetime.now().isoformat()
+
+        def write(cursor: sqlite3.Cursor) -> None:
             cursor.execute(
                 """
                 INSERT INTO maintenance (msg, paused, timestamp)
@@ -521,51 +1287,47 @@ class SqliteDbClient:
                 (
                     msg,
                     paused,
-                    timestamp,
+                    datetime.now().isoformat(),
                 ),
             )
-            conn.commit()
-            return self.get_latest_maintenance_status()
-        except Exception as e:
-            conn.rollback()
-            raise e
+
+        try:
+            self._writes.submit(write)
         finally:
-            conn.close()
+            self._invalidate_latest_maintenance_status()
+        return self.get_latest_maintenance_status()
 
     def get_targets(self, datastore_id: int) -> list[Target]:
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            target_rows = cursor.execute(
-                """
-                SELECT
-                    name,
-                    datastore_id,
-                    status,
-                    action,
-                    last_updated_at,
-                    last_updated_by
-                FROM target
-                WHERE datastore_id = ?
-                """,
-                (datastore_id,),
-            ).fetchall()
-            id_to_rdn_map = self._get_datastore_id_to_rdn_map()
-            return [
-                Target(
-                    name=target_row["name"],
-                    status=target_row["status"],
-                    action=target_row["action"].split(","),
-                    last_updated_at=target_row["last_updated_at"].isoformat(),
-                    last_updated_by=UserInfo(
-                        **json.loads(target_row["last_updated_by"])
-                    ),
-                    datastore_rdn=id_to_rdn_map[target_row["datastore_id"]],
-                )
-                for target_row in target_rows
-            ]
-        finally:
-            conn.close()
+        cursor = conn.cursor()
+        target_rows = cursor.execute(
+            """
+            SELECT
+                name,
+                datastore_id,
+                status,
+                action,
+                last_updated_at,
+                last_updated_by
+            FROM target
+            WHERE datastore_id = ?
+            """,
+            (datastore_id,),
+        ).fetchall()
+        id_to_rdn_map = self._get_datastore_id_to_rdn_map()
+        return [
+            Target(
+                name=target_row["name"],
+                status=target_row["status"],
+                action=target_row["action"].split(","),
+                last_updated_at=target_row["last_updated_at"].isoformat(),
+                last_updated_by=UserInfo(
+                    **json.loads(target_row["last_updated_by"])
+                ),
+                datastore_rdn=id_to_rdn_map[target_row["datastore_id"]],
+            )
+            for target_row in target_rows
+        ]
 
     def _upsert_one_target(
         self,
@@ -576,32 +1338,23 @@ class SqliteDbClient:
         created_by: str,
         action: str,
         datastore_id: int,
+        change_seq: int,
     ) -> None:
         cursor.execute(
-            """
-                INSERT INTO target (
-                    name,
-                    datastore_id,
-                    status,
-                    last_updated_at,
-                    last_updated_by,
-                    action
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(name, datastore_id) DO UPDATE SET
-                    status = excluded.status,
-                    last_updated_at = excluded.last_updated_at,
-                    last_updated_by = excluded.last_updated_by,
-                    action = excluded.action
-                """,
-            (name, datastore_id, status, timestamp, created_by, action),
+            UPSERT_TARGET_SQL,
+            (
+                name,
+                datastore_id,
+                status,
+                timestamp,
+                created_by,
+                action,
+                change_seq,
+            ),
         )
 
     def update_target(self, job: Job) -> None:
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+        def write(cursor: sqlite3.Cursor) -> None:
             datastore_id = self.get_datastore_id_from_rdn(job.datastore_rdn)
             self._upsert_one_target(
                 cursor,
@@ -613,19 +1366,13 @@ class SqliteDbClient:
                 ),
                 ",".join(job.get_action()),
                 datastore_id,
+                self._next_change_seq(cursor),
             )
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+
+        self._writes.submit(write)
 
     def update_bump_targets(self, job: Job) -> None:
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+        def write(cursor: sqlite3.Cursor) -> None:
             datastore_id = self.get_datastore_id_from_rdn(job.datastore_rdn)
             bump_manifesto = job.parameters.bump_manifesto
             if bump_manifesto is None:
@@ -638,10 +1385,10 @@ class SqliteDbClient:
                 if update.release_status != "DRAFT"
             ]
             version = job.parameters.bump_to_version
+            change_seq = self._next_change_seq(cursor)
             created_by = json.dumps(
                 job.created_by.model_dump(exclude_none=True, by_alias=True)
             )
-            cursor = conn.cursor()
             for update in updates:
                 operation = (
                     "RELEASED"
@@ -656,36 +1403,43 @@ class SqliteDbClient:
                     created_by,
                     ",".join([operation, str(version)]),
                     datastore_id,
+                    change_seq,
                 )
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
 
-    def get_datastores(self) -> list[Datastore]:
+        self._writes.submit(write)
+
+    def _get_datastore_registry(self) -> _DatastoreRegistry | None:
         """
-        Returns list of active datastores
+        Returns the cached datastore registry, reloading it if a datastore
+        has been inserted or deleted by any process since it was loaded.
+        Returns None inside a transaction, where the registry could pick up
+        uncommitted changes, so that the caller queries the table instead.
         """
+        generation = database_generations.get(DATASTORE_REGISTRY_KEY)
+        registry = self._datastore_registry
+        if registry is not None and registry.generation == generation:
+            return registry
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            rows = cursor.execute(
-                """
-                SELECT
-                    datastore_id,
-                    rdn,
-                    description,
-                    directory,
-                    name,
-                    bump_enabled
-                FROM datastore
-                WHERE deleted_at is NULL
-                """,
-            ).fetchall()
-            return [
-                Datastore(
+        if conn.in_transaction:
+            return None
+        rows = conn.execute(
+            """
+            SELECT
+                datastore_id,
+                rdn,
+                description,
+                directory,
+                name,
+                bump_enabled,
+                deleted_at
+            FROM datastore
+            """
+        ).fetchall()
+        registry = _DatastoreRegistry(generation=generation)
+        for row in rows:
+            registry.rdn_by_id[row["datastore_id"]] = row["rdn"]
+            if row["deleted_at"] is None:
+                datastore = Datastore(
                     datastore_id=row["datastore_id"],
                     rdn=row["rdn"],
                     description=row["description"],
@@ -693,80 +1447,118 @@ class SqliteDbClient:
                     name=row["name"],
                     bump_enabled=row["bump_enabled"],
                 )
-                for row in rows
-            ]
-        finally:
-            conn.close()
+                registry.active_by_id[datastore.datastore_id] = datastore
+                registry.active_by_rdn[datastore.rdn] = datastore
+        self._datastore_registry = registry
+        return registry
 
-    def get_datastore(self, datastore_id: int) -> Datastore:
+    def _invalidate_datastore_registry(self) -> None:
+        self._datastore_registry = None
+        database_generations.increment(DATASTORE_REGISTRY_KEY)
+
+    def get_datastores(self) -> list[Datastore]:
+        """
+        Returns list of active datastores
+        """
+        registry = self._get_datastore_registry()
+        if registry is not None:
+            return list(registry.active_by_id.values())
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            datastore = cursor.execute(
-                """
-                SELECT
-                    datastore_id,
-                    rdn,
-                    description,
-                    directory,
-                    name,
-                    bump_enabled
-                FROM datastore
-                WHERE datastore_id = ?
-                AND deleted_at IS NULL
-                """,
-                (datastore_id,),
-            ).fetchone()
-            return Datastore(
-                datastore_id=datastore["datastore_id"],
-                rdn=datastore["rdn"],
-                description=datastore["description"],
-                directory=datastore["directory"],
-                name=datastore["name"],
-                bump_enabled=datastore["bump_enabled"],
+        cursor = conn.cursor()
+        rows = cursor.execute(
+            """
+            SELECT
+                datastore_id,
+                rdn,
+                description,
+                directory,
+                name,
+                bump_enabled
+            FROM datastore
+            WHERE deleted_at is NULL
+            """,
+        ).fetchall()
+        return [
+            Datastore(
+                datastore_id=row["datastore_id"],
+                rdn=row["rdn"],
+                description=row["description"],
+                directory=row["directory"],
+                name=row["name"],
+                bump_enabled=row["bump_enabled"],
             )
-        finally:
-            conn.close()
+            for row in rows
+        ]
+
+    def get_datastore(self, datastore_id: int) -> Datastore:
+        registry = self._get_datastore_registry()
+        if registry is not None and datastore_id in registry.active_by_id:
+            return registry.active_by_id[datastore_id]
+        conn = self._conn()
+        cursor = conn.cursor()
+        datastore = cursor.execute(
+            """
+            SELECT
+                datastore_id,
+                rdn,
+                description,
+                directory,
+                name,
+                bump_enabled
+            FROM datastore
+            WHERE datastore_id = ?
+            AND deleted_at IS NULL
+            """,
+            (datastore_id,),
+        ).fetchone()
+        return Datastore(
+            datastore_id=datastore["datastore_id"],
+            rdn=datastore["rdn"],
+            description=datastore["description"],
+            directory=datastore["directory"],
+            name=datastore["name"],
+            bump_enabled=datastore["bump_enabled"],
+        )
 
     def get_datastore_id_from_rdn(self, rdn: str) -> int:
         """
         Returns datastore id for active datastores.
         """
+        registry = self._get_datastore_registry()
+        if registry is not None and rdn in registry.active_by_rdn:
+            return registry.active_by_rdn[rdn].datastore_id
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            datastore_id = cursor.execute(
-                """
-                SELECT
-                    datastore_id
-                FROM datastore
-                WHERE rdn = ?
-                AND deleted_at IS NULL
-                """,
-                (rdn,),
-            ).fetchone()
-            if not datastore_id:
-                raise DatastoreNotFoundException(
-                    f"No datastore found for datastore_rdn: {rdn}"
-                )
-            return int(datastore_id["datastore_id"])
-        finally:
-            conn.close()
+        cursor = conn.cursor()
+        datastore_id = cursor.execute(
+            """
+            SELECT
+                datastore_id
+            FROM datastore
+            WHERE rdn = ?
+            AND deleted_at IS NULL
+            """,
+            (rdn,),
+        ).fetchone()
+        if not datastore_id:
+            raise DatastoreNotFoundException(
+                f"No datastore found for datastore_rdn: {rdn}"
+            )
+        return int(datastore_id["datastore_id"])
 
     def _get_datastore_id_to_rdn_map(self) -> dict[int, str]:
+        registry = self._get_datastore_registry()
+        if registry is not None:
+            return registry.rdn_by_id
         conn = self._conn()
-        try:
-            cursor = conn.cursor()
-            rows = cursor.execute(
-                """
-                SELECT
-                    datastore_id, rdn
-                FROM datastore
-                """,
-            ).fetchall()
-            return {row[0]: row[1] for row in rows}
-        finally:
-            conn.close()
+        cursor = conn.cursor()
+        rows = cursor.execute(
+            """
+            SELECT
+                datastore_id, rdn
+            FROM datastore
+            """,
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
 
     def insert_new_datastore(
         self,
@@ -779,10 +1571,8 @@ class SqliteDbClient:
         """
         Inserts a new datastore row.
         """
-        conn = self._conn()
-        try:
-            conn.execute("BEGIN IMMEDIATE")
-            cursor = conn.cursor()
+
+        def write(cursor: sqlite3.Cursor) -> None:
             cursor.execute(
                 """
                 INSERT INTO datastore (
@@ -802,17 +1592,14 @@ class SqliteDbClient:
                     bump_enabled,
                 ),
             )
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
+
+        try:
+            self._writes.submit(write)
         finally:
-            conn.close()
+            self._invalidate_datastore_registry()
 
     def hard_delete_datastore(self, rdn: str) -> None:
-        conn = self._conn()
-        try:
-            cursor = conn.cursor()
+        def write(cursor: sqlite3.Cursor) -> None:
             cursor.execute(
                 """
                 DELETE FROM datastore
@@ -820,22 +1607,20 @@ class SqliteDbClient:
                 """,
                 (rdn,),
             )
-            conn.commit()
             if cursor.rowcount == 0:
                 raise DatastoreNotFoundException(
                     f"Could not find datastore with rdn: {rdn}"
                 )
-        except Exception as e:
-            conn.rollback()
-            raise e
+
+        try:
+            self._writes.submit(write)
         finally:
-            conn.close()
+            self._invalidate_datastore_registry()
 
     def delete_datastore(self, datastore_id: int) -> None:
-        conn = self._conn()
         now = datetime.now().isoformat()
-        try:
-            cursor = conn.cursor()
+
+        def write(cursor: sqlite3.Cursor) -> None:
             cursor.execute(
                 """
                 UPDATE datastore
@@ -848,14 +1633,13 @@ class SqliteDbClient:
                     datastore_id,
                 ),
             )
-            conn.commit()
             if cursor.rowcount == 0:
                 rdn = self._get_datastore_id_to_rdn_map()[1]
                 raise DatastoreNotFoundException(
                     f"Could not find active datastore with rdn: {rdn}"
                 )
-        except Exception as e:
-            conn.rollback()
-            raise e
+
+        try:
+            self._writes.submit(write)
         finally:
-            conn.close()
+            self._invalidate_datastore_registry()
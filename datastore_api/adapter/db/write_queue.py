@@ -0,0 +1,193 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, wait
+from typing import TypeVar
+
+logger = logging.getLogger()
+
+T = TypeVar("T")
+
+Write = Callable[[sqlite3.Cursor], T]
+# A queued write, its future and whether it runs in the batch transaction
+QueuedWrite = tuple[Write, Future, bool]
+
+MAX_WRITE_BATCH_SIZE = 64
+WRITER_CHECK_INTERVAL_SECONDS = 1.0
+
+
+class WriteQueue:
+    """
+    Serializes the writes of a process through a single writer thread.
+    Writes waiting in the queue are committed together in one transaction,
+    each in its own savepoint, so a failing write only undoes its own
+    changes. Writers in a process therefore never contend for the write
+    lock, and a burst of short writes such as job logs costs one commit.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]) -> None:
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue[QueuedWrite | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def submit(self, write: Write[T]) -> T:
+        """
+        Runs write in a transaction on the writer thread, and returns its
+        result once the transaction is committed. Writes submitted from
+        the writer thread, such as a write calling another write, run
+        directly in the current transaction. Raises OperationalError if the
+        writer thread dies before the write is done, instead of waiting
+        for it forever.
+        """
+        if threading.current_thread() is self._thread:
+            return self._run_in_savepoint(self._connect(), write)
+        return self._enqueue(write, in_transaction=True)
+
+    def submit_outside_transaction(self, write: Write[T]) -> T:
+        """
+        Runs write on the writer thread on its own, outside of any
+        transaction, for statements such as VACUUM that cannot run in
+        one. Writes queued before it are committed first, and writes
+        queued after it wait until it is done.
+        """
+        return self._enqueue(write, in_transaction=False)
+
+    def _enqueue(self, write: Write[T], in_transaction: bool) -> T:
+        future: Future = Future()
+        with self._lock:
+            self._ensure_writer_thread()
+            writer_thread = self._thread
+            self._queue.put((write, future, in_transaction))
+        while not wait([future], timeout=WRITER_CHECK_INTERVAL_SECONDS).done:
+            if not writer_thread.is_alive() and not future.done():
+                raise sqlite3.OperationalError(
+                    "The sqlite writer thread stopped before the write was done"
+                )
+        return future.result()
+
+    def stop(self) -> None:
+        """
+        Stops the writer thread, once the writes queued before this call
+        have been committed, and closes its connection.
+        """
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_writer_thread(self) -> None:
+        if (
+            self._thread is None
+            or self._pid != os.getpid()
+            or not self._thread.is_alive()
+        ):
+            # Threads do not survive a fork, nor should queued writes
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._queue,),
+                name="sqlite-writer",
+                daemon=True,
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(
+        self, write_queue: "queue.SimpleQueue[QueuedWrite | None]"
+    ) -> None:
+        stopping = False
+        try:
+            while not stopping:
+                batch = []
+                item = write_queue.get()
+                while True:
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) == MAX_WRITE_BATCH_SIZE:
+                        break
+                    try:
+                        item = write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    try:
+                        self._process_batch(batch)
+                    except Exception as e:
+                        # Keep the writer alive for the writes that follow
+                        logger.error(f"Unexpected error in sqlite writer: {e}")
+                        for _, future, _ in batch:
+                            if not future.done():
+                                future.set_exception(e)
+        finally:
+            # Closing rolls back a transaction left open by a dying writer
+            try:
+                self._connect().close()
+            except Exception as e:
+                logger.warning(f"Could not close sqlite writer connection: {e}")
+
+    def _process_batch(self, batch: list[QueuedWrite]) -> None:
+        """
+        Commits the queued writes in order, the transactional writes
+        between two writes that run outside a transaction together.
+        """
+        transactional: list[tuple[Write, Future]] = []
+        for write, future, in_transaction in batch:
+            if in_transaction:
+                transactional.append((write, future))
+                continue
+            if transactional:
+                self._commit_batch(transactional)
+                transactional = []
+            try:
+                future.set_result(write(self._connect().cursor()))
+            except Exception as e:
+                future.set_exception(e)
+        if transactional:
+            self._commit_batch(transactional)
+
+    def _commit_batch(self, batch: list[tuple[Write, Future]]) -> None:
+        conn: sqlite3.Connection | None = None
+        outcomes: list[tuple[Future, object, Exception | None]] = []
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            for write, future in batch:
+                try:
+                    outcomes.append(
+                        (future, self._run_in_savepoint(conn, write), None)
+                    )
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to commit batch of {len(batch)} writes: {e}")
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, exception in outcomes:
+            if exception is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
+
+    def _run_in_savepoint(self, conn: sqlite3.Connection, write: Write[T]) -> T:
+        conn.execute("SAVEPOINT write")
+        try:
+            result = write(conn.cursor())
+        except Exception:
+            conn.execute("ROLLBACK TO write")
+            conn.execute("RELEASE write")
+            raise
+        conn.execute("RELEASE write")
+        return result
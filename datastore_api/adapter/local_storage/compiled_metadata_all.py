@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pyarrow as pa
+from pyarrow import ipc
+
+from datastore_api.adapter.local_storage.lazy_metadata_all import (
+    LazyMetadataAll,
+    Span,
+)
+from datastore_api.adapter.local_storage.streamed_metadata_all import (
+    StreamedMetadataAll,
+    find_code_list_spans,
+)
+
+logger = logging.getLogger()
+
+COMPILED_FORMAT_VERSION = b"1"
+
+_FORMAT_VERSION_KEY = b"format_version"
+_HEADER_KEY = b"header"
+_SOURCE_SIZE_KEY = b"source_size"
+_SOURCE_MTIME_KEY = b"source_mtime_ns"
+
+_SCHEMA = pa.schema([("name", pa.string()), ("data", pa.binary())])
+
+
+class CompiledMetadataAll(LazyMetadataAll):
+    """
+    Lazy view of the compiled form of a metadata_all file: an Arrow IPC
+    file with one row of json encoded data structure per data structure,
+    and the rest of metadata_all in the schema metadata. The file is
+    memory-mapped, so opening it only reads the names of the data
+    structures.
+    """
+
+    def __init__(self, table: pa.Table) -> None:
+        self._table = table
+        self._rows = {
+            name: row
+            for row, name in enumerate(table.column("name").to_pylist())
+        }
+        self.header = json.loads(table.schema.metadata[_HEADER_KEY])
+        self.nbytes = len(table.schema.metadata[_HEADER_KEY]) + 128 * len(
+            self._rows
+        )
+
+    def raw(self, name: str) -> bytes:
+        return self._table.column("data")[self._rows[name]].as_py()
+
+    def code_list_spans(self, name: str) -> list[Span]:
+        return find_code_list_spans(self.raw(name))
+
+    def slice(self, name: str, start: int, end: int | None = None) -> bytes:
+        buffer = self._table.column("data")[self._rows[name]].as_buffer()
+        end = buffer.size if end is None else end
+        return buffer.slice(start, end - start).to_pybytes()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def get_compiled_path(metadata_all_file_path: Path | str) -> Path:
+    return Path(metadata_all_file_path).with_suffix(".arrow")
+
+
+def open_compiled_metadata_all(
+    metadata_all_file_path: Path | str,
+) -> CompiledMetadataAll | None:
+    """
+    Returns the compiled form of the metadata_all file, or None if it has
+    not been compiled or was compiled from a different version of the
+    json file, which remains the source of truth.
+    """
+    try:
+        table = ipc.open_file(
+            pa.memory_map(str(get_compiled_path(metadata_all_file_path)))
+        ).read_all()
+        source_stat = os.stat(metadata_all_file_path)
+    except FileNotFoundError:
+        return None
+    except pa.ArrowInvalid as e:
+        logger.warning(
+            f"Ignoring unreadable compiled {metadata_all_file_path}: {e}"
+        )
+        return None
+    metadata = table.schema.metadata or {}
+    if (
+        metadata.get(_FORMAT_VERSION_KEY) != COMPILED_FORMAT_VERSION
+        or metadata.get(_SOURCE_SIZE_KEY) != str(source_stat.st_size).encode()
+        or metadata.get(_SOURCE_MTIME_KEY)
+        != str(source_stat.st_mtime_ns).encode()
+    ):
+        logger.info(f"Ignoring stale compiled {metadata_all_file_path}")
+        return None
+    return CompiledMetadataAll(table)
+
+
+def compile_metadata_all(metadata_all_file_path: Path | str) -> Path:
+    """
+    Writes the compiled form of a metadata_all file next to it. The data
+    structures are copied as json bytes from the spans found by the
+    streaming scanner, so compiling never parses the whole file. The file
+    is written to a temporary file and renamed into place, so readers
+    never see a partially written file.
+    """
+    source_stat = os.stat(metadata_all_file_path)
+    streamed = StreamedMetadataAll(metadata_all_file_path)
+    names = list(streamed)
+    table = pa.table(
+        [
+            pa.array(names, pa.string()),
+            pa.array([streamed.raw(name) for name in names], pa.binary()),
+        ],
+        schema=_SCHEMA.with_metadata(
+            {
+                _FORMAT_VERSION_KEY: COMPILED_FORMAT_VERSION,
+                _HEADER_KEY: json.dumps(streamed.header).encode(),
+                _SOURCE_SIZE_KEY: str(source_stat.st_size).encode(),
+                _SOURCE_MTIME_KEY: str(source_stat.st_mtime_ns).encode(),
+            }
+        ),
+    )
+    compiled_path = get_compiled_path(metadata_all_file_path)
+    with tempfile.NamedTemporaryFile(
+        dir=compiled_path.parent, suffix=".tmp", delete=False
+    ) as f:
+        try:
+            with ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+        except Exception:
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, compiled_path)
+    return compiled_path
@@ -1,27 +1,87 @@
 import json
 import logging
 import os
-from functools import lru_cache
+import tempfile
+import threading
+from collections.abc import Mapping
 from pathlib import Path
 
-from datastore_api.common.exceptions import NotFoundException
+from datastore_api.adapter.local_storage import compiled_metadata_all
+from datastore_api.adapter.local_storage.lazy_metadata_all import (
+    LazyMetadataAll,
+)
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
+from datastore_api.adapter.local_storage.streamed_metadata_all import (
+    StreamedMetadataAll,
+)
+from datastore_api.common.exceptions import (
+    InvalidStorageFormatException,
+    NotFoundException,
+)
 from datastore_api.common.models import Version
+from datastore_api.config import environment
 
 logger = logging.getLogger()
 
 
+_revalidated_json_lock = threading.Lock()
+_revalidated_json: dict[str, tuple[tuple[int, int, int], dict]] = {}
+
+
+def _read_json_revalidated(json_file: str) -> dict:
+    """
+    Returns the parsed contents of a json file that is rewritten in place,
+    such as datastore_versions.json. The parsed contents are reused for as
+    long as a stat of the file shows the same inode, size and modification
+    time, and must not be mutated by the caller.
+    """
+    stat = os.stat(json_file)
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    with _revalidated_json_lock:
+        cached = _revalidated_json.get(json_file)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(json_file, encoding="utf-8") as f:
+        stat = os.fstat(f.fileno())
+        parsed = json.load(f)
+    with _revalidated_json_lock:
+        _revalidated_json[json_file] = (
+            (stat.st_ino, stat.st_size, stat.st_mtime_ns),
+            parsed,
+        )
+    return parsed
+
+
+def forget_datastore_files(datastore_root_dir: Path) -> None:
+    """
+    Drops the parsed json files of the datastore, so that they are read
+    again even if a rewrite went unnoticed by the stat revalidation.
+    """
+    datastore_dir = f"{datastore_root_dir}/datastore/"
+    with _revalidated_json_lock:
+        for json_file in list(_revalidated_json):
+            if json_file.startswith(datastore_dir):
+                del _revalidated_json[json_file]
+
+
 def get_draft_version(datastore_root_dir: Path) -> dict:
+    """
+    Returns the parsed draft_version.json. The result is shared between
+    callers and must not be mutated.
+    """
     json_file = f"{datastore_root_dir}/datastore/draft_version.json"
-    with open(json_file, encoding="utf-8") as f:
-        return json.load(f)
+    return _read_json_revalidated(json_file)
 
 
 def get_datastore_versions(datastore_root_dir: Path) -> dict:
+    """
+    Returns the parsed datastore_versions.json. The result is shared
+    between callers and must not be mutated.
+    """
     datastore_versions_json = (
         f"{datastore_root_dir}/datastore/datastore_versions.json"
     )
-    with open(datastore_versions_json, encoding="utf-8") as f:
-        return json.load(f)
+    return _read_json_revalidated(datastore_versions_json)
 
 
 def _get_draft_metadata_all(datastore_root_dir: Path) -> dict:
@@ -32,36 +92,245 @@ def _get_draft_metadata_all(datastore_root_dir: Path) -> dict:
         return json.load(f)
 
 
-@lru_cache(maxsize=32)
-def _get_versioned_metadata_all(
+def _get_versioned_metadata_all_path(
     version: Version, datastore_root_dir: Path
-) -> dict:
+) -> str:
     file_version = version.to_3_underscored()
-    metadata_all_file_path = (
-        f"{datastore_root_dir}/datastore/metadata_all__{file_version}.json"
+    return f"{datastore_root_dir}/datastore/metadata_all__{file_version}.json"
+
+
+def _load_versioned_metadata_all(
+    version: Version, datastore_root_dir: Path
+) -> tuple[dict | LazyMetadataAll, int]:
+    metadata_all_file_path = _get_versioned_metadata_all_path(
+        version, datastore_root_dir
     )
+    compiled = _open_or_compile(metadata_all_file_path)
+    if compiled is not None:
+        return compiled, compiled.nbytes
+    if _is_oversized(metadata_all_file_path):
+        streamed = StreamedMetadataAll(metadata_all_file_path)
+        return streamed, streamed.nbytes
     with open(metadata_all_file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return json.load(f), os.fstat(f.fileno()).st_size
+
+
+def _open_or_compile(metadata_all_file_path: str) -> LazyMetadataAll | None:
+    compiled = compiled_metadata_all.open_compiled_metadata_all(
+        metadata_all_file_path
+    )
+    if compiled is not None or not environment.metadata_compile_on_load:
+        return compiled
+    try:
+        compiled_metadata_all.compile_metadata_all(metadata_all_file_path)
+    except (OSError, InvalidStorageFormatException) as e:
+        logger.warning(f"Could not compile {metadata_all_file_path}: {e}")
+        return None
+    return compiled_metadata_all.open_compiled_metadata_all(
+        metadata_all_file_path
+    )
+
+
+def _is_oversized(metadata_all_file_path: str) -> bool:
+    return (
+        os.path.getsize(metadata_all_file_path)
+        > environment.metadata_all_streaming_threshold_bytes
+    )
+
+
+def _pin_latest_version(datastore_root_dir: Path) -> None:
+    try:
+        metadata_cache.pin(
+            datastore_root_dir, get_latest_version(datastore_root_dir)
+        )
+    except (FileNotFoundError, IndexError, ValueError) as e:
+        logger.warning(
+            f"Could not resolve latest version of {datastore_root_dir}: {e}"
+        )
+
+
+def _get_versioned_metadata_all(
+    version: Version, datastore_root_dir: Path
+) -> dict | LazyMetadataAll:
+    def load() -> tuple[dict | LazyMetadataAll, int]:
+        loaded = _load_versioned_metadata_all(version, datastore_root_dir)
+        _pin_latest_version(datastore_root_dir)
+        return loaded
+
+    return metadata_cache.get_or_load(
+        datastore_root_dir, version, "metadata_all", load
+    )
 
 
 def get_metadata_all(version: Version, datastore_root_dir: Path) -> dict:
+    """
+    Returns metadata_all for the version. Released versions are served
+    from the shared metadata cache and must not be mutated by the caller.
+    Oversized files are decoded in full on every call, so callers that
+    only need some of the data structures should use get_data_structures.
+    """
     try:
         if version.is_draft():
             return _get_draft_metadata_all(datastore_root_dir)
-        else:
-            result = _get_versioned_metadata_all(version, datastore_root_dir)
-            cache_info = _get_versioned_metadata_all.cache_info()
-            logger.info(
-                f"Cache info for versioned metadata: hits={cache_info.hits}, "
-                f"misses={cache_info.misses}, currsize={cache_info.currsize}"
+        metadata_all = _get_versioned_metadata_all(version, datastore_root_dir)
+        if isinstance(metadata_all, LazyMetadataAll):
+            return _decode_metadata_all(
+                version, datastore_root_dir, metadata_all
             )
-            return result
+        return metadata_all
     except FileNotFoundError as e:
         raise NotFoundException(
             f"metadata_all for version {version} not found"
         ) from e
 
 
+def _decode_metadata_all(
+    version: Version, datastore_root_dir: Path, lazy: LazyMetadataAll
+) -> dict:
+    metadata_all_file_path = _get_versioned_metadata_all_path(
+        version, datastore_root_dir
+    )
+    if _is_oversized(metadata_all_file_path):
+        return lazy.to_dict()
+    return metadata_cache.get_or_load(
+        datastore_root_dir,
+        version,
+        "decoded_metadata_all",
+        lambda: (lazy.to_dict(), os.path.getsize(metadata_all_file_path)),
+    )
+
+
+def _get_lazy_metadata_all(
+    version: Version, datastore_root_dir: Path
+) -> LazyMetadataAll | None:
+    if version.is_draft() or not os.path.exists(
+        _get_versioned_metadata_all_path(version, datastore_root_dir)
+    ):
+        return None
+    metadata_all = _get_versioned_metadata_all(version, datastore_root_dir)
+    return metadata_all if isinstance(metadata_all, LazyMetadataAll) else None
+
+
+def get_data_structures(
+    version: Version, datastore_root_dir: Path
+) -> Mapping[str, dict]:
+    """
+    Returns a mapping from name to data structure for the version, in the
+    order of metadata_all. For compiled and oversized metadata_all files
+    every data structure is decoded when it is accessed, so iterating the
+    names and looking up only the needed ones keeps memory use bounded.
+    The data structures must not be mutated by the caller.
+    """
+    lazy = _get_lazy_metadata_all(version, datastore_root_dir)
+    if lazy is not None:
+        return lazy
+    metadata_all = get_metadata_all(version, datastore_root_dir)
+    if "dataStructures" not in metadata_all:
+        raise InvalidStorageFormatException("Invalid metadata format")
+    return {
+        data_structure["name"]: data_structure
+        for data_structure in metadata_all["dataStructures"]
+    }
+
+
+def get_data_structure(
+    version: Version, datastore_root_dir: Path, name: str
+) -> dict | None:
+    """
+    Returns one data structure of the version, or None if there is no
+    such data structure. For compiled and oversized metadata_all files
+    the code lists are left encoded until they are read, see
+    LazyMetadataAll.without_code_lists.
+    """
+    data_structures = get_data_structures(version, datastore_root_dir)
+    if name not in data_structures:
+        return None
+    if isinstance(data_structures, LazyMetadataAll):
+        return data_structures.without_code_lists(name)
+    return data_structures[name]
+
+
+def get_metadata_all_header(version: Version, datastore_root_dir: Path) -> dict:
+    """
+    Returns metadata_all for the version without its data structures.
+    """
+    lazy = _get_lazy_metadata_all(version, datastore_root_dir)
+    metadata_all = (
+        lazy.header
+        if lazy is not None
+        else get_metadata_all(version, datastore_root_dir)
+    )
+    return {
+        key: value
+        for key, value in metadata_all.items()
+        if key != "dataStructures"
+    }
+
+
+def _get_metadata_diff_path(
+    from_version: Version, to_version: Version, datastore_root_dir: Path
+) -> Path:
+    return (
+        Path(datastore_root_dir)
+        / "datastore"
+        / ".cache"
+        / (
+            f"metadata_diff__{from_version.to_3_underscored()}"
+            f"__{to_version.to_3_underscored()}.json"
+        )
+    )
+
+
+def get_cached_metadata_diff(
+    from_version: Version, to_version: Version, datastore_root_dir: Path
+) -> dict | None:
+    """
+    Returns the persisted diff between two released versions, or None if
+    it has not been computed yet.
+    """
+    diff_path = _get_metadata_diff_path(
+        from_version, to_version, datastore_root_dir
+    )
+    try:
+        with open(diff_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        logger.warning(f"Ignoring corrupt metadata diff {diff_path}: {e}")
+        return None
+
+
+def write_metadata_diff(
+    from_version: Version,
+    to_version: Version,
+    datastore_root_dir: Path,
+    metadata_diff: dict,
+) -> None:
+    """
+    Persists the diff between two released versions. The file is written
+    to a temporary file and renamed into place, so concurrent readers
+    never see a partially written diff. Failing to persist is logged and
+    otherwise ignored, as the diff can always be recomputed.
+    """
+    diff_path = _get_metadata_diff_path(
+        from_version, to_version, datastore_root_dir
+    )
+    try:
+        diff_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=diff_path.parent,
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            json.dump(metadata_diff, f)
+        os.replace(f.name, diff_path)
+    except OSError as e:
+        logger.warning(f"Could not persist metadata diff {diff_path}: {e}")
+
+
 def get_draft_data_file_path(
     dataset_name: str, datastore_root_dir: Path
 ) -> str | None:
@@ -76,15 +345,36 @@ def get_draft_data_file_path(
         return None
 
 
-def get_data_path_from_data_versions(
-    dataset_name: str, version: Version, datastore_root_dir: Path
-) -> str:
+def _load_data_versions(
+    version: Version, datastore_root_dir: Path
+) -> tuple[dict, int]:
     file_version = version.to_2_underscored()
     data_versions_file = os.path.join(
         datastore_root_dir, f"datastore/data_versions__{file_version}.json"
     )
     with open(data_versions_file, encoding="utf-8") as f:
-        data_versions = json.load(f)
+        return json.load(f), os.fstat(f.fileno()).st_size
+
+
+def get_data_versions(version: Version, datastore_root_dir: Path) -> dict:
+    """
+    Returns the mapping from dataset name to data file for a released
+    version. The result is shared through the metadata cache and must not
+    be mutated by the caller.
+    """
+    return metadata_cache.get_or_load(
+        datastore_root_dir,
+        version,
+        "data_versions",
+        lambda: _load_data_versions(version, datastore_root_dir),
+    )
+
+
+def get_data_path_from_data_versions(
+    dataset_name: str, version: Version, datastore_root_dir: Path
+) -> str:
+    file_version = version.to_2_underscored()
+    data_versions = get_data_versions(version, datastore_root_dir)
     if dataset_name not in data_versions:
         raise NotFoundException(
             f"No {dataset_name} in data_versions file "
@@ -101,8 +391,6 @@ def get_data_path_from_data_versions(
 
 
 def get_latest_version(datastore_root_dir: Path) -> Version:
-    datastore_versions = json.load(
-        open(f"{datastore_root_dir}/datastore/datastore_versions.json")
-    )
+    datastore_versions = get_datastore_versions(datastore_root_dir)
     version_list = datastore_versions.get("versions", [])
     return Version.from_str((version_list[0] or {}).get("version", ""))
@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+from datastore_api.config import environment
+
+
+class GenerationCounter:
+    """
+    Monotonic counters shared between processes on the same host, such as
+    the gunicorn workers, through files in a shared state directory.
+
+    Incrementing appends a single byte to the counter file. Appends with
+    O_APPEND are atomic, so concurrent increments are never lost, and the
+    generation is simply the size of the file. Reading a generation is a
+    single stat.
+    """
+
+    def __init__(self, state_dir: Path) -> None:
+        self.state_dir = state_dir
+
+    def increment(self, key: str) -> int:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(
+            self.state_dir / key, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+        try:
+            os.write(fd, b".")
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def get(self, key: str) -> int:
+        try:
+            return os.stat(self.state_dir / key).st_size
+        except FileNotFoundError:
+            return 0
+
+
+datastore_generations = GenerationCounter(
+    Path(environment.shared_state_dir) / "generations"
+)
+database_generations = GenerationCounter(
+    Path(environment.shared_state_dir) / "database"
+)
@@ -0,0 +1,116 @@
+import json
+from abc import abstractmethod
+from collections.abc import Iterator, Mapping, Sequence
+
+Span = tuple[int, int]
+
+
+class LazyMetadataAll(Mapping[str, dict]):
+    """
+    Read-only view of a metadata_all file where the data structures are
+    decoded only when accessed.
+
+    The mapping goes from data structure name to data structure, in the
+    order of the file. Every access decodes a new copy. header holds the
+    rest of metadata_all, with an empty dataStructures list.
+    """
+
+    header: dict
+    nbytes: int
+
+    @abstractmethod
+    def raw(self, name: str) -> bytes:
+        """
+        Returns the json encoded data structure.
+        """
+
+    @abstractmethod
+    def code_list_spans(self, name: str) -> list[Span]:
+        """
+        Returns the byte spans of the code lists in the json encoded data
+        structure, relative to its start and in the order of the file.
+        """
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, name: str) -> dict:
+        return json.loads(self.raw(name))
+
+    def slice(self, name: str, start: int, end: int | None = None) -> bytes:
+        """
+        Returns a byte span of the json encoded data structure.
+        """
+        return self.raw(name)[start:end]
+
+    def without_code_lists(self, name: str) -> dict:
+        """
+        Decodes the data structure with every code list replaced by a
+        LazyCodeList, so that memory use is bounded by the code lists
+        actually read, and not by the largest code list of the structure.
+        """
+        spans = self.code_list_spans(name)
+        if not spans:
+            return self[name]
+        parts, position = [], 0
+        for start, end in spans:
+            parts += [self.slice(name, position, start), b"[]"]
+            position = end
+        parts.append(self.slice(name, position))
+        data_structure = json.loads(b"".join(parts))
+        value_domains = list(_with_code_list(data_structure))
+        for value_domain, span in zip(value_domains, spans, strict=True):
+            value_domain["codeList"] = LazyCodeList(self, name, span)
+        return data_structure
+
+    def to_dict(self) -> dict:
+        """
+        Decodes the whole file. Only meant for requests that ask for all
+        of metadata_all, as the result is as large as a json.load of it.
+        """
+        return {**self.header, "dataStructures": list(self.values())}
+
+
+class LazyCodeList(Sequence[dict]):
+    """
+    A code list left encoded in a metadata_all file, and decoded on every
+    access.
+    """
+
+    def __init__(
+        self, metadata_all: LazyMetadataAll, name: str, span: Span
+    ) -> None:
+        self._metadata_all = metadata_all
+        self._name = name
+        self._span = span
+
+    def load(self) -> list[dict]:
+        return json.loads(self._metadata_all.slice(self._name, *self._span))
+
+    def __getitem__(self, index: int) -> dict:
+        return self.load()[index]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+
+def _with_code_list(value: object) -> Iterator[dict]:
+    """
+    Yields the objects with a codeList array nested in value, in the
+    order of the file they were decoded from.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "codeList" and isinstance(item, list):
+                yield value
+            else:
+                yield from _with_code_list(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _with_code_list(item)
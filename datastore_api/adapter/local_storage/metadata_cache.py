@@ -0,0 +1,205 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, TypeVar
+
+from datastore_api.common.models import CamelModel, Version
+from datastore_api.config import environment
+
+logger = logging.getLogger()
+
+CacheKey = tuple[str, Version, Hashable]
+T = TypeVar("T")
+
+# Only the parsed files are pinned. Representations derived from them,
+# some keyed by request parameters, stay evictable.
+PINNED_KINDS = frozenset({"metadata_all", "data_versions"})
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    nbytes: int
+
+
+class MetadataCacheStats(CamelModel):
+    max_bytes: int
+    current_bytes: int
+    entries: int
+    pinned_entries: int
+    hits: int
+    misses: int
+    evictions: int
+    rejections: int
+    bytes_per_datastore: dict[str, int]
+
+
+class MetadataCache:
+    """
+    Byte-budgeted LRU cache for parsed metadata of released datastore
+    versions.
+
+    Entries are keyed by (datastore_root_dir, version, kind), where kind
+    separates the different representations cached for a version.
+    When the byte budget is exceeded the least recently used entry of the
+    datastore currently occupying the most memory is evicted, so that one
+    large datastore can not push every other datastore out of the cache.
+    The metadata_all and data_versions entries of the latest released
+    version of a datastore are pinned, and only evicted once no other
+    entry is left to evict. Entries larger than the budget are never
+    cached, so the budget is a bound on the cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: dict[CacheKey, threading.Lock] = {}
+        self._entries: OrderedDict[CacheKey, _CacheEntry] = OrderedDict()
+        self._bytes_per_datastore: dict[str, int] = {}
+        self._pinned_versions: dict[str, Version] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+
+    def get_or_load(
+        self,
+        datastore_root_dir: Path | str,
+        version: Version,
+        kind: Hashable,
+        loader: Callable[[], tuple[T, int]],
+    ) -> T:
+        """
+        Returns the cached value for the key, calling loader on a miss.
+        The loader must return the value together with its approximate
+        size in bytes. Concurrent misses for the same key only load once.
+        """
+        key = (str(datastore_root_dir), version, kind)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._hits += 1
+                return entry.value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self._hits += 1
+                    return entry.value
+                self._misses += 1
+            try:
+                value, nbytes = loader()
+                with self._lock:
+                    self._insert(key, _CacheEntry(value, nbytes))
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def pin(self, datastore_root_dir: Path | str, version: Version) -> None:
+        """
+        Marks version as the pinned version for the datastore. Entries for
+        a previously pinned version become evictable again.
+        """
+        with self._lock:
+            self._pinned_versions[str(datastore_root_dir)] = version
+            self._evict_over_budget()
+
+    def stats(self) -> MetadataCacheStats:
+        with self._lock:
+            return MetadataCacheStats(
+                max_bytes=self.max_bytes,
+                current_bytes=sum(self._bytes_per_datastore.values()),
+                entries=len(self._entries),
+                pinned_entries=sum(
+                    1 for key in self._entries if self._is_pinned(key)
+                ),
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                rejections=self._rejections,
+                bytes_per_datastore={
+                    Path(datastore).name: nbytes
+                    for datastore, nbytes in self._bytes_per_datastore.items()
+                },
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes_per_datastore.clear()
+            self._pinned_versions.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._rejections = 0
+
+    def _lookup(self, key: CacheKey) -> _CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _is_pinned(self, key: CacheKey) -> bool:
+        datastore, version, kind = key
+        return (
+            kind in PINNED_KINDS
+            and self._pinned_versions.get(datastore) == version
+        )
+
+    def _insert(self, key: CacheKey, entry: _CacheEntry) -> None:
+        if entry.nbytes > self.max_bytes:
+            self._rejections += 1
+            logger.warning(
+                f"Not caching {key[2]} for version {key[1]} in {key[0]}: "
+                f"{entry.nbytes} bytes exceeds the cache budget"
+            )
+            return
+        datastore = key[0]
+        self._entries[key] = entry
+        self._bytes_per_datastore[datastore] = (
+            self._bytes_per_datastore.get(datastore, 0) + entry.nbytes
+        )
+        self._evict_over_budget()
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        datastore = key[0]
+        remaining = self._bytes_per_datastore[datastore] - entry.nbytes
+        if remaining > 0:
+            self._bytes_per_datastore[datastore] = remaining
+        else:
+            del self._bytes_per_datastore[datastore]
+
+    def _evict_over_budget(self) -> None:
+        while sum(self._bytes_per_datastore.values()) > self.max_bytes:
+            evictable_bytes: dict[str, int] = {}
+            for key, entry in self._entries.items():
+                if not self._is_pinned(key):
+                    evictable_bytes[key[0]] = (
+                        evictable_bytes.get(key[0], 0) + entry.nbytes
+                    )
+            if evictable_bytes:
+                largest = max(evictable_bytes, key=evictable_bytes.__getitem__)
+                victim = next(
+                    key
+                    for key in self._entries
+                    if key[0] == largest and not self._is_pinned(key)
+                )
+            else:
+                logger.warning(
+                    "Metadata cache is over budget with only pinned entries"
+                )
+                victim = next(iter(self._entries))
+            self._remove(victim)
+            self._evictions += 1
+            logger.info(
+                f"Evicted {victim[2]} for version {victim[1]} in {victim[0]} "
+                "from the metadata cache"
+            )
+
+
+metadata_cache = MetadataCache(environment.metadata_cache_max_bytes)
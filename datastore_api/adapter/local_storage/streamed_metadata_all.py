@@ -0,0 +1,211 @@
+import json
+import mmap
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+from datastore_api.adapter.local_storage.lazy_metadata_all import (
+    LazyMetadataAll,
+    Span,
+)
+from datastore_api.common.exceptions import InvalidStorageFormatException
+
+_STRING = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_FLAT_CONTENT = rb'(?:[^"{}\[\]]++|' + _STRING + rb")*+"
+_FLAT_OBJECT = rb"\{" + _FLAT_CONTENT + rb"\}"
+_FLAT_ARRAY = (
+    rb'\[(?:[^"{}\[\]]++|' + _STRING + rb"|" + _FLAT_OBJECT + rb")*+\]"
+)
+# Matches the json tokens the scanner needs: arrays and objects without
+# nested containers (such as code lists) as a single token, strings with
+# an optional trailing colon marking object keys, and the remaining
+# brackets. Everything else is skipped by the regex engine. The possessive
+# quantifiers keep failed matches of flat containers from backtracking.
+TOKEN_REG_EXP = re.compile(
+    rb"(?P<flat>"
+    + _FLAT_ARRAY
+    + rb"|"
+    + _FLAT_OBJECT
+    + rb")|(?P<string>"
+    + _STRING
+    + rb")(?P<colon>\s*:)?|[\[\]{}]"
+)
+FLAT_OBJECT_REG_EXP = re.compile(_FLAT_OBJECT)
+
+_OPENING = frozenset(b"{[")
+_DATA_STRUCTURES_KEY = b'"dataStructures"'
+_NAME_KEY = b'"name"'
+_CODE_LIST_KEY = b'"codeList"'
+_ARRAY_START = ord("[")
+
+
+class StreamedMetadataAll(LazyMetadataAll):
+    """
+    Lazy view of a metadata_all file that is too large to be parsed in
+    full. The file is memory-mapped and scanned once for the byte span of
+    every data structure. Memory use is therefore bounded by the number of
+    data structures, and not by the size of their code lists.
+    """
+
+    def __init__(self, metadata_all_file_path: Path | str) -> None:
+        with open(metadata_all_file_path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        array_span, spans = _scan(self._buffer)
+        if array_span is None:
+            raise InvalidStorageFormatException(
+                f"No dataStructures in {metadata_all_file_path}"
+            )
+        array_start, array_end = array_span
+        header_bytes = (
+            self._buffer[:array_start] + b"[]" + self._buffer[array_end:]
+        )
+        self.header: dict = json.loads(header_bytes)
+        self._spans: dict[str, Span] = {}
+        self._code_list_spans: dict[str, list[Span]] = {}
+        for name, start, end, code_list_spans in spans:
+            if name is None:
+                raise InvalidStorageFormatException(
+                    f"Unnamed data structure in {metadata_all_file_path}"
+                )
+            if name not in self._spans:
+                self._spans[name] = (start, end)
+                self._code_list_spans[name] = [
+                    (code_list_start - start, code_list_end - start)
+                    for code_list_start, code_list_end in code_list_spans
+                ]
+        self.nbytes = len(header_bytes) + 128 * len(self._spans)
+
+    def raw(self, name: str) -> bytes:
+        start, end = self._spans[name]
+        return self._buffer[start:end]
+
+    def code_list_spans(self, name: str) -> list[Span]:
+        return self._code_list_spans[name]
+
+    def slice(self, name: str, start: int, end: int | None = None) -> bytes:
+        element_start, element_end = self._spans[name]
+        return self._buffer[
+            element_start + start : element_end
+            if end is None
+            else element_start + end
+        ]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+ElementSpans = tuple[str | None, int, int, list[Span]]
+
+
+def _scan(
+    buffer: mmap.mmap | bytes,
+) -> tuple[Span | None, list[ElementSpans]]:
+    """
+    Returns the byte span of the top level dataStructures array, and the
+    name and byte span of every data structure in it, along with the byte
+    spans of the codeList arrays in the data structure.
+    """
+    depth = 0
+    top_level_key = None
+    in_array = False
+    array_start = -1
+    array_span = None
+    element_start = -1
+    element_name = None
+    element_code_lists: list[Span] = []
+    expecting_name = False
+    expecting_code_list = False
+    code_list_start = -1
+    code_list_depth = 0
+    spans: list[ElementSpans] = []
+    for match in TOKEN_REG_EXP.finditer(buffer):
+        start, end = match.span()
+        first = buffer[start]
+        if match.group("flat") is not None:
+            if depth == 1 and top_level_key == _DATA_STRUCTURES_KEY:
+                array_span = (start, end)
+                spans.extend(
+                    _flat_element_span(element)
+                    for element in FLAT_OBJECT_REG_EXP.finditer(
+                        buffer, start, end
+                    )
+                )
+            elif in_array and depth == 2:
+                spans.append(_flat_element_span(match))
+            elif expecting_code_list and first == _ARRAY_START:
+                element_code_lists.append((start, end))
+            expecting_name = False
+            expecting_code_list = False
+        elif match.group("string") is not None:
+            is_key = match.group("colon") is not None
+            key_end = match.end("string")
+            if is_key and depth == 1:
+                top_level_key = buffer[start:key_end]
+            elif in_array and depth == 3:
+                if is_key:
+                    expecting_name = buffer[start:key_end] == _NAME_KEY
+                elif expecting_name:
+                    element_name = json.loads(buffer[start:end])
+                    expecting_name = False
+            expecting_code_list = (
+                is_key
+                and in_array
+                and depth >= 3
+                and not code_list_depth
+                and buffer[start:key_end] == _CODE_LIST_KEY
+            )
+        elif first in _OPENING:
+            if expecting_code_list and first == _ARRAY_START:
+                code_list_start = start
+                code_list_depth = depth + 1
+            depth += 1
+            if (
+                depth == 2
+                and first == _ARRAY_START
+                and top_level_key == _DATA_STRUCTURES_KEY
+            ):
+                in_array = True
+                array_start = start
+            elif in_array and depth == 3:
+                element_start = start
+                element_name = None
+                element_code_lists = []
+            expecting_name = False
+            expecting_code_list = False
+        else:
+            if code_list_depth and depth == code_list_depth:
+                element_code_lists.append((code_list_start, end))
+                code_list_depth = 0
+            if in_array and depth == 3:
+                spans.append(
+                    (element_name, element_start, end, element_code_lists)
+                )
+            elif in_array and depth == 2:
+                array_span = (array_start, end)
+                in_array = False
+            depth -= 1
+    return array_span, spans
+
+
+def find_code_list_spans(raw: bytes) -> list[Span]:
+    """
+    Returns the byte spans of the codeList arrays in a json encoded data
+    structure.
+    """
+    prefix = b'{"dataStructures": ['
+    _, spans = _scan(prefix + raw + b"]}")
+    if not spans:
+        return []
+    _, element_start, _, code_list_spans = spans[0]
+    return [
+        (start - element_start, end - element_start)
+        for start, end in code_list_spans
+    ]
+
+
+def _flat_element_span(match: re.Match) -> ElementSpans:
+    start, end = match.span()
+    return json.loads(match.group()).get("name"), start, end, []
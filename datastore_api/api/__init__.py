@@ -9,6 +9,7 @@ from pydantic import ValidationError
 from starlette.exceptions import HTTPException
 
 from datastore_api.api import (
+    changes,
     datastores,
     jobs,
     maintenance_statuses,
@@ -30,6 +31,7 @@ from datastore_api.common.exceptions import (
     PublicKeyInvalidException,
     PublicKeyNotFoundException,
     RequestValidationException,
+    TooManyEventStreamsException,
 )
 
 logger = logging.getLogger()
@@ -48,6 +50,7 @@ def _include_routers(app: FastAPI) -> None:
         maintenance_statuses.router, prefix="/maintenance-statuses"
     )
     app.include_router(jobs.router, prefix="/jobs")
+    app.include_router(changes.router, prefix="/changes")
 
 
 def _include_middleware(app: FastAPI) -> None:
@@ -205,6 +208,13 @@ def _include_exception_handlers(app: FastAPI) -> None:
         logger.warning(e, exc_info=True)
         return JSONResponse(status_code=404, content={"message": str(e)})
 
+    @app.exception_handler(TooManyEventStreamsException)
+    def handle_too_many_event_streams(
+        _req: Request, e: TooManyEventStreamsException
+    ) -> JSONResponse:
+        logger.warning(e)
+        return JSONResponse(status_code=503, content={"message": str(e)})
+
     @app.exception_handler(Exception)
     def handle_generic_exception(_req: Request, exc: Exception) -> JSONResponse:
         logger.exception(exc)
@@ -0,0 +1,31 @@
+import logging
+
+from fastapi import APIRouter, Depends, Query
+
+from datastore_api.adapter import db
+from datastore_api.adapter.auth.dependencies import authorize_api_key
+from datastore_api.adapter.db.models import Changes
+
+logger = logging.getLogger()
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model_exclude_none=True,
+    dependencies=[Depends(authorize_api_key)],
+)
+def get_changes(
+    cursor: int = Query(
+        0, ge=0, description="The cursor returned with the last changes read"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    database_client: db.DatabaseClient = Depends(db.get_database_client),
+) -> Changes:
+    """
+    Returns the jobs, job log entries and targets changed after cursor,
+    and the ids of the jobs archived since then, which are removed from
+    the jobs and job logs. Read the changes until hasMore is false,
+    passing the returned cursor on to the next request.
+    """
+    return database_client.get_changes(cursor, limit)
@@ -4,10 +4,18 @@ from pathlib import Path
 from fastapi import Depends
 
 from datastore_api.adapter import db
+from datastore_api.domain import cache_events
 
 logger = logging.getLogger()
 
 
+def get_async_database_client(
+    database_client: db.DatabaseClient = Depends(db.get_database_client),
+) -> db.AsyncDatabaseClient:
+    """Returns the database client for async route handlers"""
+    return db.ExecutorDatabaseClient(database_client)
+
+
 def get_datastore_id(
     datastore_rdn: str,
     database_client: db.DatabaseClient = Depends(db.get_database_client),
@@ -21,4 +29,8 @@ def get_datastore_root_dir(
     datastore_id: int = Depends(get_datastore_id),
 ) -> Path:
     """Returns the path to the datastore directory"""
-    return Path(database_client.get_datastore(datastore_id).directory)
+    datastore_root_dir = Path(
+        database_client.get_datastore(datastore_id).directory
+    )
+    cache_events.refresh_if_changed(datastore_root_dir)
+    return datastore_root_dir
@@ -7,7 +7,10 @@ from datastore_api.adapter.auth.dependencies import (
 )
 from datastore_api.adapter.db.models import Datastore, UserInfo
 from datastore_api.api import observability
-from datastore_api.api.common.dependencies import get_datastore_id
+from datastore_api.api.common.dependencies import (
+    get_async_database_client,
+    get_datastore_id,
+)
 from datastore_api.api.datastores import (
     data,
     importable_datasets,
@@ -30,26 +33,28 @@ router = APIRouter()
 
 @router.get("", dependencies=[Depends(authorize_datastore_provisioner)])
 async def get_datastores(
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
 ) -> list[Datastore]:
-    return db_client.get_datastores()
+    return await db_client.get_datastores()
 
 
 @router.post("")
 async def new_datastore(
     validated_body: NewDatastoreRequest,
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
     user_info: UserInfo = Depends(authorize_datastore_provisioner),
 ) -> NewJobResponse:
     new_datastore = validated_body.generate_new_datastore_from_request()
-    return create_new_datastore(new_datastore, db_client, user_info)
+    return await db_client.run(
+        lambda client: create_new_datastore(new_datastore, client, user_info)
+    )
 
 
 @router.get("/rdns")
 async def get_datastores_rdns(
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
 ) -> list[str]:
-    datastores = db_client.get_datastores()
+    datastores = await db_client.get_datastores()
     return [datastore.rdn for datastore in datastores]
 
 
@@ -57,10 +62,10 @@ async def get_datastores_rdns(
     "/{datastore_rdn}", dependencies=[Depends(authorize_datastore_provisioner)]
 )
 async def get_datastore(
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
     datastore_id: int = Depends(get_datastore_id),
 ) -> Datastore:
-    return db_client.get_datastore(datastore_id)
+    return await db_client.get_datastore(datastore_id)
 
 
 @router.delete(
@@ -68,19 +73,19 @@ async def get_datastore(
 )
 async def delete_datastore(
     datastore_id: int = Depends(get_datastore_id),
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
 ) -> None:
-    db_client.delete_datastore(datastore_id)
+    await db_client.delete_datastore(datastore_id)
 
 
 @router.get(
     "/{datastore_rdn}/directory", dependencies=[Depends(authorize_api_key)]
 )
 async def get_datastore_directory(
-    db_client: db.DatabaseClient = Depends(db.get_database_client),
+    db_client: db.AsyncDatabaseClient = Depends(get_async_database_client),
     datastore_id: int = Depends(get_datastore_id),
 ) -> str:
-    return db_client.get_datastore(datastore_id).directory
+    return (await db_client.get_datastore(datastore_id)).directory
 
 
 router.include_router(jobs.router, prefix="/{datastore_rdn}/jobs")
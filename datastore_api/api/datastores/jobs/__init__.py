@@ -1,7 +1,8 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from datastore_api.adapter import db
 from datastore_api.adapter.auth.dependencies import (
@@ -10,11 +11,16 @@ from datastore_api.adapter.auth.dependencies import (
 )
 from datastore_api.adapter.db.models import Job, JobStatus, Operation, UserInfo
 from datastore_api.api.common.dependencies import (
+    get_async_database_client,
     get_datastore_id,
 )
+from datastore_api.api.jobs.events import job_event_response
 from datastore_api.api.jobs.models import (
+    JOB_PAGE_RESPONSES,
+    JobPageQuery,
     NewJobResponse,
     NewJobsRequest,
+    get_job_page_query,
 )
 from datastore_api.common.exceptions import (
     BumpingDisabledException,
@@ -29,22 +35,60 @@ router = APIRouter()
 @router.get(
     "",
     response_model_exclude_none=True,
+    responses=JOB_PAGE_RESPONSES,
     dependencies=[Depends(authorize_data_administrator)],
 )
 def get_jobs_for_datastore(
+    response: Response,
     status: Optional[str] = Query(None),
     operation: Optional[str] = Query(None),
     ignoreCompleted: bool = Query(False),
+    includeLogs: bool = Query(False),
+    includeBumpManifesto: bool = Query(False),
+    page: JobPageQuery = Depends(get_job_page_query),
     database_client: db.DatabaseClient = Depends(db.get_database_client),
     datastore_id: int = Depends(get_datastore_id),
 ) -> list[Job]:
-    return database_client.get_jobs(
+    """
+    Returns the jobs of the datastore, oldest first unless newestFirst is
+    set. If limit is given, at most limit jobs are returned, and if there
+    are more, the X-Next-Cursor response header is set to the cursor of
+    the next page.
+    """
+    jobs = database_client.get_jobs(
         datastore_id=datastore_id,
         status=JobStatus(status) if status else None,
         operations=[Operation(op) for op in operation.split(",")]
         if operation is not None
         else None,
         ignore_completed=ignoreCompleted,
+        limit=page.fetch_limit,
+        after_job_id=page.cursor,
+        newest_first=page.newest_first,
+        include_logs=includeLogs,
+        include_bump_manifestos=includeBumpManifesto,
+    )
+    return page.paginate(jobs, response)
+
+
+@router.get("/events", dependencies=[Depends(authorize_data_administrator)])
+async def get_job_events_for_datastore(
+    request: Request,
+    datastore_rdn: str,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+    database_client: db.AsyncDatabaseClient = Depends(
+        get_async_database_client
+    ),
+    datastore_id: int = Depends(get_datastore_id),
+) -> StreamingResponse:
+    """
+    Streams the status transitions and log entries of the jobs of the
+    datastore as server-sent events, resuming after Last-Event-ID if given.
+    Answers 503 when the worker already serves as many streams as it
+    allows.
+    """
+    return job_event_response(
+        request, database_client, datastore_id, datastore_rdn, last_event_id
     )
 
 
@@ -74,32 +118,28 @@ def new_job(
         authorize_data_administrator_with_user_info
     ),
 ) -> list[NewJobResponse]:
-    response_list = []
+    bump_enabled = database_client.get_datastore(datastore_id).bump_enabled
+    response_list: list[NewJobResponse | None] = []
+    new_jobs: list[tuple[int, Job]] = []
     for job_request in validated_body.jobs:
         try:
             if (
                 job_request.target == "DATASTORE"
                 and job_request.operation == "BUMP"
-                and database_client.get_datastore(datastore_id).bump_enabled
-                is False
+                and bump_enabled is False
             ):
                 raise BumpingDisabledException(
                     "Bumping the datastore is disabled"
                 )
-            else:
-                job = database_client.insert_new_job(
+            new_jobs.append(
+                (
+                    len(response_list),
                     job_request.generate_job_from_request(
                         "", parsed_user_info, datastore_rdn
-                    )
-                )
-                response_list.append(
-                    NewJobResponse(
-                        status="queued",
-                        msg="CREATED",
-                        job_id=str(job.job_id),
-                    )
+                    ),
                 )
-            database_client.update_target(job)
+            )
+            response_list.append(None)
         except BumpingDisabledException as e:
             logger.exception(e)
             response_list.append(
@@ -110,5 +150,23 @@ def new_job(
             )
         except Exception as e:
             logger.exception(e)
-            response_list.append({"status": "FAILED", "msg": "FAILED"})
+            response_list.append(NewJobResponse(status="FAILED", msg="FAILED"))
+    if new_jobs:
+        try:
+            results = database_client.insert_new_jobs(
+                [job for _, job in new_jobs]
+            )
+        except Exception as e:
+            logger.exception(e)
+            results = [e] * len(new_jobs)
+        for (index, _), result in zip(new_jobs, results):
+            if isinstance(result, Exception):
+                logger.error(result)
+                response_list[index] = NewJobResponse(
+                    status="FAILED", msg="FAILED"
+                )
+            else:
+                response_list[index] = NewJobResponse(
+                    status="queued", msg="CREATED", job_id=str(result.job_id)
+                )
     return response_list
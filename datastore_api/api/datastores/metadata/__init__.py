@@ -4,20 +4,32 @@ from fastapi import APIRouter, Depends
 
 from datastore_api.api.common.dependencies import get_datastore_root_dir
 from datastore_api.api.datastores.metadata.models import (
+    CodeListQuery,
+    DataStoreQuery,
+    MetadataDiffQuery,
     MetadataQuery,
     NameParam,
+    SearchQuery,
+    get_code_list_query,
+    get_data_store_query,
+    get_metadata_diff_query,
     get_metadata_query,
+    get_search_query,
 )
-from datastore_api.domain import metadata
+from datastore_api.domain import metadata, metadata_search
+from datastore_api.domain.metadata_search import SearchResult
 
 router = APIRouter()
 
 
 @router.get("/data-store")
 def get_data_store(
+    query: DataStoreQuery = Depends(get_data_store_query),
     datastore_root_dir: Path = Depends(get_datastore_root_dir),
 ) -> dict:
-    return metadata.find_all_datastore_versions(datastore_root_dir)
+    return metadata.find_all_datastore_versions(
+        datastore_root_dir, query.limit, query.cursor, query.summary
+    )
 
 
 @router.get("/data-structures/status")
@@ -50,6 +62,46 @@ def get_data_structures(
         query.version,
         query.include_attributes,
         query.skip_code_lists,
+        query.fields_as_list(),
+    )
+
+
+@router.get(
+    "/data-structures/{data_structure_name}/variables/{variable_name}/code-list"
+)
+def get_code_list(
+    data_structure_name: str,
+    variable_name: str,
+    query: CodeListQuery = Depends(get_code_list_query),
+    datastore_root_dir: Path = Depends(get_datastore_root_dir),
+) -> dict:
+    return metadata.find_code_list(
+        datastore_root_dir,
+        query.version,
+        data_structure_name,
+        variable_name,
+        query.codes_as_list(),
+        query.search,
+    )
+
+
+@router.get("/diff")
+def get_metadata_diff(
+    query: MetadataDiffQuery = Depends(get_metadata_diff_query),
+    datastore_root_dir: Path = Depends(get_datastore_root_dir),
+) -> dict:
+    return metadata.find_metadata_diff(
+        datastore_root_dir, query.from_version, query.to_version
+    )
+
+
+@router.get("/search", response_model_exclude_none=True)
+def search_metadata(
+    query: SearchQuery = Depends(get_search_query),
+    datastore_root_dir: Path = Depends(get_datastore_root_dir),
+) -> SearchResult:
+    return metadata_search.search(
+        datastore_root_dir, query.version, query.q, query.limit, query.offset
     )
 
 
@@ -66,5 +118,8 @@ def get_all_metadata(
     datastore_root_dir: Path = Depends(get_datastore_root_dir),
 ) -> dict:
     return metadata.find_all_metadata(
-        query.version, datastore_root_dir, query.skip_code_lists
+        query.version,
+        datastore_root_dir,
+        query.skip_code_lists,
+        query.fields_as_list(),
     )
@@ -9,10 +9,14 @@ class MetadataQuery(BaseModel, extra="forbid", validate_assignment=True):
     version: Version
     include_attributes: bool = True
     skip_code_lists: bool = False
+    fields: str | None = None
 
     def names_as_list(self) -> list[str]:
         return [] if self.names is None else self.names.split(",")
 
+    def fields_as_list(self) -> list[str]:
+        return [] if self.fields is None else self.fields.split(",")
+
 
 class NameParam(BaseModel, extra="forbid"):
     names: str
@@ -26,6 +30,13 @@ def get_metadata_query(
     version: str = Query(..., description="Semantic version (e.g. 1.2.3.4)"),
     include_attributes: bool = Query(True),
     skip_code_lists: bool = Query(False),
+    fields: str | None = Query(
+        None,
+        description=(
+            "Comma separated dotted paths of data structure fields to "
+            "include (e.g. name,measureVariable.label)"
+        ),
+    ),
 ) -> MetadataQuery:
     try:
         return MetadataQuery(
@@ -33,9 +44,108 @@ def get_metadata_query(
             version=Version.from_str(version),
             include_attributes=include_attributes,
             skip_code_lists=skip_code_lists,
+            fields=fields,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+
+class CodeListQuery(BaseModel, extra="forbid"):
+    version: Version
+    codes: str | None = None
+    search: str | None = None
+
+    def codes_as_list(self) -> list[str]:
+        return [] if self.codes is None else self.codes.split(",")
+
+
+def get_code_list_query(
+    version: str = Query(..., description="Semantic version (e.g. 1.2.3.4)"),
+    codes: str | None = Query(
+        None, description="Comma separated codes to include"
+    ),
+    search: str | None = Query(
+        None, description="Case-insensitive search in the category labels"
+    ),
+) -> CodeListQuery:
+    try:
+        return CodeListQuery(
+            version=Version.from_str(version), codes=codes, search=search
         )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e),
         )
+
+
+class MetadataDiffQuery(BaseModel, extra="forbid"):
+    from_version: Version
+    to_version: Version
+
+
+def get_metadata_diff_query(
+    from_version: str = Query(
+        ..., alias="from", description="Semantic version (e.g. 1.2.3.4)"
+    ),
+    to_version: str = Query(
+        ..., alias="to", description="Semantic version (e.g. 1.2.3.4)"
+    ),
+) -> MetadataDiffQuery:
+    try:
+        return MetadataDiffQuery(
+            from_version=Version.from_str(from_version),
+            to_version=Version.from_str(to_version),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+
+class SearchQuery(BaseModel, extra="forbid"):
+    q: str
+    version: Version
+    limit: int = 20
+    offset: int = 0
+
+
+def get_search_query(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    version: str = Query(..., description="Semantic version (e.g. 1.2.3.4)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+) -> SearchQuery:
+    try:
+        return SearchQuery(
+            q=q, version=Version.from_str(version), limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+
+class DataStoreQuery(BaseModel, extra="forbid"):
+    limit: int | None = None
+    cursor: str | None = None
+    summary: bool = False
+
+
+def get_data_store_query(
+    limit: int | None = Query(
+        None, ge=1, description="Maximum number of versions to return"
+    ),
+    cursor: str | None = Query(
+        None, description="The nextCursor of the previous page"
+    ),
+    summary: bool = Query(
+        False, description="Leave out the dataStructureUpdates"
+    ),
+) -> DataStoreQuery:
+    return DataStoreQuery(limit=limit, cursor=cursor, summary=summary)
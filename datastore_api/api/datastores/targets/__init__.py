@@ -1,6 +1,6 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 
 from datastore_api.adapter import db
 from datastore_api.adapter.auth.dependencies import authorize_data_administrator
@@ -8,6 +8,11 @@ from datastore_api.adapter.db.models import Job, Target
 from datastore_api.api.common.dependencies import (
     get_datastore_id,
 )
+from datastore_api.api.jobs.models import (
+    JOB_PAGE_RESPONSES,
+    JobPageQuery,
+    get_job_page_query,
+)
 
 logger = logging.getLogger()
 router = APIRouter()
@@ -28,13 +33,31 @@ def get_targets(
 @router.get(
     "/{name}/jobs",
     response_model_exclude_none=True,
+    responses=JOB_PAGE_RESPONSES,
     dependencies=[Depends(authorize_data_administrator)],
 )
 def get_target_jobs(
     name: str,
+    response: Response,
+    includeLogs: bool = Query(False),
+    includeBumpManifesto: bool = Query(False),
+    page: JobPageQuery = Depends(get_job_page_query),
     database_client: db.DatabaseClient = Depends(db.get_database_client),
     datastore_id: int = Depends(get_datastore_id),
 ) -> list[Job]:
-    return database_client.get_jobs_for_target(
-        name=name, datastore_id=datastore_id
+    """
+    Returns the jobs of the target, oldest first unless newestFirst is
+    set. If limit is given, at most limit jobs are returned, and if there
+    are more, the X-Next-Cursor response header is set to the cursor of
+    the next page.
+    """
+    jobs = database_client.get_jobs_for_target(
+        name=name,
+        datastore_id=datastore_id,
+        limit=page.fetch_limit,
+        after_job_id=page.cursor,
+        newest_first=page.newest_first,
+        include_logs=includeLogs,
+        include_bump_manifestos=includeBumpManifesto,
     )
+    return page.paginate(jobs, response)
@@ -1,38 +1,121 @@
+import asyncio
 import logging
+import time
+from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from datastore_api.adapter import db
 from datastore_api.adapter.auth.dependencies import authorize_api_key
-from datastore_api.adapter.db.models import Job, JobStatus, Operation
+from datastore_api.adapter.db.models import (
+    Job,
+    JobLogEntry,
+    JobStatus,
+    Operation,
+)
+from datastore_api.api.common.dependencies import get_async_database_client
+from datastore_api.api.jobs.events import job_event_response
 from datastore_api.api.jobs.models import (
+    JOB_PAGE_RESPONSES,
+    ClaimJobsRequest,
+    JobPageQuery,
     UpdateJobRequest,
+    get_job_page_query,
 )
+from datastore_api.domain import cache_events
 
 logger = logging.getLogger()
 
 router = APIRouter()
 
+CLAIM_POLL_INTERVAL_SECONDS = 1.0
+
 
 @router.get(
     "",
     response_model_exclude_none=True,
+    responses=JOB_PAGE_RESPONSES,
     dependencies=[Depends(authorize_api_key)],
 )
 def get_jobs(
+    response: Response,
     status: Optional[str] = Query(None),
     operation: Optional[str] = Query(None),
     ignoreCompleted: bool = Query(False),
+    includeLogs: bool = Query(False),
+    includeBumpManifesto: bool = Query(False),
+    page: JobPageQuery = Depends(get_job_page_query),
     database_client: db.DatabaseClient = Depends(db.get_database_client),
 ) -> list[Job]:
-    return database_client.get_jobs(
+    """
+    Returns the jobs of all datastores, oldest first unless newestFirst is
+    set. If limit is given, at most limit jobs are returned, and if there
+    are more, the X-Next-Cursor response header is set to the cursor of
+    the next page.
+    """
+    jobs = database_client.get_jobs(
         datastore_id=None,
         status=JobStatus(status) if status else None,
         operations=[Operation(op) for op in operation.split(",")]
         if operation is not None
         else None,
         ignore_completed=ignoreCompleted,
+        limit=page.fetch_limit,
+        after_job_id=page.cursor,
+        newest_first=page.newest_first,
+        include_logs=includeLogs,
+        include_bump_manifestos=includeBumpManifesto,
+    )
+    return page.paginate(jobs, response)
+
+
+@router.post(
+    "/claim",
+    response_model_exclude_none=True,
+    dependencies=[Depends(authorize_api_key)],
+)
+async def claim_jobs(
+    request: Request,
+    validated_body: ClaimJobsRequest,
+    database_client: db.AsyncDatabaseClient = Depends(
+        get_async_database_client
+    ),
+) -> list[Job]:
+    """
+    Claims up to limit of the oldest queued jobs by setting their status to
+    initiated. If none are queued, the request is held for up to
+    waitSeconds, checking for new jobs every second, and not claiming any
+    once the client has gone away.
+    """
+    deadline = time.monotonic() + validated_body.wait_seconds
+    while not await request.is_disconnected():
+        jobs = await database_client.claim_jobs(
+            validated_body.limit, validated_body.operations
+        )
+        remaining = deadline - time.monotonic()
+        if jobs or remaining <= 0:
+            return jobs
+        await asyncio.sleep(min(CLAIM_POLL_INTERVAL_SECONDS, remaining))
+    return []
+
+
+@router.get("/events", dependencies=[Depends(authorize_api_key)])
+async def get_job_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+    database_client: db.AsyncDatabaseClient = Depends(
+        get_async_database_client
+    ),
+) -> StreamingResponse:
+    """
+    Streams the status transitions and log entries of all jobs as
+    server-sent events, resuming after Last-Event-ID if given. Answers
+    503 when the worker already serves as many streams as it allows.
+    """
+    return job_event_response(
+        request, database_client, None, None, last_event_id
     )
 
 
@@ -48,6 +131,22 @@ def get_job(
     return database_client.get_job(job_id)
 
 
+@router.get(
+    "/{job_id}/logs",
+    response_model_exclude_none=True,
+    dependencies=[Depends(authorize_api_key)],
+)
+def get_job_logs(
+    job_id: str,
+    after: Optional[int] = Query(
+        None, ge=0, description="The logId of the last entry already read"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    database_client: db.DatabaseClient = Depends(db.get_database_client),
+) -> list[JobLogEntry]:
+    return database_client.get_job_logs(job_id, after_log_id=after, limit=limit)
+
+
 @router.put("/{job_id}", dependencies=[Depends(authorize_api_key)])
 def update_job(
     job_id: str,
@@ -67,4 +166,9 @@ def update_job(
         and job.parameters.operation == Operation.BUMP
     ):
         database_client.update_bump_targets(job)
+    if job.status == JobStatus.COMPLETED:
+        datastore = database_client.get_datastore(
+            database_client.get_datastore_id_from_rdn(job.datastore_rdn)
+        )
+        cache_events.on_job_completed(job, Path(datastore.directory))
     return {"message": f"Updated job with jobId {job_id}"}
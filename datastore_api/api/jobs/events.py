@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from datastore_api.adapter import db
+from datastore_api.adapter.db.models import JobEvent
+from datastore_api.common.exceptions import TooManyEventStreamsException
+
+logger = logging.getLogger()
+
+EVENT_POLL_INTERVAL_SECONDS = 1.0
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+MAX_EVENT_BATCH_SIZE = 500
+MAX_EVENT_STREAMS = 100
+
+
+def format_job_event(event: JobEvent) -> str:
+    """
+    Formats a job event as a server-sent event. The id is the id of the
+    job log entry, which clients send back as Last-Event-ID to resume.
+    """
+    event_type = "status" if event.status is not None else "log"
+    data = json.dumps(event.model_dump(by_alias=True, exclude_none=True))
+    return f"id: {event.log_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+@dataclass(eq=False)
+class _Subscription:
+    datastore_rdn: str | None
+    start_event_id: int
+    queue: asyncio.Queue[list[JobEvent]] = field(default_factory=asyncio.Queue)
+
+
+class JobEventBroadcaster:
+    """
+    Polls for new job events once for all event streams of a worker, and
+    fans them out to the streams, so that the number of open streams does
+    not add to the load on the database. The poller only runs while there
+    are streams, and at most max_streams streams are served at a time.
+    """
+
+    def __init__(self, max_streams: int) -> None:
+        self.max_streams = max_streams
+        self._subscriptions: set[_Subscription] = set()
+        self._last_event_id = 0
+        self._poller: asyncio.Task | None = None
+        self._start_lock = asyncio.Lock()
+
+    def check_capacity(self) -> None:
+        if len(self._subscriptions) >= self.max_streams:
+            raise TooManyEventStreamsException(
+                f"Already serving {len(self._subscriptions)} event streams"
+            )
+
+    async def subscribe(
+        self, database_client: db.AsyncDatabaseClient, datastore_rdn: str | None
+    ) -> _Subscription:
+        """
+        Subscribes to the events written after the latest event the poller
+        has seen, which is the start_event_id of the subscription.
+        """
+        async with self._start_lock:
+            if self._poller is None:
+                self._last_event_id = (
+                    await database_client.get_latest_job_event_id()
+                )
+                self._poller = asyncio.create_task(self._poll(database_client))
+        subscription = _Subscription(datastore_rdn, self._last_event_id)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    async def _poll(self, database_client: db.AsyncDatabaseClient) -> None:
+        while True:
+            await asyncio.sleep(EVENT_POLL_INTERVAL_SECONDS)
+            if not self._subscriptions:
+                self._poller = None
+                return
+            try:
+                events = await database_client.get_job_events(
+                    self._last_event_id, None, MAX_EVENT_BATCH_SIZE
+                )
+            except Exception as e:
+                logger.error(f"Failed to poll for job events: {e}")
+                continue
+            if not events:
+                continue
+            self._last_event_id = events[-1].log_id
+            for subscription in self._subscriptions:
+                matching = [
+                    event
+                    for event in events
+                    if subscription.datastore_rdn in (None, event.datastore_rdn)
+                ]
+                if matching:
+                    subscription.queue.put_nowait(matching)
+
+
+job_event_broadcaster = JobEventBroadcaster(MAX_EVENT_STREAMS)
+
+
+async def stream_job_events(
+    request: Request,
+    database_client: db.AsyncDatabaseClient,
+    datastore_id: int | None,
+    datastore_rdn: str | None,
+    last_event_id: int | None,
+) -> AsyncIterator[str]:
+    """
+    Yields the job events written after last_event_id, or after the
+    latest event if None, until the client goes away. Events written
+    before the stream subscribed to the broadcaster are read from the
+    database first. A comment is sent when there has been nothing to send
+    for a while, so that idle connections are kept open.
+    """
+    subscription = await job_event_broadcaster.subscribe(
+        database_client, datastore_rdn
+    )
+    try:
+        if last_event_id is None:
+            last_event_id = subscription.start_event_id
+        while last_event_id < subscription.start_event_id:
+            events = await database_client.get_job_events(
+                last_event_id, datastore_id, MAX_EVENT_BATCH_SIZE
+            )
+            missed = [
+                event
+                for event in events
+                if event.log_id <= subscription.start_event_id
+            ]
+            for event in missed:
+                yield format_job_event(event)
+                last_event_id = event.log_id
+            if len(missed) < MAX_EVENT_BATCH_SIZE:
+                break
+        while not await request.is_disconnected():
+            try:
+                events = await asyncio.wait_for(
+                    subscription.queue.get(), HEARTBEAT_INTERVAL_SECONDS
+                )
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                if event.log_id > last_event_id:
+                    yield format_job_event(event)
+                    last_event_id = event.log_id
+    finally:
+        job_event_broadcaster.unsubscribe(subscription)
+
+
+def job_event_response(
+    request: Request,
+    database_client: db.AsyncDatabaseClient,
+    datastore_id: int | None,
+    datastore_rdn: str | None,
+    last_event_id: int | None,
+) -> StreamingResponse:
+    """
+    Raises TooManyEventStreamsException if the worker is already serving
+    as many event streams as it allows.
+    """
+    job_event_broadcaster.check_capacity()
+    return StreamingResponse(
+        stream_job_events(
+            request, database_client, datastore_id, datastore_rdn, last_event_id
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
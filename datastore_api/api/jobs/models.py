@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, model_validator
+from fastapi import Query, Response
+from pydantic import BaseModel, Field, model_validator
 
 from datastore_api.adapter.db.models import (
     DatastoreVersion,
@@ -98,9 +99,75 @@ class UpdateJobRequest(CamelModel, extra="forbid"):
     log: Optional[str] = None
 
 
+MAX_CLAIM_WAIT_SECONDS = 30
+
+
+class ClaimJobsRequest(CamelModel, extra="forbid"):
+    limit: int = Field(1, ge=1, le=100)
+    operations: list[Operation] | None = None
+    wait_seconds: float = Field(0, ge=0, le=MAX_CLAIM_WAIT_SECONDS)
+
+
 # Note: Using BaseModel instead of CamelModel as clients
 #       expect snake_case
 class NewJobResponse(BaseModel):
     status: str
     msg: str
     job_id: str | None = None
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+JOB_PAGE_RESPONSES: dict = {
+    200: {
+        "headers": {
+            NEXT_CURSOR_HEADER: {
+                "description": "Set if limit was given and there are more "
+                "jobs. Pass it as cursor to get the next page.",
+                "schema": {"type": "string"},
+            }
+        }
+    }
+}
+
+
+class JobPageQuery(BaseModel, extra="forbid"):
+    limit: int | None = None
+    cursor: str | None = None
+    newest_first: bool = False
+
+    @property
+    def fetch_limit(self) -> int | None:
+        """
+        Fetch one job more than requested, to know if there is a next page.
+        """
+        return self.limit + 1 if self.limit is not None else None
+
+    def paginate(self, jobs: list[Job], response: Response) -> list[Job]:
+        """
+        Trims jobs fetched with fetch_limit to the requested limit, and
+        sets the X-Next-Cursor header if there are more jobs.
+        """
+        if self.limit is None or len(jobs) <= self.limit:
+            return jobs
+        page = jobs[: self.limit]
+        response.headers[NEXT_CURSOR_HEADER] = page[-1].job_id
+        return page
+
+
+def get_job_page_query(
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=1000,
+        description="Maximum number of jobs to return. All jobs if not set",
+    ),
+    cursor: str | None = Query(
+        None,
+        pattern=r"^\d+$",
+        description="The X-Next-Cursor header of the previous page",
+    ),
+    newestFirst: bool = Query(
+        False, description="List the newest jobs first instead of the oldest"
+    ),
+) -> JobPageQuery:
+    return JobPageQuery(limit=limit, cursor=cursor, newest_first=newestFirst)
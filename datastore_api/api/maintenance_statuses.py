@@ -1,10 +1,11 @@
 import logging
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 
 from datastore_api.adapter import db
 from datastore_api.adapter.auth.dependencies import authorize_api_key
 from datastore_api.adapter.db.models import MaintenanceStatus
+from datastore_api.api.jobs.models import NEXT_CURSOR_HEADER
 from datastore_api.common.models import CamelModel
 
 logger = logging.getLogger()
@@ -28,9 +29,26 @@ def set_status(
 
 @router.get("")
 def get_history(
+    response: Response,
+    limit: int | None = Query(
+        None, ge=1, le=1000, description="Maximum number of entries to return"
+    ),
+    cursor: str | None = Query(
+        None,
+        pattern=r"^\d+$",
+        description="The X-Next-Cursor header of the previous page",
+    ),
     database_client: db.DatabaseClient = Depends(db.get_database_client),
 ) -> list[MaintenanceStatus]:
-    return database_client.get_maintenance_history()
+    history = database_client.get_maintenance_history(
+        limit=limit + 1 if limit is not None else None,
+        before_maintenance_id=cursor,
+    )
+    if limit is None or len(history) <= limit:
+        return history
+    page = history[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = str(page[-1].maintenance_id)
+    return page
 
 
 @router.get("/latest")
@@ -1,5 +1,12 @@
 from fastapi import APIRouter
 
+from datastore_api.adapter.local_storage.metadata_cache import (
+    MetadataCacheStats,
+    metadata_cache,
+)
+from datastore_api.domain import warmup
+from datastore_api.domain.warmup import WarmupStatus
+
 router = APIRouter()
 
 
@@ -11,3 +18,13 @@ async def alive() -> str:
 @router.get("/ready")
 async def ready() -> str:
     return "I'm ready!"
+
+
+@router.get("/warmup")
+async def get_warmup_status() -> WarmupStatus:
+    return warmup.get_warmup_status()
+
+
+@router.get("/metadata-cache")
+async def get_metadata_cache_stats() -> MetadataCacheStats:
+    return metadata_cache.stats()
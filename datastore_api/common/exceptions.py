@@ -62,3 +62,6 @@ class PublicKeyInvalidException(Exception): ...
 
 
 class StartUpException(Exception): ...
+
+
+class TooManyEventStreamsException(Exception): ...
@@ -0,0 +1,55 @@
+"""
+Compiles the metadata_all files of the released versions in one or more
+datastores into the memory-mappable format read by the datastore API.
+
+    python -m datastore_api.compile_metadata DATASTORE_ROOT_DIR [...]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from datastore_api.adapter.local_storage.compiled_metadata_all import (
+    compile_metadata_all,
+)
+from datastore_api.common.exceptions import InvalidStorageFormatException
+
+logger = logging.getLogger()
+
+
+def compile_datastore(datastore_root_dir: Path) -> list[Path]:
+    """
+    Compiles every released metadata_all file in the datastore. Returns the
+    paths of the metadata_all files that could not be compiled.
+    """
+    failed = []
+    for metadata_all_file_path in sorted(
+        (datastore_root_dir / "datastore").glob("metadata_all__*.json")
+    ):
+        if metadata_all_file_path.stem.endswith("__DRAFT"):
+            continue
+        try:
+            compiled_path = compile_metadata_all(metadata_all_file_path)
+            logger.info(f"Compiled {metadata_all_file_path} to {compiled_path}")
+        except (OSError, InvalidStorageFormatException) as e:
+            logger.error(f"Could not compile {metadata_all_file_path}: {e}")
+            failed.append(metadata_all_file_path)
+    return failed
+
+
+def main(args: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("datastore_root_dirs", nargs="+", type=Path)
+    parsed = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    failed = [
+        path
+        for datastore_root_dir in parsed.datastore_root_dirs
+        for path in compile_datastore(datastore_root_dir)
+    ]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
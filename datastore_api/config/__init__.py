@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 from dataclasses import dataclass
 from typing import Literal
 
@@ -16,6 +17,14 @@ class Environment:
     datastores_root_dir: str
     migrations_dir: str
     baseline_file: str | None
+    metadata_cache_max_bytes: int
+    metadata_warmup: bool
+    metadata_all_streaming_threshold_bytes: int
+    metadata_compile_on_load: bool
+    shared_state_dir: str
+    sqlite_busy_timeout_ms: int
+    job_retention_days: int | None
+    job_retention_interval_seconds: int
 
 
 def _initialize_environment() -> Environment:
@@ -33,6 +42,33 @@ def _initialize_environment() -> Environment:
         datastores_root_dir=os.environ["DATASTORES_ROOT_DIR"],
         migrations_dir=os.environ.get("MIGRATIONS_DIR", "migrations"),
         baseline_file=os.environ.get("BASELINE_FILE", None),
+        metadata_cache_max_bytes=int(
+            os.environ.get("METADATA_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+        ),
+        metadata_warmup=os.environ.get("METADATA_WARMUP", "OFF") == "ON",
+        metadata_all_streaming_threshold_bytes=int(
+            os.environ.get(
+                "METADATA_ALL_STREAMING_THRESHOLD_BYTES", 64 * 1024 * 1024
+            )
+        ),
+        metadata_compile_on_load=(
+            os.environ.get("METADATA_COMPILE_ON_LOAD", "OFF") == "ON"
+        ),
+        shared_state_dir=os.environ.get(
+            "SHARED_STATE_DIR",
+            os.path.join(tempfile.gettempdir(), "datastore-api"),
+        ),
+        sqlite_busy_timeout_ms=int(
+            os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)
+        ),
+        job_retention_days=(
+            int(os.environ["JOB_RETENTION_DAYS"])
+            if "JOB_RETENTION_DAYS" in os.environ
+            else None
+        ),
+        job_retention_interval_seconds=int(
+            os.environ.get("JOB_RETENTION_INTERVAL_SECONDS", 3600)
+        ),
     )
 
 
@@ -0,0 +1,68 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from datastore_api.adapter.db.models import Job, Operation
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.generation_counter import (
+    datastore_generations,
+)
+from datastore_api.domain import warmup
+
+logger = logging.getLogger()
+
+_preload_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="metadata-preload"
+)
+_seen_generations_lock = threading.Lock()
+_seen_generations: dict[str, int] = {}
+
+
+def on_job_completed(job: Job, datastore_root_dir: Path) -> None:
+    """
+    Hook for jobs that have been marked as completed. A completed job has
+    changed the files of the datastore: an import rewrites the draft, and
+    a BUMP releases a new version. The generation of the datastore is
+    incremented, so that every worker drops what it holds for the
+    datastore on its next request, and this worker refreshes right away.
+    """
+    generation = datastore_generations.increment(datastore_root_dir.name)
+    logger.info(
+        f"Job {job.job_id} ({job.parameters.operation}) completed, "
+        f"{datastore_root_dir.name} is now at generation {generation}"
+    )
+    with _seen_generations_lock:
+        _seen_generations[datastore_root_dir.name] = generation
+    _refresh(
+        datastore_root_dir,
+        preload=job.parameters.operation == Operation.BUMP,
+    )
+
+
+def refresh_if_changed(datastore_root_dir: Path) -> None:
+    """
+    Checks the shared generation of the datastore, and refreshes if it
+    changed since this worker last saw it. Costs a single stat.
+    """
+    key = datastore_root_dir.name
+    generation = datastore_generations.get(key)
+    with _seen_generations_lock:
+        seen = _seen_generations.get(key)
+        if seen == generation:
+            return
+        _seen_generations[key] = generation
+    if seen is not None:
+        _refresh(datastore_root_dir, preload=True)
+
+
+def _refresh(datastore_root_dir: Path, preload: bool) -> None:
+    """
+    Drops the parsed draft and version files of the datastore, and
+    preloads its latest version in the background.
+    """
+    datastore_directory.forget_datastore_files(datastore_root_dir)
+    if preload:
+        _preload_executor.submit(
+            warmup.preload_latest_version, datastore_root_dir
+        )
@@ -6,6 +6,7 @@ from pyarrow import ArrowTypeError, Table, dataset
 from datastore_api.adapter.local_storage import (
     datastore_directory,
 )
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
 from datastore_api.common.models import Version
 from datastore_api.domain.data import filters
 
@@ -13,6 +14,8 @@ logger = logging.getLogger()
 
 EMPTY_RESULT_TEXT = "empty_result"
 ALL_COLUMNS = ["unit_id", "value", "start_epoch_days", "stop_epoch_days"]
+# Approximate memory held by a dataset handle per file
+DATASET_HANDLE_NBYTES = 4096
 
 
 def process_event_request(
@@ -72,6 +75,27 @@ def process_fixed_request(
     )
 
 
+def get_dataset(
+    dataset_name: str, version: Version, datastore_root_dir: Path
+) -> dataset.Dataset:
+    """
+    Returns the pyarrow dataset for a released version of a dataset.
+    Released data files never change, so the dataset, with its discovered
+    files and schema, is kept in the metadata cache.
+    """
+
+    def load() -> tuple[dataset.Dataset, int]:
+        parquet_path = datastore_directory.get_data_path_from_data_versions(
+            dataset_name, version, datastore_root_dir
+        )
+        data = dataset.dataset(parquet_path)
+        return data, DATASET_HANDLE_NBYTES * len(data.files)
+
+    return metadata_cache.get_or_load(
+        datastore_root_dir, version, ("dataset", dataset_name), load
+    )
+
+
 def _read_parquet(
     dataset_name: str,
     version: Version,
@@ -98,21 +122,18 @@ def _read_parquet(
             parquet_path = datastore_directory.get_draft_data_file_path(
                 dataset_name, datastore_root_dir
             )
-        else:
-            parquet_path = datastore_directory.get_data_path_from_data_versions(
-                dataset_name, version, datastore_root_dir
-            )
 
-        if parquet_path is None:
-            latest_version = datastore_directory.get_latest_version(
-                datastore_root_dir
-            )
-            parquet_path = datastore_directory.get_data_path_from_data_versions(
-                dataset_name, latest_version, datastore_root_dir
+        if parquet_path is not None:
+            data = dataset.dataset(parquet_path)
+        else:
+            data = get_dataset(
+                dataset_name,
+                datastore_directory.get_latest_version(datastore_root_dir)
+                if version.is_draft()
+                else version,
+                datastore_root_dir,
             )
-        table = dataset.dataset(parquet_path).to_table(
-            filter=table_filter, columns=columns
-        )
+        table = data.to_table(filter=table_filter, columns=columns)
         logger.info(f"Number of rows in result set: {table.num_rows}")
         return table
     except ArrowTypeError as e:
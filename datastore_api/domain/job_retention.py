@@ -0,0 +1,106 @@
+import fcntl
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from datastore_api.adapter import db
+
+logger = logging.getLogger()
+
+ARCHIVE_BATCH_SIZE = 200
+
+
+def archive_old_jobs(
+    database_client: db.DatabaseClient, retention_days: int
+) -> int:
+    """
+    Archives the completed and failed jobs created more than
+    retention_days ago, in batches of ARCHIVE_BATCH_SIZE jobs, each in its
+    own write transaction so that other writes are never held up for
+    long. Compacts the database afterwards if any jobs were archived.
+    Returns the number of jobs archived.
+    """
+    created_before = datetime.now() - timedelta(days=retention_days)
+    archived = 0
+    while True:
+        batch_count = database_client.archive_jobs(
+            created_before, ARCHIVE_BATCH_SIZE
+        )
+        archived += batch_count
+        if batch_count < ARCHIVE_BATCH_SIZE:
+            break
+    if archived:
+        logger.info(
+            f"Archived {archived} jobs older than {retention_days} days"
+        )
+        database_client.compact()
+    return archived
+
+
+class JobRetentionScheduler:
+    """
+    Archives old jobs every interval_seconds in a background thread.
+    Every worker runs a scheduler, but only the one holding the lock file
+    archives, so that archiving and compaction never run concurrently.
+    The lock is held until the scheduler stops, or its process dies, after
+    which the scheduler of another worker takes over.
+    """
+
+    def __init__(
+        self,
+        database_client: db.DatabaseClient,
+        retention_days: int,
+        interval_seconds: int,
+        lock_path: Path,
+    ) -> None:
+        self._database_client = database_client
+        self._retention_days = retention_days
+        self._interval_seconds = interval_seconds
+        self._lock_path = lock_path
+        self._lock_fd: int | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="job-retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._release_lock()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval_seconds):
+            if not self._acquire_lock():
+                continue
+            try:
+                archive_old_jobs(self._database_client, self._retention_days)
+            except Exception as e:
+                logger.error(f"Failed to archive old jobs: {e}")
+
+    def _acquire_lock(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._lock_path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        logger.info(f"Running job retention in process {os.getpid()}")
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
@@ -1,24 +1,69 @@
-from itertools import chain
+import json
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 
 from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
 from datastore_api.common.exceptions import (
     InvalidDraftVersionException,
-    InvalidStorageFormatException,
+    NotFoundException,
+    RequestValidationException,
 )
 from datastore_api.common.models import Version
+from datastore_api.domain import projection
 
 
-def find_all_datastore_versions(datastore_root_dir: Path) -> dict:
+def find_all_datastore_versions(
+    datastore_root_dir: Path,
+    limit: int | None = None,
+    cursor: str | None = None,
+    summary: bool = False,
+) -> dict:
+    """
+    Returns the datastore versions, newest first and starting with the
+    draft if there is one. With a limit, at most limit versions are
+    returned and nextCursor is set to the version to continue after when
+    more versions remain. In summary mode the dataStructureUpdates of
+    each version are left out.
+    """
     draft_version = datastore_directory.get_draft_version(datastore_root_dir)
     datastore_versions = datastore_directory.get_datastore_versions(
         datastore_root_dir
     )
-
+    versions = datastore_versions["versions"]
     if draft_version:
-        datastore_versions["versions"].insert(0, draft_version)
+        versions = [draft_version, *versions]
 
-    return datastore_versions
+    if cursor is not None:
+        position = next(
+            (
+                index
+                for index, version in enumerate(versions)
+                if version["version"] == cursor
+            ),
+            None,
+        )
+        if position is None:
+            raise RequestValidationException(f"Unknown cursor: '{cursor}'")
+        versions = versions[position + 1 :]
+    next_cursor = None
+    if limit is not None and len(versions) > limit:
+        versions = versions[:limit]
+        next_cursor = versions[-1]["version"]
+    if summary:
+        versions = [
+            {
+                key: value
+                for key, value in version.items()
+                if key != "dataStructureUpdates"
+            }
+            for version in versions
+        ]
+
+    result = {**datastore_versions, "versions": versions}
+    if next_cursor is not None:
+        result["nextCursor"] = next_cursor
+    return result
 
 
 def find_current_data_structure_status(
@@ -49,33 +94,58 @@ def find_data_structures(
     version: Version,
     include_attributes: bool,
     skip_code_lists: bool = False,
+    fields: list[str] | None = None,
 ) -> list[dict]:
     _validate_version(version, datastore_root_dir)
-    metadata = (
-        datastore_directory.get_metadata_all(version, datastore_root_dir)
-        if not skip_code_lists
-        else find_all_metadata_skip_code_list_and_missing_values(
+    if fields:
+        matched = [
+            ds
+            for name, ds in _find_projected_data_structures(
+                version, datastore_root_dir, skip_code_lists, fields
+            )
+            if not names or name in names
+        ]
+    else:
+        data_structures = datastore_directory.get_data_structures(
             version, datastore_root_dir
         )
-    )
-
-    if names:
         matched = [
-            ds for ds in metadata["dataStructures"] if ds["name"] in names
+            data_structures[name]
+            for name in data_structures
+            if not names or name in names
         ]
-    else:
-        matched = metadata["dataStructures"]
+        if skip_code_lists:
+            matched = _without_code_list_and_missing_values(matched)
 
-    for match in matched:
-        if not include_attributes:
-            match.pop("attributeVariables", None)
+    if not include_attributes:
+        matched = [
+            {
+                key: value
+                for key, value in match.items()
+                if key != "attributeVariables"
+            }
+            for match in matched
+        ]
     return matched
 
 
 def find_all_metadata(
-    version: Version, datastore_root_dir: Path, skip_code_lists: bool = False
+    version: Version,
+    datastore_root_dir: Path,
+    skip_code_lists: bool = False,
+    fields: list[str] | None = None,
 ) -> dict:
     _validate_version(version, datastore_root_dir)
+    if fields:
+        return {
+            **datastore_directory.get_metadata_all(version, datastore_root_dir),
+            "dataStructures": [
+                ds
+                for _, ds in _find_projected_data_structures(
+                    version, datastore_root_dir, skip_code_lists, fields
+                )
+            ],
+        }
     return (
         datastore_directory.get_metadata_all(version, datastore_root_dir)
         if not skip_code_lists
@@ -85,6 +155,282 @@ def find_all_metadata(
     )
 
 
+def _find_projected_data_structures(
+    version: Version,
+    datastore_root_dir: Path,
+    skip_code_lists: bool,
+    fields: list[str],
+) -> list[tuple[str, dict]]:
+    """
+    Returns (name, projected data structure) pairs for all data structures
+    in the version. Projections of released versions are cached per
+    field set. Since clients choose the field sets, these entries are
+    never pinned and are evicted like any other derived entry.
+    """
+    normalized_fields = projection.normalize_fields(fields)
+
+    def load() -> tuple[list[tuple[str, dict]], int]:
+        data_structures = datastore_directory.get_data_structures(
+            version, datastore_root_dir
+        )
+        field_tree = projection.build_field_tree(normalized_fields)
+        projected = [
+            (
+                name,
+                projection.project(
+                    _strip_data_structure(ds) if skip_code_lists else ds,
+                    field_tree,
+                ),
+            )
+            for name, ds in data_structures.items()
+        ]
+        return projected, len(json.dumps(projected))
+
+    if version.is_draft():
+        return load()[0]
+    return metadata_cache.get_or_load(
+        datastore_root_dir,
+        version,
+        ("projection", normalized_fields, skip_code_lists),
+        load,
+    )
+
+
+def find_code_list(
+    datastore_root_dir: Path,
+    version: Version,
+    data_structure_name: str,
+    variable_name: str,
+    codes: list[str] | None = None,
+    search: str | None = None,
+) -> dict:
+    """
+    Returns the code lists and missing values of all represented variables
+    of one variable in a data structure. The code lists can be narrowed
+    down to a set of codes and/or a case-insensitive search in the
+    category labels.
+    """
+    _validate_version(version, datastore_root_dir)
+    represented_variables = _get_variable_index(
+        version, datastore_root_dir, data_structure_name
+    ).get(variable_name)
+    if represented_variables is None:
+        raise NotFoundException(
+            f"No variable {variable_name} in {data_structure_name} "
+            f"for version {version}"
+        )
+    search = search.casefold() if search else None
+    return {
+        "dataStructure": data_structure_name,
+        "variable": variable_name,
+        "representedVariables": [
+            {
+                "validPeriod": represented_variable.get("validPeriod"),
+                "codeList": [
+                    code_item
+                    for code_item in represented_variable["valueDomain"].get(
+                        "codeList", []
+                    )
+                    if (not codes or code_item.get("code") in codes)
+                    and (
+                        search is None
+                        or search in str(code_item.get("category")).casefold()
+                    )
+                ],
+                "missingValues": represented_variable["valueDomain"].get(
+                    "missingValues", []
+                ),
+            }
+            for represented_variable in represented_variables
+        ],
+    }
+
+
+VariableIndex = dict[str, list[dict]]
+
+
+def _get_variable_index(
+    version: Version, datastore_root_dir: Path, data_structure_name: str
+) -> VariableIndex:
+    """
+    Returns an index from variable name to the represented variables of
+    that variable for one data structure. Indexes of released versions are
+    built once per data structure, so that only the requested data
+    structure is decoded from oversized metadata_all files, and only the
+    requested code lists of it.
+    """
+
+    def load() -> tuple[VariableIndex, int]:
+        data_structure = datastore_directory.get_data_structure(
+            version, datastore_root_dir, data_structure_name
+        )
+        if data_structure is None:
+            raise NotFoundException(
+                f"No data structure {data_structure_name} for version {version}"
+            )
+        variable_index = {
+            variable["name"]: variable["representedVariables"]
+            for variable in variables_of(data_structure)
+        }
+        # Code lists left encoded take no memory in the index
+        return variable_index, len(
+            json.dumps(variable_index, default=lambda code_list: [])
+        )
+
+    if version.is_draft():
+        return load()[0]
+    return metadata_cache.get_or_load(
+        datastore_root_dir,
+        version,
+        ("variable_index", data_structure_name),
+        load,
+    )
+
+
+def variables_of(data_structure: dict) -> list[dict]:
+    return [
+        data_structure["measureVariable"],
+        *data_structure.get("identifierVariables", []),
+        *data_structure.get("attributeVariables", []),
+    ]
+
+
+VARIABLE_KEYS = ["measureVariable", "identifierVariables", "attributeVariables"]
+
+
+def find_metadata_diff(
+    datastore_root_dir: Path, from_version: Version, to_version: Version
+) -> dict:
+    """
+    Returns the structural diff between the metadata of two versions:
+    data structures added, removed and changed, with per-variable changes
+    and code list deltas for the changed ones.
+    Diffs between released versions are persisted in the datastore, as
+    released versions never change.
+    """
+    _validate_version(from_version, datastore_root_dir)
+    _validate_version(to_version, datastore_root_dir)
+    is_released = not from_version.is_draft() and not to_version.is_draft()
+    if is_released:
+        metadata_diff = datastore_directory.get_cached_metadata_diff(
+            from_version, to_version, datastore_root_dir
+        )
+        if metadata_diff is not None:
+            return metadata_diff
+    metadata_diff = {
+        "fromVersion": str(from_version),
+        "toVersion": str(to_version),
+        **_diff_data_structures(
+            datastore_directory.get_data_structures(
+                from_version, datastore_root_dir
+            ),
+            datastore_directory.get_data_structures(
+                to_version, datastore_root_dir
+            ),
+        ),
+    }
+    if is_released:
+        datastore_directory.write_metadata_diff(
+            from_version, to_version, datastore_root_dir, metadata_diff
+        )
+    return metadata_diff
+
+
+def _diff_data_structures(
+    from_by_name: Mapping[str, dict], to_by_name: Mapping[str, dict]
+) -> dict:
+    changed = []
+    for name in sorted(from_by_name.keys() & to_by_name.keys()):
+        from_ds, to_ds = from_by_name[name], to_by_name[name]
+        if from_ds == to_ds:
+            continue
+        changed.append(
+            {
+                "name": name,
+                "changedFields": _changed_fields(
+                    from_ds, to_ds, exclude=VARIABLE_KEYS
+                ),
+                "variables": _diff_variables(
+                    variables_of(from_ds), variables_of(to_ds)
+                ),
+            }
+        )
+    return {
+        "added": sorted(to_by_name.keys() - from_by_name.keys()),
+        "removed": sorted(from_by_name.keys() - to_by_name.keys()),
+        "changed": changed,
+    }
+
+
+def _diff_variables(
+    from_variables: list[dict], to_variables: list[dict]
+) -> list[dict]:
+    from_by_name = {variable["name"]: variable for variable in from_variables}
+    to_by_name = {variable["name"]: variable for variable in to_variables}
+    variable_diffs = []
+    for name in sorted(from_by_name.keys() | to_by_name.keys()):
+        if name not in from_by_name:
+            variable_diffs.append({"name": name, "change": "ADDED"})
+        elif name not in to_by_name:
+            variable_diffs.append({"name": name, "change": "REMOVED"})
+        elif from_by_name[name] != to_by_name[name]:
+            variable_diff = {
+                "name": name,
+                "change": "CHANGED",
+                "changedFields": _changed_fields(
+                    from_by_name[name], to_by_name[name]
+                ),
+            }
+            code_list_diff = _diff_code_lists(
+                from_by_name[name], to_by_name[name]
+            )
+            if code_list_diff is not None:
+                variable_diff["codeList"] = code_list_diff
+            variable_diffs.append(variable_diff)
+    return variable_diffs
+
+
+def _diff_code_lists(from_variable: dict, to_variable: dict) -> dict | None:
+    from_categories = _categories_by_code(from_variable)
+    to_categories = _categories_by_code(to_variable)
+    if from_categories == to_categories:
+        return None
+    return {
+        "added": sorted(to_categories.keys() - from_categories.keys()),
+        "removed": sorted(from_categories.keys() - to_categories.keys()),
+        "changed": sorted(
+            code
+            for code in from_categories.keys() & to_categories.keys()
+            if from_categories[code] != to_categories[code]
+        ),
+    }
+
+
+def _categories_by_code(variable: dict) -> dict:
+    """
+    Maps every code of the variable to its category, with the most recent
+    represented variable taking precedence.
+    """
+    return {
+        code_item["code"]: code_item.get("category")
+        for represented_variable in variable.get("representedVariables", [])
+        for code_item in represented_variable.get("valueDomain", {}).get(
+            "codeList", []
+        )
+    }
+
+
+def _changed_fields(
+    from_value: dict, to_value: dict, exclude: list[str] | None = None
+) -> list[str]:
+    return sorted(
+        key
+        for key in from_value.keys() | to_value.keys()
+        if key not in (exclude or [])
+        and from_value.get(key) != to_value.get(key)
+    )
+
+
 def find_all_data_structures_ever(datastore_root_dir: Path) -> list[str]:
     all_datastore_versions = find_all_datastore_versions(datastore_root_dir)
     datastore_versions = [ver for ver in all_datastore_versions["versions"]]
@@ -99,48 +445,68 @@ def find_all_metadata_skip_code_list_and_missing_values(
     version: Version, datastore_root_dir: Path
 ) -> dict:
     _validate_version(version, datastore_root_dir)
-    metadata_all = datastore_directory.get_metadata_all(
+    data_structures = datastore_directory.get_data_structures(
         version, datastore_root_dir
     )
-    if "dataStructures" in metadata_all:
-        _clear_code_list_and_missing_values(metadata_all["dataStructures"])
-    else:
-        raise InvalidStorageFormatException("Invalid metadata format")
-    return metadata_all
+    return {
+        **datastore_directory.get_metadata_all_header(
+            version, datastore_root_dir
+        ),
+        "dataStructures": _without_code_list_and_missing_values(
+            data_structures.values()
+        ),
+    }
 
 
-def _clear_code_list_and_missing_values(data_structures: list[dict]) -> None:
-    represented_variables = []
-    for metadata in data_structures:
-        represented_measure = metadata["measureVariable"][
-            "representedVariables"
-        ]
-        represented_identifiers = list(
-            chain(
-                *[
-                    identifier["representedVariables"]
-                    for identifier in metadata["identifierVariables"]
-                ]
-            )
-        )
-        represented_attributes = list(
-            chain(
-                *[
-                    attribute["representedVariables"]
-                    for attribute in metadata["attributeVariables"]
-                ]
-            )
-        )
-        represented_variables += (
-            represented_measure
-            + represented_identifiers
-            + represented_attributes
-        )
-    for represented_variable in represented_variables:
-        if "codeList" in represented_variable["valueDomain"]:
-            represented_variable["valueDomain"]["codeList"].clear()
-        if "missingValues" in represented_variable["valueDomain"]:
-            represented_variable["valueDomain"]["missingValues"].clear()
+def _without_code_list_and_missing_values(
+    data_structures: Iterable[dict],
+) -> list[dict]:
+    """
+    Returns copies of the data structures with emptied code lists and
+    missing values. The input is left untouched, as it may be shared
+    through the metadata cache.
+    """
+    return [_strip_data_structure(metadata) for metadata in data_structures]
+
+
+def _strip_data_structure(metadata: dict) -> dict:
+    return {
+        **metadata,
+        "measureVariable": _strip_variable(metadata["measureVariable"]),
+        "identifierVariables": [
+            _strip_variable(identifier)
+            for identifier in metadata["identifierVariables"]
+        ],
+        "attributeVariables": [
+            _strip_variable(attribute)
+            for attribute in metadata["attributeVariables"]
+        ],
+    }
+
+
+def _strip_variable(variable: dict) -> dict:
+    return {
+        **variable,
+        "representedVariables": [
+            _strip_represented_variable(represented_variable)
+            for represented_variable in variable["representedVariables"]
+        ],
+    }
+
+
+def _strip_represented_variable(represented_variable: dict) -> dict:
+    value_domain = represented_variable["valueDomain"]
+    return {
+        **represented_variable,
+        "valueDomain": {
+            **value_domain,
+            **{
+                key: []
+                for key in ["codeList", "missingValues"]
+                if key in value_domain
+            },
+        },
+    }
 
 
 def _validate_version(version: Version, datastore_root_dir: Path) -> None:
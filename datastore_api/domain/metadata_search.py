@@ -0,0 +1,203 @@
+import re
+import sys
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
+from datastore_api.common.models import CamelModel, Version
+from datastore_api.domain.metadata import variables_of
+
+TOKEN_REG_EXP = re.compile(r"[^\W_]+")
+
+DATA_STRUCTURE_FIELD_WEIGHTS = {
+    "name": 5.0,
+    "subjectFields": 2.0,
+    "populationDescription": 1.0,
+}
+VARIABLE_FIELD_WEIGHTS = {
+    "name": 4.0,
+    "label": 3.0,
+    "description": 1.0,
+    "codeList": 1.0,
+}
+
+
+class SearchHit(CamelModel):
+    data_structure: str
+    variable: str | None = None
+    score: float
+
+
+class SearchResult(CamelModel):
+    total: int
+    hits: list[SearchHit]
+
+
+@dataclass
+class _SearchIndex:
+    documents: list[tuple[str, str | None]]
+    postings: dict[str, dict[int, float]]
+    vocabulary: list[str]
+
+
+def search(
+    datastore_root_dir: Path,
+    version: Version,
+    query: str,
+    limit: int,
+    offset: int,
+) -> SearchResult:
+    """
+    Searches the names, labels, descriptions, subject fields and code list
+    categories of the data structures and variables in a version.
+    Every term in the query must match, where the last term also matches
+    as a prefix. Hits are ranked by the summed weight of the fields the
+    terms were found in.
+    """
+    index = _get_search_index(version, datastore_root_dir)
+    terms = _tokenize(query)
+    if not terms:
+        return SearchResult(total=0, hits=[])
+    scores: dict[int, float] | None = None
+    for position, term in enumerate(terms):
+        term_scores = _match(index, term, is_prefix=position == len(terms) - 1)
+        if scores is None:
+            scores = term_scores
+        else:
+            scores = {
+                document: score + term_scores[document]
+                for document, score in scores.items()
+                if document in term_scores
+            }
+    ranked = sorted(
+        scores.items(),
+        key=lambda item: (
+            -item[1],
+            index.documents[item[0]][0],
+            index.documents[item[0]][1] or "",
+        ),
+    )
+    return SearchResult(
+        total=len(ranked),
+        hits=[
+            SearchHit(
+                data_structure=index.documents[document][0],
+                variable=index.documents[document][1],
+                score=score,
+            )
+            for document, score in ranked[offset : offset + limit]
+        ],
+    )
+
+
+def _tokenize(text: str) -> list[str]:
+    return TOKEN_REG_EXP.findall(text.casefold())
+
+
+def _match(index: _SearchIndex, term: str, is_prefix: bool) -> dict[int, float]:
+    if not is_prefix:
+        return index.postings.get(term, {})
+    matches: dict[int, float] = {}
+    position = bisect_left(index.vocabulary, term)
+    while position < len(index.vocabulary) and index.vocabulary[
+        position
+    ].startswith(term):
+        for document, weight in index.postings[
+            index.vocabulary[position]
+        ].items():
+            matches[document] = max(matches.get(document, 0.0), weight)
+        position += 1
+    return matches
+
+
+def _get_search_index(
+    version: Version, datastore_root_dir: Path
+) -> _SearchIndex:
+    def load() -> tuple[_SearchIndex, int]:
+        index = _build_search_index(
+            datastore_directory.get_data_structures(
+                version, datastore_root_dir
+            ).values()
+        )
+        return index, _estimate_size(index)
+
+    if version.is_draft():
+        return load()[0]
+    return metadata_cache.get_or_load(
+        datastore_root_dir, version, "search_index", load
+    )
+
+
+def _build_search_index(data_structures: Iterable[dict]) -> _SearchIndex:
+    documents: list[tuple[str, str | None]] = []
+    postings: dict[str, dict[int, float]] = {}
+
+    def add(document: int, text: str | None, weight: float) -> None:
+        for token in set(_tokenize(text or "")):
+            document_weights = postings.setdefault(token, {})
+            document_weights[document] = (
+                document_weights.get(document, 0.0) + weight
+            )
+
+    for data_structure in data_structures:
+        document = len(documents)
+        documents.append((data_structure["name"], None))
+        add(
+            document,
+            data_structure["name"],
+            DATA_STRUCTURE_FIELD_WEIGHTS["name"],
+        )
+        add(
+            document,
+            " ".join(data_structure.get("subjectFields", [])),
+            DATA_STRUCTURE_FIELD_WEIGHTS["subjectFields"],
+        )
+        add(
+            document,
+            data_structure.get("populationDescription"),
+            DATA_STRUCTURE_FIELD_WEIGHTS["populationDescription"],
+        )
+        for variable in variables_of(data_structure):
+            document = len(documents)
+            documents.append((data_structure["name"], variable["name"]))
+            add(document, variable["name"], VARIABLE_FIELD_WEIGHTS["name"])
+            add(
+                document, variable.get("label"), VARIABLE_FIELD_WEIGHTS["label"]
+            )
+            represented_variables = variable.get("representedVariables", [])
+            add(
+                document,
+                " ".join(
+                    rv.get("description") or "" for rv in represented_variables
+                ),
+                VARIABLE_FIELD_WEIGHTS["description"],
+            )
+            add(
+                document,
+                " ".join(
+                    str(code_item.get("category") or "")
+                    for rv in represented_variables
+                    for code_item in rv.get("valueDomain", {}).get(
+                        "codeList", []
+                    )
+                ),
+                VARIABLE_FIELD_WEIGHTS["codeList"],
+            )
+    return _SearchIndex(
+        documents=documents, postings=postings, vocabulary=sorted(postings)
+    )
+
+
+def _estimate_size(index: _SearchIndex) -> int:
+    return (
+        sys.getsizeof(index.documents)
+        + sys.getsizeof(index.postings)
+        + sys.getsizeof(index.vocabulary)
+        + sum(
+            sys.getsizeof(token) + sys.getsizeof(document_weights)
+            for token, document_weights in index.postings.items()
+        )
+    )
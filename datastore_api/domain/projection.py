@@ -0,0 +1,65 @@
+import re
+
+from datastore_api.common.exceptions import RequestValidationException
+
+FIELD_SEGMENT_REG_EXP = re.compile(r"^[A-Za-z0-9_]+$")
+
+FieldTree = dict[str, "FieldTree"]
+
+
+def normalize_fields(fields: list[str]) -> tuple[str, ...]:
+    """
+    Returns the requested field paths stripped, deduplicated and sorted,
+    so that equivalent projections share one cache entry.
+    Raises RequestValidationException for malformed paths.
+    """
+    normalized = set()
+    for field in fields:
+        field = field.strip()
+        if not all(
+            FIELD_SEGMENT_REG_EXP.match(segment) for segment in field.split(".")
+        ):
+            raise RequestValidationException(f"Invalid field: '{field}'")
+        normalized.add(field)
+    return tuple(sorted(normalized))
+
+
+def build_field_tree(fields: tuple[str, ...]) -> FieldTree:
+    """
+    Builds a tree from dotted field paths. A leaf (empty dict) selects the
+    whole value at that path, and a shorter path wins over a longer one:
+    "a,a.b" selects all of "a".
+    """
+    tree: FieldTree = {}
+    for field in sorted(fields, key=lambda f: f.count(".")):
+        node = tree
+        segments = field.split(".")
+        for index, segment in enumerate(segments):
+            if segment in node and not node[segment]:
+                break
+            if index == len(segments) - 1:
+                node[segment] = {}
+            else:
+                node = node.setdefault(segment, {})
+    return tree
+
+
+def project(value: object, tree: FieldTree) -> object:
+    """
+    Returns a copy of value containing only the fields selected by tree.
+    Lists are traversed transparently, so a path applies to every element.
+    Fields missing from value, or paths continuing past a scalar, are left
+    out of the result.
+    """
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: project(value[key], subtree)
+            for key, subtree in tree.items()
+            if key in value
+            and (not subtree or isinstance(value[key], (dict, list)))
+        }
+    return value
@@ -0,0 +1,107 @@
+import gc
+import logging
+import threading
+from enum import StrEnum
+from pathlib import Path
+from time import perf_counter_ns
+
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.common.models import CamelModel, Version
+from datastore_api.domain import data
+
+logger = logging.getLogger()
+
+
+class WarmupState(StrEnum):
+    DISABLED = "DISABLED"
+    COMPLETE = "COMPLETE"
+
+
+class WarmupStatus(CamelModel):
+    state: WarmupState
+    warmed_datastores: list[str] = []
+    failed_datastores: list[str] = []
+    duration_ms: int | None = None
+
+
+_status_lock = threading.Lock()
+_status = WarmupStatus(state=WarmupState.DISABLED)
+
+
+def get_warmup_status() -> WarmupStatus:
+    with _status_lock:
+        return _status.model_copy()
+
+
+def _set_warmup_status(status: WarmupStatus) -> None:
+    global _status
+    with _status_lock:
+        _status = status
+
+
+def warm_up_datastores(datastore_root_dirs: list[Path]) -> WarmupStatus:
+    """
+    Loads the latest released metadata_all and data_versions of every
+    datastore into the metadata cache.
+    Meant to run in the gunicorn master before workers are forked
+    (--preload). The loaded objects are moved to the permanent GC
+    generation afterwards, so that garbage collection in the workers does
+    not touch, and thereby copy, the pages they share with the master.
+    As it completes before the app is built, requests never see it in
+    progress.
+    """
+    start = perf_counter_ns()
+    warmed, failed = [], []
+    for datastore_root_dir in datastore_root_dirs:
+        try:
+            _load_latest_metadata(datastore_root_dir)
+            warmed.append(datastore_root_dir.name)
+        except Exception as e:
+            logger.warning(
+                f"Could not warm up metadata for {datastore_root_dir}: {e}"
+            )
+            failed.append(datastore_root_dir.name)
+    gc.collect()
+    gc.freeze()
+    status = WarmupStatus(
+        state=WarmupState.COMPLETE,
+        warmed_datastores=warmed,
+        failed_datastores=failed,
+        duration_ms=(perf_counter_ns() - start) // 1_000_000,
+    )
+    _set_warmup_status(status)
+    logger.info(
+        f"Metadata warmup complete in {status.duration_ms} ms "
+        f"(warmed: {len(warmed)}, failed: {len(failed)})"
+    )
+    return status
+
+
+def _load_latest_metadata(datastore_root_dir: Path) -> Version:
+    latest_version = datastore_directory.get_latest_version(datastore_root_dir)
+    datastore_directory.get_data_structures(latest_version, datastore_root_dir)
+    datastore_directory.get_data_versions(latest_version, datastore_root_dir)
+    return latest_version
+
+
+def preload_latest_version(datastore_root_dir: Path) -> None:
+    """
+    Loads the metadata, data versions and dataset handles of the latest
+    released version of a datastore, typically right after a new version
+    has been released, so that the first requests for it are not cold.
+    """
+    try:
+        latest_version = _load_latest_metadata(datastore_root_dir)
+    except Exception as e:
+        logger.warning(f"Could not preload {datastore_root_dir}: {e}")
+        return
+    for dataset_name in datastore_directory.get_data_versions(
+        latest_version, datastore_root_dir
+    ):
+        try:
+            data.get_dataset(dataset_name, latest_version, datastore_root_dir)
+        except Exception as e:
+            logger.warning(
+                f"Could not preload {dataset_name} in {datastore_root_dir}: {e}"
+            )
+    logger.info(f"Preloaded version {latest_version} of {datastore_root_dir}")
@@ -1,15 +1,19 @@
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 
-from datastore_api.adapter import local_storage
+from datastore_api.adapter import db, local_storage
 from datastore_api.adapter.db.migrations import apply_migrations
-from datastore_api.adapter.db.sqlite import SqliteDbClient
+from datastore_api.adapter.db.sqlite import SqliteDbClient, enable_wal_journal
 from datastore_api.api import setup_api
 from datastore_api.common.exceptions import MigrationException
 from datastore_api.config import environment
 from datastore_api.config.logging import setup_logging
+from datastore_api.domain import warmup
+from datastore_api.domain.job_retention import JobRetentionScheduler
 
 logger = logging.getLogger()
 
@@ -17,6 +21,7 @@ logger = logging.getLogger()
 def setup_db(db_path: Path, migrations_dir: Path) -> None:
     try:
         apply_migrations(db_path, migrations_dir)
+        enable_wal_journal(db_path)
         insert_baseline(db_path)
     except MigrationException as e:
         logger.error(f"Startup aborted due to migration failure: {e}")
@@ -35,18 +40,63 @@ def insert_baseline(db_path: Path) -> None:
         Path(environment.baseline_file)
     )
     client = SqliteDbClient(str(db_path))
-    for datastore_baseline in baseline_file.datastores:
-        client.insert_new_datastore(
-            rdn=datastore_baseline.rdn,
-            description=datastore_baseline.description,
-            directory=datastore_baseline.directory,
-            name=datastore_baseline.name,
-            bump_enabled=datastore_baseline.bump_enabled,
-        )
+    try:
+        for datastore_baseline in baseline_file.datastores:
+            client.insert_new_datastore(
+                rdn=datastore_baseline.rdn,
+                description=datastore_baseline.description,
+                directory=datastore_baseline.directory,
+                name=datastore_baseline.name,
+                bump_enabled=datastore_baseline.bump_enabled,
+            )
+    finally:
+        client.close()
+
+
+def warmup_metadata(db_path: Path) -> None:
+    """
+    Load the latest released metadata of all active datastores before
+    gunicorn forks its workers, if enabled via the METADATA_WARMUP
+    environment variable (optional).
+    """
+    if not environment.metadata_warmup:
+        return None
+    logger.info("Warming up metadata")
+    client = SqliteDbClient(str(db_path))
+    try:
+        datastores = client.get_datastores()
+    finally:
+        client.close()
+    warmup.warm_up_datastores(
+        [Path(datastore.directory) for datastore in datastores]
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Archives old jobs in the background of one of the workers, if enabled
+    via the JOB_RETENTION_DAYS environment variable (optional).
+    """
+    if environment.job_retention_days is None:
+        yield
+        return
+    scheduler = JobRetentionScheduler(
+        db.get_database_client(),
+        environment.job_retention_days,
+        environment.job_retention_interval_seconds,
+        Path(environment.shared_state_dir) / "job_retention.lock",
+    )
+    scheduler.start()
+    try:
+        yield
+    finally:
+        scheduler.stop()
 
 
 setup_db(Path(environment.sqlite_url), Path(environment.migrations_dir))
-app = FastAPI(title="Datastore API", version="1.0.0")
+warmup_metadata(Path(environment.sqlite_url))
+app = FastAPI(title="Datastore API", version="1.0.0", lifespan=lifespan)
 setup_logging(app)
 setup_api(app)
 
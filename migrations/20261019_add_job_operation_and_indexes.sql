@@ -0,0 +1,11 @@
+ALTER TABLE job
+ADD COLUMN operation TEXT
+GENERATED ALWAYS AS (json_extract(parameters, '$.operation')) VIRTUAL;
+
+CREATE INDEX IF NOT EXISTS ix_job_datastore_status ON job (datastore_id, status);
+
+CREATE INDEX IF NOT EXISTS ix_job_target_datastore_status ON job (target, datastore_id, status);
+
+CREATE INDEX IF NOT EXISTS ix_job_status_operation ON job (status, operation);
+
+CREATE INDEX IF NOT EXISTS ix_job_log_job_at ON job_log (job_id, at);
@@ -0,0 +1,41 @@
+CREATE TABLE IF NOT EXISTS change_sequence (
+    change_sequence_id INTEGER PRIMARY KEY CHECK (change_sequence_id = 1),
+    seq INTEGER NOT NULL
+);
+
+ALTER TABLE job ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE job_log ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE target ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0;
+
+UPDATE job SET change_seq = job_id;
+
+UPDATE job_log
+SET change_seq = job_log_id + (SELECT COALESCE(MAX(change_seq), 0) FROM job);
+
+UPDATE target
+SET change_seq = rowid + (
+    SELECT COALESCE(MAX(change_seq), 0)
+    FROM (
+        SELECT change_seq FROM job
+        UNION ALL
+        SELECT change_seq FROM job_log
+    )
+);
+
+INSERT INTO change_sequence (change_sequence_id, seq)
+SELECT 1, COALESCE(MAX(change_seq), 0)
+FROM (
+    SELECT change_seq FROM job
+    UNION ALL
+    SELECT change_seq FROM job_log
+    UNION ALL
+    SELECT change_seq FROM target
+);
+
+CREATE INDEX IF NOT EXISTS ix_job_change_seq ON job (change_seq);
+
+CREATE INDEX IF NOT EXISTS ix_job_log_change_seq ON job_log (change_seq);
+
+CREATE INDEX IF NOT EXISTS ix_target_change_seq ON target (change_seq);
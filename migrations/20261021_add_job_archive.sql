@@ -0,0 +1,21 @@
+CREATE TABLE IF NOT EXISTS job_archive (
+    job_id INTEGER PRIMARY KEY,
+    target TEXT,
+    datastore_id INTEGER,
+    status TEXT,
+    created_at TIMESTAMP,
+    created_by TEXT,
+    parameters TEXT,
+    archived_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS job_log_archive (
+    job_log_id INTEGER PRIMARY KEY,
+    job_id INTEGER,
+    msg TEXT,
+    at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_job_log_archive_job_at ON job_log_archive (job_id, at);
+
+CREATE INDEX IF NOT EXISTS ix_job_status_created_at ON job (status, created_at);
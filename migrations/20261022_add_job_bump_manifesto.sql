@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS job_bump_manifesto (
+    job_id INTEGER PRIMARY KEY,
+    manifesto TEXT NOT NULL,
+    FOREIGN KEY (job_id) REFERENCES job (job_id) ON DELETE CASCADE
+);
+
+INSERT INTO job_bump_manifesto (job_id, manifesto)
+SELECT job_id, json_extract(parameters, '$.bumpManifesto')
+FROM job
+WHERE json_type(parameters, '$.bumpManifesto') = 'object';
+
+UPDATE job
+SET parameters = json_remove(parameters, '$.bumpManifesto')
+WHERE json_type(parameters, '$.bumpManifesto') IS NOT NULL;
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS ix_maintenance_timestamp ON maintenance (timestamp, maintenance_id);
@@ -0,0 +1,3 @@
+ALTER TABLE job_archive ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS ix_job_archive_change_seq ON job_archive (change_seq);
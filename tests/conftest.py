@@ -9,17 +9,48 @@ os.environ["JWKS_URL"] = "http://localhost"
 os.environ["SECRETS_FILE"] = "tests/resources/secrets/secrets.json"
 os.environ["DATASTORES_ROOT_DIR"] = "tests/resources/datastores/"
 
+import shutil
+from pathlib import Path
+
 import pytest
 from fastapi import testclient
 
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
 from datastore_api.main import app
 
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+DATASTORE_VERSIONS_FILE_PATH = (
+    "tests/resources/test_datastore/datastore/datastore_versions.json"
+)
+
 
 @pytest.fixture(scope="session")
 def test_app():
     yield testclient.TestClient(app)
 
 
+@pytest.fixture
+def empty_metadata_cache():
+    metadata_cache.clear()
+    yield
+    metadata_cache.clear()
+
+
+@pytest.fixture
+def tmp_datastore_root_dir(tmp_path, empty_metadata_cache) -> Path:
+    """
+    A datastore with metadata_all for version 1.0.0 in a temporary
+    directory, for tests that go through the metadata cache.
+    """
+    datastore_dir = tmp_path / "no.ssb.test" / "datastore"
+    datastore_dir.mkdir(parents=True)
+    shutil.copy(DATASTORE_VERSIONS_FILE_PATH, datastore_dir)
+    shutil.copy(
+        METADATA_ALL_FILE_PATH, datastore_dir / "metadata_all__1_0_0.json"
+    )
+    return tmp_path / "no.ssb.test"
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--include-big-data",
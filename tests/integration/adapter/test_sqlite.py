@@ -1,6 +1,7 @@
 import json
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
@@ -8,6 +9,7 @@ from pytest_mock import MockFixture
 
 from datastore_api.adapter.db.migrations import apply_migrations
 from datastore_api.adapter.db.models import (
+    Changes,
     DatastoreVersion,
     DataStructureUpdate,
     Job,
@@ -23,6 +25,7 @@ from datastore_api.adapter.db.sqlite import (
     JobExistsException,
     NotFoundException,
     SqliteDbClient,
+    enable_wal_journal,
 )
 from datastore_api.api.jobs.models import NewJobRequest
 
@@ -291,6 +294,212 @@ def test_get_jobs():
     assert len(jobs) == 1
 
 
+def test_get_jobs_include_logs():
+    jobs = sqlite_client.get_jobs(status=None, operations=None)
+    assert not any(job.log for job in jobs)
+    jobs = sqlite_client.get_jobs(
+        status=None, operations=None, include_logs=True
+    )
+    assert jobs[0].log == sqlite_client.get_job(jobs[0].job_id).log
+    jobs = sqlite_client.get_jobs_for_target(
+        name="MY_DATASET", datastore_id=DATASTORE_ID, include_logs=True
+    )
+    assert jobs[0].log
+
+
+def test_get_job_logs():
+    log = sqlite_client.get_job(1).log
+    entries = sqlite_client.get_job_logs(1)
+    assert [(entry.at, entry.message) for entry in entries] == [
+        (log_entry.at, log_entry.message) for log_entry in log
+    ]
+    assert sqlite_client.get_job_logs(1, limit=1) == entries[:1]
+    assert (
+        sqlite_client.get_job_logs(1, after_log_id=entries[0].log_id)
+        == entries[1:]
+    )
+    assert sqlite_client.get_job_logs(2) == []
+    with pytest.raises(NotFoundException):
+        sqlite_client.get_job_logs(999)
+
+
+def test_get_job_events():
+    latest_event_id = sqlite_client.get_latest_job_event_id()
+    all_events = sqlite_client.get_job_events(0)
+    assert all_events[-1].log_id == latest_event_id
+    assert [event.log_id for event in all_events] == sorted(
+        event.log_id for event in all_events
+    )
+    assert sqlite_client.get_job_events(0, datastore_id=2) == []
+    sqlite_client.update_job(
+        "2", status=JobStatus("validating"), description=None, log="started"
+    )
+    events = sqlite_client.get_job_events(latest_event_id)
+    assert [
+        (event.job_id, event.status, event.message) for event in events
+    ] == [
+        ("2", "validating", "Set status: validating"),
+        ("2", None, "started"),
+    ]
+    assert events[0].datastore_rdn == "no.ssb.test"
+    assert sqlite_client.get_job_events(latest_event_id, limit=1) == events[:1]
+    assert sqlite_client.get_latest_job_event_id() == events[-1].log_id
+
+
+def test_get_changes():
+    assert sqlite_client.get_changes(0, 10) == Changes(cursor=0, has_more=False)
+    job = sqlite_client.update_job(
+        "2", status=JobStatus("validating"), description=None, log="started"
+    )
+    sqlite_client.update_target(job)
+
+    changes = sqlite_client.get_changes(0, 1)
+    assert [job.job_id for job in changes.jobs] == ["2"]
+    assert changes.jobs[0].status == "validating"
+    assert [entry.message for entry in changes.job_logs] == [
+        "Set status: validating",
+        "started",
+    ]
+    assert changes.targets == []
+    assert changes.has_more
+
+    changes = sqlite_client.get_changes(changes.cursor, 1)
+    assert changes.jobs == []
+    assert [target.name for target in changes.targets] == ["MY_OTHER_DATASET"]
+    assert changes.targets[0].status == "validating"
+    assert not changes.has_more
+
+    assert sqlite_client.get_changes(changes.cursor, 10) == Changes(
+        cursor=changes.cursor, has_more=False
+    )
+
+    sqlite_client.archive_jobs(datetime.now() + timedelta(days=1), 10)
+    changes = sqlite_client.get_changes(changes.cursor, 10)
+    assert changes.archived_job_ids == ["1"]
+    assert changes.jobs == []
+    assert not changes.has_more
+
+
+def test_archive_jobs(sqlite_db):
+    job = sqlite_client.get_job(1)
+    entries = sqlite_client.get_job_logs(1)
+    assert (
+        sqlite_client.archive_jobs(datetime.now() - timedelta(days=1), 10) == 0
+    )
+    assert (
+        sqlite_client.archive_jobs(datetime.now() + timedelta(days=1), 10) == 1
+    )
+    assert sqlite_client.get_job(1) == job
+    assert sqlite_client.get_job_logs(1) == entries
+    assert (
+        sqlite_client.get_job_logs(1, after_log_id=entries[0].log_id)
+        == entries[1:]
+    )
+    assert [
+        job.job_id
+        for job in sqlite_client.get_jobs(status=None, operations=None)
+    ] == ["2"]
+    conn = sqlite3.connect(sqlite_db)
+    assert conn.execute("SELECT COUNT(*) FROM job_log").fetchone()[0] == 0
+    conn.close()
+    assert (
+        sqlite_client.archive_jobs(datetime.now() + timedelta(days=1), 10) == 0
+    )
+    sqlite_client.compact()
+    with pytest.raises(NotFoundException):
+        sqlite_client.get_job(999)
+
+
+def test_bump_manifesto_stored_apart(sqlite_db):
+    new_job = BUMP_JOB.model_copy(deep=True)
+    new_job.status = JobStatus.QUEUED
+    job_id = sqlite_client.insert_new_job(new_job).job_id
+    manifesto = BUMP_JOB.parameters.bump_manifesto
+
+    conn = sqlite3.connect(sqlite_db)
+    parameters = conn.execute(
+        "SELECT parameters FROM job WHERE job_id = ?", (job_id,)
+    ).fetchone()[0]
+    conn.close()
+    assert "bumpManifesto" not in json.loads(parameters)
+
+    [listed_job] = sqlite_client.get_jobs(
+        status=None, operations=[Operation.BUMP]
+    )
+    assert listed_job.parameters.bump_manifesto is None
+    [listed_job] = sqlite_client.get_jobs(
+        status=None, operations=[Operation.BUMP], include_bump_manifestos=True
+    )
+    assert listed_job.parameters.bump_manifesto == manifesto
+    assert sqlite_client.get_job(job_id).parameters.bump_manifesto == manifesto
+
+    completed_job = sqlite_client.update_job(
+        job_id, status=JobStatus.COMPLETED, description=None, log=None
+    )
+    assert completed_job.parameters.bump_manifesto == manifesto
+    sqlite_client.archive_jobs(datetime.now() + timedelta(days=1), 10)
+    assert sqlite_client.get_job(job_id).parameters.bump_manifesto == manifesto
+
+
+def test_get_jobs_same_as_get_job():
+    new_job = BUMP_JOB.model_copy(deep=True)
+    new_job.status = JobStatus.QUEUED
+    sqlite_client.insert_new_job(new_job)
+    jobs = sqlite_client.get_jobs(
+        status=None,
+        operations=None,
+        include_logs=True,
+        include_bump_manifestos=True,
+    )
+    assert len(jobs) == 3
+    for job in jobs:
+        assert job == sqlite_client.get_job(job.job_id)
+    assert sqlite_client.get_jobs_for_target(
+        name="DATASTORE",
+        datastore_id=DATASTORE_ID,
+        include_logs=True,
+        include_bump_manifestos=True,
+    ) == [jobs[-1]]
+
+
+def test_get_jobs_paginated():
+    all_jobs = sqlite_client.get_jobs(status=None, operations=None)
+    assert len(all_jobs) == 2
+    pages = []
+    after_job_id = None
+    while True:
+        page = sqlite_client.get_jobs(
+            status=None,
+            operations=None,
+            limit=1,
+            after_job_id=after_job_id,
+        )
+        if not page:
+            break
+        pages.append(page)
+        after_job_id = page[-1].job_id
+    assert [len(page) for page in pages] == [1, 1]
+    assert [job for page in pages for job in page] == all_jobs
+    assert [int(job.job_id) for job in all_jobs] == sorted(
+        int(job.job_id) for job in all_jobs
+    )
+
+
+def test_get_jobs_newest_first_paginated():
+    all_jobs = sqlite_client.get_jobs(status=None, operations=None)
+    first_page = sqlite_client.get_jobs(
+        status=None, operations=None, limit=1, newest_first=True
+    )
+    second_page = sqlite_client.get_jobs(
+        status=None,
+        operations=None,
+        limit=1,
+        after_job_id=first_page[-1].job_id,
+        newest_first=True,
+    )
+    assert first_page + second_page == all_jobs[::-1]
+
+
 def test_get_jobs_for_target():
     jobs = sqlite_client.get_jobs_for_target(
         name="MY_DATASET", datastore_id=DATASTORE_ID
@@ -325,6 +534,50 @@ def test_insert_new_job():
         )
 
 
+def test_insert_new_jobs():
+    def new_job(target: str, rdn: str = "no.ssb.test") -> Job:
+        return NewJobRequest(
+            operation=Operation.ADD, target=target
+        ).generate_job_from_request("", USER_INFO, datastore_rdn=rdn)
+
+    results = sqlite_client.insert_new_jobs(
+        [
+            new_job("NEW_DATASET"),
+            new_job("MY_OTHER_DATASET"),
+            new_job("OTHER_NEW_DATASET"),
+            new_job("NEW_DATASET"),
+            new_job("NEW_DATASET", rdn="no.dev.test"),
+        ]
+    )
+    assert isinstance(results[1], JobExistsException)
+    assert isinstance(results[3], JobExistsException)
+    created = [results[0], results[2], results[4]]
+    assert all(isinstance(job, Job) for job in created)
+    for job in created:
+        assert sqlite_client.get_job(job.job_id) == job
+    targets = {
+        target.name: target
+        for target in sqlite_client.get_targets(datastore_id=DATASTORE_ID)
+    }
+    assert targets["NEW_DATASET"].status == "queued"
+    assert targets["OTHER_NEW_DATASET"].action == ["ADD"]
+
+
+def test_claim_jobs():
+    assert sqlite_client.claim_jobs(limit=5, operations=[Operation.BUMP]) == []
+    claimed = sqlite_client.claim_jobs(limit=5, operations=[Operation.ADD])
+    assert [job.job_id for job in claimed] == ["2"]
+    assert claimed[0].status == "initiated"
+    assert sqlite_client.get_job(2).status == "initiated"
+    assert sqlite_client.get_job(2).log[-1].message == "Set status: initiated"
+    targets = {
+        target.name: target
+        for target in sqlite_client.get_targets(datastore_id=DATASTORE_ID)
+    }
+    assert targets["MY_OTHER_DATASET"].status == "initiated"
+    assert sqlite_client.claim_jobs(limit=5) == []
+
+
 def test_update_job():
     existing_job = sqlite_client.get_job(2)
     assert existing_job.status == "queued"
@@ -442,6 +695,39 @@ def test_set_and_get_maintenance_status():
     ]
 
 
+def test_maintenance_history_paginated():
+    statuses = [
+        sqlite_client.set_maintenance_status(msg=f"test{i}", paused=i % 2 == 0)
+        for i in range(5)
+    ]
+    statuses.reverse()
+    first_page = sqlite_client.get_maintenance_history(limit=2)
+    assert first_page == statuses[:2]
+    second_page = sqlite_client.get_maintenance_history(
+        limit=2, before_maintenance_id=str(first_page[-1].maintenance_id)
+    )
+    assert second_page == statuses[2:4]
+    last_page = sqlite_client.get_maintenance_history(
+        limit=2, before_maintenance_id=str(second_page[-1].maintenance_id)
+    )
+    assert last_page == statuses[4:]
+    assert (
+        sqlite_client.get_maintenance_history(
+            limit=2, before_maintenance_id=str(last_page[-1].maintenance_id)
+        )
+        == []
+    )
+
+
+def test_latest_maintenance_status_invalidated_across_clients(sqlite_db):
+    other_client = SqliteDbClient(f"sqlite://{sqlite_db}")
+    first = sqlite_client.set_maintenance_status(msg="first", paused=False)
+    assert other_client.get_latest_maintenance_status() == first
+
+    second = other_client.set_maintenance_status(msg="second", paused=True)
+    assert sqlite_client.get_latest_maintenance_status() == second
+
+
 def test_get_targets():
     targets = sqlite_client.get_targets(datastore_id=DATASTORE_ID)
     target_names = [target.name for target in targets]
@@ -567,3 +853,104 @@ def test_delete_datastore(existing_datastore):
     )
     with pytest.raises(DatastoreNotFoundException):
         sqlite_client.get_datastore_id_from_rdn(rdn)
+
+
+def test_connection_reused_within_thread():
+    conn = sqlite_client._conn()
+    sqlite_client.get_job(1)
+    sqlite_client.get_datastores()
+    assert sqlite_client._conn() is conn
+
+    other_thread_conns = []
+    thread = threading.Thread(
+        target=lambda: other_thread_conns.append(sqlite_client._conn())
+    )
+    thread.start()
+    thread.join()
+    assert other_thread_conns[0] is not conn
+
+
+def test_nested_lookup_sees_callers_transaction():
+    conn = sqlite_client._conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            """
+            INSERT INTO datastore (rdn, description, directory, name)
+            VALUES (?, ?, ?, ?)
+            """,
+            ("no.ssb.uncommitted", "uncommitted", "some/dir", "uncommitted"),
+        )
+        assert sqlite_client.get_datastore_id_from_rdn("no.ssb.uncommitted")
+    finally:
+        conn.rollback()
+    with pytest.raises(DatastoreNotFoundException):
+        sqlite_client.get_datastore_id_from_rdn("no.ssb.uncommitted")
+
+
+def test_close():
+    conn = sqlite_client._conn()
+    sqlite_client.close()
+    assert sqlite_client._conn() is not conn
+    assert sqlite_client.get_datastores()
+
+
+def test_enable_wal_journal(sqlite_db):
+    enable_wal_journal(sqlite_db)
+    conn = sqlite3.connect(sqlite_db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    assert sqlite_client.get_job(1)
+
+
+def test_get_jobs_filters_on_indexed_operation(sqlite_db):
+    jobs = sqlite_client.get_jobs(
+        status=None,
+        operations=[Operation.ADD, Operation.BUMP],
+        ignore_completed=False,
+        datastore_id=None,
+    )
+    assert jobs
+    assert all(
+        job.parameters.operation in [Operation.ADD, Operation.BUMP]
+        for job in jobs
+    )
+    conn = sqlite3.connect(sqlite_db)
+    query_plan = " ".join(
+        row[3]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN "
+            "SELECT job_id FROM job WHERE status = ? AND operation IN (?, ?)",
+            ("queued", "ADD", "BUMP"),
+        )
+    )
+    conn.close()
+    assert "ix_job_status_operation" in query_plan
+
+
+def test_datastore_registry_invalidated_across_clients(sqlite_db):
+    other_client = SqliteDbClient(f"sqlite://{sqlite_db}")
+    rdns = [datastore.rdn for datastore in other_client.get_datastores()]
+    assert "no.ssb.registry" not in rdns
+
+    sqlite_client.insert_new_datastore(
+        rdn="no.ssb.registry",
+        description="registry test",
+        name="registry",
+        directory="some/registry/dir",
+        bump_enabled=False,
+    )
+    datastore_id = other_client.get_datastore_id_from_rdn("no.ssb.registry")
+    assert other_client.get_datastore(datastore_id).rdn == "no.ssb.registry"
+
+    sqlite_client.delete_datastore(datastore_id)
+    assert not any(
+        datastore.rdn == "no.ssb.registry"
+        for datastore in other_client.get_datastores()
+    )
+    with pytest.raises(DatastoreNotFoundException):
+        other_client.get_datastore_id_from_rdn("no.ssb.registry")
+    assert (
+        other_client._get_datastore_id_to_rdn_map()[datastore_id]
+        == "no.ssb.registry"
+    )
@@ -0,0 +1,56 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from datastore_api.adapter.db import ExecutorDatabaseClient
+from datastore_api.adapter.db.models import Datastore
+
+DATASTORE = Datastore(
+    datastore_id=1,
+    rdn="no.dev.test",
+    description="Datastore for testing",
+    directory="tests/resources/test_datastore",
+    name="Test datastore",
+    bump_enabled=False,
+)
+
+
+@pytest.mark.asyncio
+async def test_calls_run_outside_event_loop_thread():
+    calling_threads = []
+
+    def get_datastore(datastore_id: int) -> Datastore:
+        calling_threads.append(threading.current_thread())
+        return DATASTORE
+
+    database_client = Mock()
+    database_client.get_datastore.side_effect = get_datastore
+    async_client = ExecutorDatabaseClient(database_client)
+
+    assert await async_client.get_datastore(1) == DATASTORE
+    database_client.get_datastore.assert_called_once_with(1)
+    assert calling_threads[0] is not threading.current_thread()
+    assert calling_threads[0].name.startswith("database")
+
+
+@pytest.mark.asyncio
+async def test_run_passes_blocking_client():
+    database_client = Mock()
+    database_client.get_datastores.return_value = [DATASTORE]
+    async_client = ExecutorDatabaseClient(database_client)
+
+    rdns = await async_client.run(
+        lambda client: [datastore.rdn for datastore in client.get_datastores()]
+    )
+    assert rdns == [DATASTORE.rdn]
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_raised_to_caller():
+    database_client = Mock()
+    database_client.delete_datastore.side_effect = ValueError("failed")
+    async_client = ExecutorDatabaseClient(database_client)
+
+    with pytest.raises(ValueError):
+        await async_client.delete_datastore(1)
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+
+import pytest
+
+from datastore_api.adapter.db.write_queue import WriteQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = tmp_path / "test.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE item (name TEXT UNIQUE)")
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def write_queue(db_path):
+    local = threading.local()
+
+    def connect() -> sqlite3.Connection:
+        if getattr(local, "conn", None) is None:
+            local.conn = sqlite3.connect(db_path, isolation_level=None)
+        return local.conn
+
+    write_queue = WriteQueue(connect)
+    yield write_queue
+    write_queue.stop()
+
+
+def _names(db_path) -> list[str]:
+    conn = sqlite3.connect(db_path)
+    names = [row[0] for row in conn.execute("SELECT name FROM item")]
+    conn.close()
+    return sorted(names)
+
+
+def _insert(name: str):
+    def write(cursor: sqlite3.Cursor) -> int:
+        cursor.execute("INSERT INTO item (name) VALUES (?)", (name,))
+        return cursor.lastrowid
+
+    return write
+
+
+def test_submit_returns_result_after_commit(write_queue, db_path):
+    assert write_queue.submit(_insert("a")) == 1
+    assert _names(db_path) == ["a"]
+
+
+def test_failing_write_only_undoes_itself(write_queue, db_path):
+    def write_then_fail(cursor: sqlite3.Cursor) -> None:
+        cursor.execute("INSERT INTO item (name) VALUES ('b')")
+        raise ValueError("failed")
+
+    write_queue.submit(_insert("a"))
+    with pytest.raises(ValueError):
+        write_queue.submit(write_then_fail)
+    with pytest.raises(sqlite3.IntegrityError):
+        write_queue.submit(_insert("a"))
+    write_queue.submit(_insert("c"))
+    assert _names(db_path) == ["a", "c"]
+
+
+def test_nested_submit_runs_in_same_transaction(write_queue, db_path):
+    def outer(cursor: sqlite3.Cursor) -> list[str]:
+        write_queue.submit(_insert("a"))
+        return [row[0] for row in cursor.execute("SELECT name FROM item")]
+
+    assert write_queue.submit(outer) == ["a"]
+
+
+def test_concurrent_writes_are_batched(write_queue, db_path):
+    threads = [
+        threading.Thread(target=write_queue.submit, args=(_insert(str(i)),))
+        for i in range(50)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _names(db_path) == sorted(str(i) for i in range(50))
+
+
+def test_stop_and_restart(write_queue, db_path):
+    write_queue.submit(_insert("a"))
+    write_queue.stop()
+    write_queue.submit(_insert("b"))
+    assert _names(db_path) == ["a", "b"]
+
+
+def test_failing_connect_fails_batch_and_keeps_writer(db_path):
+    local = threading.local()
+    attempts = []
+
+    def connect() -> sqlite3.Connection:
+        if not attempts:
+            attempts.append(1)
+            raise sqlite3.OperationalError("unable to open database file")
+        if getattr(local, "conn", None) is None:
+            local.conn = sqlite3.connect(db_path, isolation_level=None)
+        return local.conn
+
+    write_queue = WriteQueue(connect)
+    with pytest.raises(sqlite3.OperationalError):
+        write_queue.submit(_insert("a"))
+    write_queue.submit(_insert("b"))
+    write_queue.stop()
+    assert _names(db_path) == ["b"]
+
+
+@pytest.mark.filterwarnings(
+    "ignore::pytest.PytestUnhandledThreadExceptionWarning"
+)
+def test_submit_raises_if_writer_dies(write_queue, db_path, monkeypatch):
+    monkeypatch.setattr(
+        "datastore_api.adapter.db.write_queue.WRITER_CHECK_INTERVAL_SECONDS",
+        0.01,
+    )
+
+    def kill_writer(cursor: sqlite3.Cursor) -> None:
+        raise SystemExit()
+
+    with pytest.raises(sqlite3.OperationalError):
+        write_queue.submit(kill_writer)
+    write_queue.submit(_insert("a"))
+    assert _names(db_path) == ["a"]
+
+
+def test_submit_outside_transaction(write_queue, db_path):
+    def vacuum(cursor: sqlite3.Cursor) -> bool:
+        in_transaction = cursor.connection.in_transaction
+        cursor.execute("VACUUM")
+        return in_transaction
+
+    write_queue.submit(_insert("a"))
+    assert write_queue.submit_outside_transaction(vacuum) is False
+    write_queue.submit(_insert("b"))
+    assert _names(db_path) == ["a", "b"]
@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from datastore_api.adapter.local_storage import (
+    compiled_metadata_all,
+    datastore_directory,
+)
+from datastore_api.adapter.local_storage.compiled_metadata_all import (
+    CompiledMetadataAll,
+)
+from datastore_api.common.models import Version
+from datastore_api.compile_metadata import main
+from datastore_api.config import environment
+
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+
+
+@pytest.fixture
+def metadata_all():
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_compile_and_open(tmp_datastore_root_dir, metadata_all):
+    metadata_all_file = (
+        tmp_datastore_root_dir / "datastore/metadata_all__1_0_0.json"
+    )
+    assert (
+        compiled_metadata_all.open_compiled_metadata_all(metadata_all_file)
+        is None
+    )
+
+    compiled_path = compiled_metadata_all.compile_metadata_all(
+        metadata_all_file
+    )
+    assert compiled_path == metadata_all_file.with_suffix(".arrow")
+    compiled = compiled_metadata_all.open_compiled_metadata_all(
+        metadata_all_file
+    )
+    assert list(compiled) == ["TEST_PERSON_INCOME", "TEST_PERSON_PETS"]
+    assert compiled["TEST_PERSON_PETS"] == metadata_all["dataStructures"][1]
+    assert compiled.to_dict() == metadata_all
+    without_code_lists = compiled.without_code_lists("TEST_PERSON_PETS")
+    assert (
+        json.loads(json.dumps(without_code_lists, default=list))
+        == metadata_all["dataStructures"][1]
+    )
+
+
+def test_stale_compiled_file_is_ignored(tmp_datastore_root_dir):
+    metadata_all_file = (
+        tmp_datastore_root_dir / "datastore/metadata_all__1_0_0.json"
+    )
+    compiled_metadata_all.compile_metadata_all(metadata_all_file)
+    stat = os.stat(metadata_all_file)
+    os.utime(metadata_all_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert (
+        compiled_metadata_all.open_compiled_metadata_all(metadata_all_file)
+        is None
+    )
+
+
+def test_compile_on_load(tmp_datastore_root_dir, metadata_all, mocker):
+    mocker.patch.object(environment, "metadata_compile_on_load", True)
+    version = Version.from_str("1.0.0.0")
+    data_structures = datastore_directory.get_data_structures(
+        version, tmp_datastore_root_dir
+    )
+    assert isinstance(data_structures, CompiledMetadataAll)
+    assert (
+        tmp_datastore_root_dir / "datastore/metadata_all__1_0_0.arrow"
+    ).exists()
+    assert (
+        datastore_directory.get_metadata_all(version, tmp_datastore_root_dir)
+        == metadata_all
+    )
+
+
+def test_compile_metadata_cli(tmp_datastore_root_dir):
+    (tmp_datastore_root_dir / "datastore/metadata_all__DRAFT.json").write_text(
+        "{}", encoding="utf-8"
+    )
+    assert main([str(tmp_datastore_root_dir)]) == 0
+    assert sorted(
+        path.name
+        for path in (tmp_datastore_root_dir / "datastore").glob("*.arrow")
+    ) == ["metadata_all__1_0_0.arrow"]
@@ -83,3 +83,20 @@ def test_get_data_path_from_data_versions_bad_ver_raises_file_not_found_error():
         datastore_directory.get_data_path_from_data_versions(
             "TEST_STUDIEPOENG", Version.from_str("0.0.0.0"), DATASTORE_ROOT_DIR
         )
+
+
+def test_get_datastore_versions_revalidates_on_change(tmp_path):
+    datastore_dir = tmp_path / "datastore"
+    datastore_dir.mkdir()
+    versions_file = datastore_dir / "datastore_versions.json"
+    versions_file.write_text('{"versions": []}', encoding="utf-8")
+
+    first = datastore_directory.get_datastore_versions(tmp_path)
+    assert datastore_directory.get_datastore_versions(tmp_path) is first
+
+    versions_file.write_text(
+        '{"versions": [{"version": "1.0.0.0"}]}', encoding="utf-8"
+    )
+    assert datastore_directory.get_datastore_versions(tmp_path) == {
+        "versions": [{"version": "1.0.0.0"}]
+    }
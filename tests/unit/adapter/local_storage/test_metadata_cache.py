@@ -0,0 +1,157 @@
+import json
+import shutil
+
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.metadata_cache import (
+    MetadataCache,
+    metadata_cache,
+)
+from datastore_api.common.models import Version
+
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+
+VERSION_1 = Version.from_str("1.0.0.0")
+VERSION_2 = Version.from_str("2.0.0.0")
+VERSION_3 = Version.from_str("3.0.0.0")
+
+
+def _loader(value: str, nbytes: int):
+    calls = []
+
+    def load():
+        calls.append(value)
+        return value, nbytes
+
+    return load, calls
+
+
+def test_get_or_load_counts_hits_and_misses():
+    cache = MetadataCache(max_bytes=100)
+    load, calls = _loader("metadata", 10)
+    assert cache.get_or_load("ds_a", VERSION_1, "all", load) == "metadata"
+    assert cache.get_or_load("ds_a", VERSION_1, "all", load) == "metadata"
+    assert calls == ["metadata"]
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.current_bytes == 10
+    assert stats.bytes_per_datastore == {"ds_a": 10}
+
+
+def test_evicts_least_recently_used_when_over_budget():
+    cache = MetadataCache(max_bytes=100)
+    cache.get_or_load("ds_a", VERSION_1, "all", _loader("v1", 40)[0])
+    cache.get_or_load("ds_a", VERSION_2, "all", _loader("v2", 40)[0])
+    cache.get_or_load("ds_a", VERSION_1, "all", _loader("v1", 40)[0])
+    cache.get_or_load("ds_a", VERSION_3, "all", _loader("v3", 40)[0])
+
+    load, calls = _loader("v2", 40)
+    cache.get_or_load("ds_a", VERSION_2, "all", load)
+    assert calls == ["v2"]
+    assert cache.stats().evictions == 2
+
+
+def test_evicts_from_largest_datastore_first():
+    cache = MetadataCache(max_bytes=100)
+    cache.get_or_load("ds_small", VERSION_1, "all", _loader("s1", 20)[0])
+    cache.get_or_load("ds_large", VERSION_1, "all", _loader("l1", 50)[0])
+    cache.get_or_load("ds_large", VERSION_2, "all", _loader("l2", 50)[0])
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.bytes_per_datastore == {"ds_small": 20, "ds_large": 50}
+    load, calls = _loader("s1", 20)
+    cache.get_or_load("ds_small", VERSION_1, "all", load)
+    assert calls == []
+
+
+def test_pinned_versions_are_not_evicted():
+    cache = MetadataCache(max_bytes=100)
+    cache.pin("ds_a", VERSION_1)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", _loader("v1", 60)[0])
+    cache.get_or_load("ds_a", VERSION_2, "metadata_all", _loader("v2", 60)[0])
+
+    stats = cache.stats()
+    assert stats.pinned_entries == 1
+    assert stats.entries == 1
+    load, calls = _loader("v1", 60)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", load)
+    assert calls == []
+
+
+def test_derived_kinds_are_not_pinned():
+    cache = MetadataCache(max_bytes=100)
+    cache.pin("ds_a", VERSION_1)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", _loader("v1", 40)[0])
+    for fields in range(10):
+        cache.get_or_load(
+            "ds_a", VERSION_1, ("projection", fields), _loader("p", 20)[0]
+        )
+
+    stats = cache.stats()
+    assert stats.pinned_entries == 1
+    assert stats.current_bytes <= 100
+    load, calls = _loader("v1", 40)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", load)
+    assert calls == []
+
+
+def test_evicts_pinned_entries_when_only_they_are_left():
+    cache = MetadataCache(max_bytes=100)
+    cache.pin("ds_a", VERSION_1)
+    cache.pin("ds_b", VERSION_1)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", _loader("a", 60)[0])
+    cache.get_or_load("ds_b", VERSION_1, "metadata_all", _loader("b", 60)[0])
+
+    stats = cache.stats()
+    assert stats.current_bytes == 60
+    assert stats.bytes_per_datastore == {"ds_b": 60}
+
+
+def test_rejects_entries_larger_than_budget():
+    cache = MetadataCache(max_bytes=10)
+    load, calls = _loader("huge", 11)
+    cache.get_or_load("ds_a", VERSION_1, "all", load)
+    cache.get_or_load("ds_a", VERSION_1, "all", load)
+    assert calls == ["huge", "huge"]
+    assert cache.stats().rejections == 2
+    assert cache.stats().entries == 0
+
+
+def test_rejects_pinned_entries_larger_than_budget():
+    cache = MetadataCache(max_bytes=10)
+    cache.pin("ds_a", VERSION_1)
+    cache.get_or_load("ds_a", VERSION_1, "metadata_all", _loader("huge", 11)[0])
+    assert cache.stats().rejections == 1
+    assert cache.stats().entries == 0
+
+
+def test_get_metadata_all_uses_cache_and_pins_latest(tmp_datastore_root_dir):
+    shutil.copy(
+        METADATA_ALL_FILE_PATH,
+        tmp_datastore_root_dir / "datastore/metadata_all__2_0_0.json",
+    )
+    first = datastore_directory.get_metadata_all(
+        VERSION_1, tmp_datastore_root_dir
+    )
+    second = datastore_directory.get_metadata_all(
+        VERSION_1, tmp_datastore_root_dir
+    )
+    assert first is second
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        assert first == json.load(f)
+
+    datastore_directory.get_metadata_all(VERSION_2, tmp_datastore_root_dir)
+    stats = metadata_cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 2
+    assert stats.pinned_entries == 1
+    assert "no.ssb.test" in stats.bytes_per_datastore
+
+
+def test_get_metadata_cache_stats(test_app):
+    response = test_app.get("/health/metadata-cache")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions", "currentBytes"} <= set(
+        response.json()
+    )
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.lazy_metadata_all import LazyCodeList
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
+from datastore_api.adapter.local_storage.streamed_metadata_all import (
+    StreamedMetadataAll,
+)
+from datastore_api.common.exceptions import InvalidStorageFormatException
+from datastore_api.common.models import Version
+from datastore_api.config import environment
+from datastore_api.domain import metadata
+
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+
+
+def test_streamed_metadata_all():
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        metadata_all = json.load(f)
+    streamed = StreamedMetadataAll(METADATA_ALL_FILE_PATH)
+    assert list(streamed) == ["TEST_PERSON_INCOME", "TEST_PERSON_PETS"]
+    assert streamed["TEST_PERSON_PETS"] == metadata_all["dataStructures"][1]
+    assert streamed.header["dataStore"] == metadata_all["dataStore"]
+    assert streamed.to_dict() == metadata_all
+
+
+def test_streamed_metadata_all_brackets_in_strings(tmp_path):
+    metadata_all = {
+        "dataStore": {"name": "}]"},
+        "dataStructures": [
+            {
+                "name": 'A "[{',
+                "measureVariable": {
+                    "name": "B",
+                    "representedVariables": [
+                        {
+                            "valueDomain": {
+                                "codeList": [
+                                    {"code": "}", "category": 'x\\"]'},
+                                    {"code": "[", "category": "{"},
+                                ]
+                            }
+                        }
+                    ],
+                },
+            },
+            {"name": "FLAT"},
+        ],
+        "languages": [],
+    }
+    metadata_all_file = tmp_path / "metadata_all__1_0_0.json"
+    metadata_all_file.write_text(json.dumps(metadata_all), encoding="utf-8")
+    streamed = StreamedMetadataAll(metadata_all_file)
+    assert list(streamed) == ['A "[{', "FLAT"]
+    assert streamed.to_dict() == metadata_all
+    measure = streamed.without_code_lists('A "[{')["measureVariable"]
+    code_list = measure["representedVariables"][0]["valueDomain"]["codeList"]
+    assert isinstance(code_list, LazyCodeList)
+    assert list(code_list) == [
+        {"code": "}", "category": 'x\\"]'},
+        {"code": "[", "category": "{"},
+    ]
+
+
+def test_streamed_metadata_all_without_data_structures(tmp_path):
+    metadata_all_file = tmp_path / "metadata_all__1_0_0.json"
+    metadata_all_file.write_text('{"dataStore": {}}', encoding="utf-8")
+    with pytest.raises(InvalidStorageFormatException):
+        StreamedMetadataAll(metadata_all_file)
+
+
+@pytest.fixture
+def oversized_datastore_root_dir(tmp_datastore_root_dir, mocker):
+    mocker.patch.object(
+        environment, "metadata_all_streaming_threshold_bytes", 0
+    )
+    return tmp_datastore_root_dir
+
+
+def test_get_data_structures_from_oversized_file(oversized_datastore_root_dir):
+    version = Version.from_str("1.0.0.0")
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        metadata_all = json.load(f)
+    data_structures = datastore_directory.get_data_structures(
+        version, oversized_datastore_root_dir
+    )
+    assert isinstance(data_structures, StreamedMetadataAll)
+    assert (
+        datastore_directory.get_metadata_all(
+            version, oversized_datastore_root_dir
+        )
+        == metadata_all
+    )
+    assert datastore_directory.get_metadata_all_header(
+        version, oversized_datastore_root_dir
+    ) == {
+        key: value
+        for key, value in metadata_all.items()
+        if key != "dataStructures"
+    }
+    assert metadata_cache.stats().misses == 1
+
+
+def _variable_with_code_list(name: str, codes: list[str]) -> dict:
+    return {
+        "name": name,
+        "representedVariables": [
+            {
+                "validPeriod": {"start": 0},
+                "valueDomain": {
+                    "codeList": [
+                        {"code": code, "category": f"Category {code}"}
+                        for code in codes
+                    ],
+                    "missingValues": [],
+                },
+            }
+        ],
+    }
+
+
+def test_unrequested_code_lists_are_not_decoded(
+    oversized_datastore_root_dir, mocker
+):
+    metadata_all_file = (
+        oversized_datastore_root_dir / "datastore/metadata_all__1_0_0.json"
+    )
+    metadata_all_file.write_text(
+        json.dumps(
+            {
+                "dataStore": {},
+                "dataStructures": [
+                    {
+                        "name": "DATASET",
+                        "measureVariable": _variable_with_code_list(
+                            "DATASET", ["1", "2"]
+                        ),
+                        "identifierVariables": [
+                            _variable_with_code_list("PERSON_ID", ["a", "b"])
+                        ],
+                        "attributeVariables": [],
+                    }
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    load = mocker.spy(LazyCodeList, "load")
+    code_list = metadata.find_code_list(
+        oversized_datastore_root_dir,
+        Version.from_str("1.0.0.0"),
+        "DATASET",
+        "PERSON_ID",
+    )
+    assert code_list["representedVariables"][0]["codeList"] == [
+        {"code": "a", "category": "Category a"},
+        {"code": "b", "category": "Category b"},
+    ]
+    assert load.call_count == 1
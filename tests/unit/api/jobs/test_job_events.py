@@ -0,0 +1,143 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from datastore_api.adapter.db.models import JobEvent
+from datastore_api.api.jobs import events
+from datastore_api.common.exceptions import TooManyEventStreamsException
+
+STATUS_EVENT = JobEvent(
+    log_id=5,
+    at="2022-05-18T11:40:22.519222",
+    message="Set status: validating",
+    job_id="2",
+    datastore_rdn="no.dev.test",
+    status="validating",
+)
+LOG_EVENT = JobEvent(
+    log_id=6,
+    at="2022-05-18T11:40:23.519222",
+    message="started",
+    job_id="2",
+    datastore_rdn="no.dev.test",
+)
+
+
+def test_format_job_event():
+    assert events.format_job_event(STATUS_EVENT) == (
+        "id: 5\n"
+        "event: status\n"
+        'data: {"at": "2022-05-18T11:40:22.519222", '
+        '"message": "Set status: validating", "logId": 5, "jobId": "2", '
+        '"datastoreRdn": "no.dev.test", "status": "validating"}\n\n'
+    )
+    assert events.format_job_event(LOG_EVENT).startswith("id: 6\nevent: log\n")
+
+
+OTHER_DATASTORE_EVENT = JobEvent(
+    log_id=7,
+    at="2022-05-18T11:40:24.519222",
+    message="other",
+    job_id="3",
+    datastore_rdn="no.ssb.test",
+)
+EVENTS = [STATUS_EVENT, LOG_EVENT, OTHER_DATASTORE_EVENT]
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    monkeypatch.setattr(events, "EVENT_POLL_INTERVAL_SECONDS", 0)
+    broadcaster = events.JobEventBroadcaster(max_streams=2)
+    monkeypatch.setattr(events, "job_event_broadcaster", broadcaster)
+    return broadcaster
+
+
+def _database_client(latest_event_id: int) -> Mock:
+    async def get_job_events(
+        after_event_id: int, datastore_id: int | None, limit: int
+    ) -> list[JobEvent]:
+        return [event for event in EVENTS if event.log_id > after_event_id]
+
+    database_client = Mock()
+    database_client.get_latest_job_event_id = AsyncMock(
+        return_value=latest_event_id
+    )
+    database_client.get_job_events = AsyncMock(side_effect=get_job_events)
+    return database_client
+
+
+def _connected_request() -> Mock:
+    request = Mock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    return request
+
+
+async def _wait_for_poller_to_stop(broadcaster):
+    for _ in range(100):
+        if broadcaster._poller is None:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("Poller still running")
+
+
+@pytest.mark.asyncio
+async def test_streams_share_one_poller(broadcaster):
+    database_client = _database_client(latest_event_id=4)
+    all_jobs = events.stream_job_events(
+        _connected_request(), database_client, None, None, None
+    )
+    other_datastore = events.stream_job_events(
+        _connected_request(), database_client, 1, "no.ssb.test", None
+    )
+    sent = await asyncio.gather(anext(all_jobs), anext(other_datastore))
+    assert sent == [
+        events.format_job_event(STATUS_EVENT),
+        events.format_job_event(OTHER_DATASTORE_EVENT),
+    ]
+    assert await anext(all_jobs) == events.format_job_event(LOG_EVENT)
+    database_client.get_latest_job_event_id.assert_called_once()
+    # Only the shared poller queries the database, for all datastores
+    polls = database_client.get_job_events.call_args_list
+    assert polls[0].args == (4, None, events.MAX_EVENT_BATCH_SIZE)
+    assert {call.args[1] for call in polls} == {None}
+
+    await all_jobs.aclose()
+    await other_datastore.aclose()
+    await _wait_for_poller_to_stop(broadcaster)
+
+
+@pytest.mark.asyncio
+async def test_stream_job_events_resumes_after_last_event_id(broadcaster):
+    database_client = _database_client(latest_event_id=7)
+    stream = events.stream_job_events(
+        _connected_request(), database_client, 2, "no.dev.test", 5
+    )
+    assert await anext(stream) == events.format_job_event(LOG_EVENT)
+    database_client.get_job_events.assert_any_call(
+        5, 2, events.MAX_EVENT_BATCH_SIZE
+    )
+    await stream.aclose()
+    await _wait_for_poller_to_stop(broadcaster)
+
+
+@pytest.mark.asyncio
+async def test_stream_capacity(broadcaster):
+    database_client = _database_client(latest_event_id=7)
+    streams = [
+        events.stream_job_events(
+            _connected_request(), database_client, None, None, None
+        )
+        for _ in range(2)
+    ]
+    waiting = [asyncio.ensure_future(anext(stream)) for stream in streams]
+    await asyncio.sleep(0)
+    with pytest.raises(TooManyEventStreamsException):
+        broadcaster.check_capacity()
+    for task in waiting:
+        task.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
+    for stream in streams:
+        await stream.aclose()
+    broadcaster.check_capacity()
+    await _wait_for_poller_to_stop(broadcaster)
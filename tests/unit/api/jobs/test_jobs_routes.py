@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
@@ -12,11 +14,18 @@ from datastore_api.adapter.auth.dependencies import (
 from datastore_api.adapter.db.models import (
     Datastore,
     Job,
+    JobLogEntry,
     JobParameters,
     JobStatus,
+    Operation,
     UserInfo,
 )
-from datastore_api.common.exceptions import NotFoundException
+from datastore_api.api.jobs import events
+from datastore_api.common.exceptions import (
+    JobExistsException,
+    NotFoundException,
+)
+from datastore_api.domain import cache_events
 from datastore_api.main import app
 
 DATASTORE_RDN = "no.dev.test"
@@ -108,6 +117,7 @@ def mock_db_client():
     mock.get_job.return_value = JOB_LIST[0]
     mock.get_jobs.return_value = JOB_LIST
     mock.insert_new_job.return_value = JOB_LIST[0]
+    mock.insert_new_jobs.side_effect = lambda jobs: [JOB_LIST[0]] * len(jobs)
     mock.update_job.return_value = JOB_LIST[0]
     mock.get_datastore.return_value = DATASTORE
     return mock
@@ -150,6 +160,159 @@ def test_get_jobs(client, mock_db_client, mock_auth_deps):
     mock_db_client.get_jobs.assert_called_once()
 
 
+def test_get_jobs_paginated(client, mock_db_client, mock_auth_deps):
+    response = client.get("jobs?status=queued&limit=1&cursor=10")
+    assert response.status_code == 200
+    assert response.json() == [
+        JOB_LIST[0].model_dump(exclude_none=True, by_alias=True)
+    ]
+    assert response.headers["X-Next-Cursor"] == JOB_LIST[0].job_id
+    mock_db_client.get_jobs.assert_called_once_with(
+        datastore_id=None,
+        status=JobStatus("queued"),
+        operations=None,
+        ignore_completed=False,
+        limit=2,
+        after_job_id="10",
+        newest_first=False,
+        include_logs=False,
+        include_bump_manifestos=False,
+    )
+
+
+def test_get_jobs_last_page(client, mock_db_client, mock_auth_deps):
+    response = client.get("jobs?limit=2")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_jobs_unpaged_by_default(client, mock_db_client, mock_auth_deps):
+    response = client.get("jobs")
+    assert response.status_code == 200
+    assert len(response.json()) == len(JOB_LIST)
+    assert mock_db_client.get_jobs.call_args.kwargs["limit"] is None
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_jobs_newest_first(client, mock_db_client, mock_auth_deps):
+    response = client.get("jobs?newestFirst=true&limit=1")
+    assert response.status_code == 200
+    assert mock_db_client.get_jobs.call_args.kwargs["newest_first"] is True
+    assert response.headers["X-Next-Cursor"] == JOB_LIST[0].job_id
+
+
+def test_get_jobs_invalid_cursor(client, mock_db_client, mock_auth_deps):
+    response = client.get("jobs?limit=1&cursor=abc")
+    assert response.status_code == 400
+    mock_db_client.get_jobs.assert_not_called()
+
+
+def test_get_job_logs(client, mock_db_client, mock_auth_deps):
+    mock_db_client.get_job_logs.return_value = [
+        JobLogEntry(log_id=4, at="2022-05-18T11:40:22.519222", message="Done")
+    ]
+    response = client.get("/jobs/1/logs?after=3&limit=10")
+    mock_auth_deps["api_key"].assert_called_once()
+    assert response.status_code == 200
+    assert response.json() == [
+        {"logId": 4, "at": "2022-05-18T11:40:22.519222", "message": "Done"}
+    ]
+    mock_db_client.get_job_logs.assert_called_once_with(
+        "1", after_log_id=3, limit=10
+    )
+
+
+def test_claim_jobs(client, mock_db_client, mock_auth_deps):
+    mock_db_client.claim_jobs.return_value = JOB_LIST[:1]
+    response = client.post(
+        "/jobs/claim", json={"limit": 5, "operations": ["ADD", "BUMP"]}
+    )
+    mock_auth_deps["api_key"].assert_called_once()
+    assert response.status_code == 200
+    assert response.json() == [
+        JOB_LIST[0].model_dump(exclude_none=True, by_alias=True)
+    ]
+    mock_db_client.claim_jobs.assert_called_once_with(
+        5, [Operation.ADD, Operation.BUMP]
+    )
+
+
+def test_claim_jobs_waits_for_queued_job(
+    client, mock_db_client, mock_auth_deps, monkeypatch
+):
+    monkeypatch.setattr(
+        "datastore_api.api.jobs.CLAIM_POLL_INTERVAL_SECONDS", 0.01
+    )
+    mock_db_client.claim_jobs.side_effect = [[], [], JOB_LIST[:1]]
+    response = client.post("/jobs/claim", json={"waitSeconds": 5})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert mock_db_client.claim_jobs.call_count == 3
+
+
+def test_claim_jobs_wait_expires(client, mock_db_client, mock_auth_deps):
+    mock_db_client.claim_jobs.return_value = []
+    response = client.post("/jobs/claim", json={"waitSeconds": 0.05})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_claim_jobs_invalid_limit(client, mock_db_client, mock_auth_deps):
+    response = client.post("/jobs/claim", json={"limit": 0})
+    assert response.status_code == 400
+    mock_db_client.claim_jobs.assert_not_called()
+
+
+def test_get_job_events(client, mock_db_client, mock_auth_deps, monkeypatch):
+    stream_args = []
+
+    async def stream_job_events(
+        request: object,
+        database_client: object,
+        datastore_id: int | None,
+        datastore_rdn: str | None,
+        last_event_id: int | None,
+    ) -> AsyncIterator[str]:
+        stream_args.append((datastore_id, datastore_rdn, last_event_id))
+        yield "id: 8\nevent: log\ndata: {}\n\n"
+
+    monkeypatch.setattr(
+        "datastore_api.api.jobs.events.stream_job_events", stream_job_events
+    )
+    response = client.get("/jobs/events", headers={"Last-Event-ID": "7"})
+    mock_auth_deps["api_key"].assert_called_once()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == "id: 8\nevent: log\ndata: {}\n\n"
+    assert stream_args == [(None, None, 7)]
+    mock_db_client.get_job.assert_not_called()
+
+    mock_db_client.get_datastore_id_from_rdn.return_value = 2
+    response = client.get(f"/datastores/{DATASTORE_RDN}/jobs/events")
+    assert response.status_code == 200
+    mock_auth_deps["data_administrator"].assert_called_once()
+    assert stream_args[1] == (2, DATASTORE_RDN, None)
+
+
+def test_get_job_events_too_many_streams(
+    client, mock_db_client, mock_auth_deps, monkeypatch
+):
+    monkeypatch.setattr(
+        "datastore_api.api.jobs.events.job_event_broadcaster",
+        events.JobEventBroadcaster(max_streams=0),
+    )
+    response = client.get("/jobs/events")
+    assert response.status_code == 503
+
+
+def test_get_job_events_invalid_last_event_id(
+    client, mock_db_client, mock_auth_deps
+):
+    response = client.get("/jobs/events", headers={"Last-Event-ID": "abc"})
+    assert response.status_code == 400
+
+
 def test_get_job(client, mock_db_client, mock_auth_deps):
     response = client.get(f"/jobs/{JOB_ID}")
     mock_auth_deps["api_key"].assert_called_once()
@@ -171,8 +334,12 @@ def test_get_job_not_found(client, mock_db_client, mock_auth_deps):
     assert response.json() == {"message": NOT_FOUND_MESSAGE}
 
 
-def test_update_job(client, mock_db_client, mock_auth_deps):
+def test_update_job(client, mock_db_client, mock_auth_deps, mocker):
+    on_job_completed = mocker.patch.object(cache_events, "on_job_completed")
     response = client.put(f"/jobs/{JOB_ID}", json=UPDATE_JOB_REQUEST)
+    on_job_completed.assert_called_once_with(
+        JOB_LIST[0], Path(DATASTORE.directory)
+    )
     mock_auth_deps["api_key"].assert_called_once()
     mock_db_client.update_target.assert_called_once()
     mock_db_client.update_job.assert_called_once()
@@ -235,8 +402,13 @@ def test_new_job_rdn(client, mock_db_client, mock_auth_deps):
     response = client.post(
         f"/datastores/{DATASTORE_RDN}/jobs", json=NEW_JOB_REQUEST
     )
-    assert mock_db_client.insert_new_job.call_count == 2
-    assert mock_db_client.update_target.call_count == 2
+    mock_db_client.insert_new_jobs.assert_called_once()
+    new_jobs = mock_db_client.insert_new_jobs.call_args.args[0]
+    assert [job.parameters.target for job in new_jobs] == [
+        "MY_DATASET",
+        "OTHER_DATASET",
+    ]
+    mock_db_client.insert_new_job.assert_not_called()
     mock_auth_deps["data_administrator_user_info"].assert_called_once()
     assert response.status_code == 200
     assert response.json() == [
@@ -245,6 +417,21 @@ def test_new_job_rdn(client, mock_db_client, mock_auth_deps):
     ]
 
 
+def test_new_job_rdn_in_progress(client, mock_db_client, mock_auth_deps):
+    mock_db_client.insert_new_jobs.side_effect = lambda jobs: [
+        JOB_LIST[0],
+        JobExistsException("Job already in progress for OTHER_DATASET"),
+    ]
+    response = client.post(
+        f"/datastores/{DATASTORE_RDN}/jobs", json=NEW_JOB_REQUEST
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"msg": "CREATED", "status": "queued", "job_id": JOB_ID},
+        {"msg": "FAILED", "status": "FAILED"},
+    ]
+
+
 def test_update_job_disabled_bump_rdn(client):
     response = client.post(
         "/datastores/{DATASTORE_RDN}/jobs", json=BUMP_JOB_REQUEST
@@ -9,7 +9,8 @@ from httpx import Response
 
 from datastore_api.adapter import db
 from datastore_api.common.models import Version
-from datastore_api.domain import metadata
+from datastore_api.domain import metadata, metadata_search
+from datastore_api.domain.metadata_search import SearchHit, SearchResult
 from datastore_api.main import app
 
 MOCKED_DATASTORE_VERSIONS = {
@@ -102,7 +103,7 @@ def test_get_data_store(client, mocker, mock_db_client):
             "Accept": "application/json",
         },
     )
-    spy.assert_called_with(DATASTORE_ROOT_DIR)
+    spy.assert_called_with(DATASTORE_ROOT_DIR, None, None, False)
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == MOCKED_DATASTORE_VERSIONS
 
@@ -189,6 +190,7 @@ def test_get_data_structures(client, mocker):
         Version.from_str("3.2.1.0"),
         True,
         False,
+        [],
     )
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == mocked_data_structures
@@ -239,7 +241,7 @@ def test_get_all_metadata(client, mocker):
         },
     )
     spy.assert_called_with(
-        Version.from_str("3.2.1.0"), DATASTORE_ROOT_DIR, False
+        Version.from_str("3.2.1.0"), DATASTORE_ROOT_DIR, False, []
     )
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == mocked_metadata_all
@@ -270,7 +272,7 @@ def test_get_all_metadata_long_version_numbers(client, mocker):
         },
     )
     spy.assert_called_with(
-        Version.from_str("1234.5678.9012.0"), DATASTORE_ROOT_DIR, False
+        Version.from_str("1234.5678.9012.0"), DATASTORE_ROOT_DIR, False, []
     )
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == mocked_metadata_all
@@ -291,7 +293,7 @@ def test_get_all_metadata_skip_code_lists(client, mocker):
         },
     )
     spy.assert_called_with(
-        Version.from_str("3.2.1.0"), DATASTORE_ROOT_DIR, True
+        Version.from_str("3.2.1.0"), DATASTORE_ROOT_DIR, True, []
     )
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == mocked_metadata_all
@@ -317,6 +319,110 @@ def test_get_data_structures_skip_code_lists(client, mocker):
         Version.from_str("3.2.1.0"),
         True,
         True,
+        [],
     )
     assert response.headers["Content-Type"] == "application/json"
     assert response.json() == mocked_data_structures
+
+
+def test_get_data_structures_with_fields(client, mocker):
+    spy = mocker.patch.object(
+        metadata, "find_data_structures", return_value=[{"name": "FNR"}]
+    )
+    response: Response = client.get(
+        "/datastores/no.ssb.test/metadata/data-structures?version=3.2.1.0&fields=name,measureVariable.label",
+    )
+    spy.assert_called_with(
+        DATASTORE_ROOT_DIR,
+        [],
+        Version.from_str("3.2.1.0"),
+        True,
+        False,
+        ["name", "measureVariable.label"],
+    )
+    assert response.json() == [{"name": "FNR"}]
+
+
+def test_get_code_list(client, mocker):
+    mocked_code_list = {
+        "dataStructure": "TEST_PERSON_PETS",
+        "variable": "TEST_PERSON_PETS",
+        "representedVariables": [],
+    }
+    spy = mocker.patch.object(
+        metadata, "find_code_list", return_value=mocked_code_list
+    )
+    response: Response = client.get(
+        "/datastores/no.ssb.test/metadata/data-structures/TEST_PERSON_PETS"
+        "/variables/TEST_PERSON_PETS/code-list"
+        "?version=1.0.0.0&codes=CAT,DOG&search=katt",
+    )
+    spy.assert_called_with(
+        DATASTORE_ROOT_DIR,
+        Version.from_str("1.0.0.0"),
+        "TEST_PERSON_PETS",
+        "TEST_PERSON_PETS",
+        ["CAT", "DOG"],
+        "katt",
+    )
+    assert response.status_code == 200
+    assert response.json() == mocked_code_list
+
+
+def test_get_metadata_diff(client, mocker):
+    mocked_diff = {
+        "fromVersion": "1.0.0.0",
+        "toVersion": "2.0.0.0",
+        "added": [],
+        "removed": [],
+        "changed": [],
+    }
+    spy = mocker.patch.object(
+        metadata, "find_metadata_diff", return_value=mocked_diff
+    )
+    response: Response = client.get(
+        "/datastores/no.ssb.test/metadata/diff?from=1.0.0.0&to=2.0.0.0"
+    )
+    spy.assert_called_with(
+        DATASTORE_ROOT_DIR,
+        Version.from_str("1.0.0.0"),
+        Version.from_str("2.0.0.0"),
+    )
+    assert response.status_code == 200
+    assert response.json() == mocked_diff
+
+
+def test_search_metadata(client, mocker):
+    mocked_result = SearchResult(
+        total=1,
+        hits=[SearchHit(data_structure="TEST_PERSON_PETS", score=5.0)],
+    )
+    spy = mocker.patch.object(
+        metadata_search, "search", return_value=mocked_result
+    )
+    response: Response = client.get(
+        "/datastores/no.ssb.test/metadata/search"
+        "?q=pets&version=1.0.0.0&limit=10&offset=5"
+    )
+    spy.assert_called_with(
+        DATASTORE_ROOT_DIR, Version.from_str("1.0.0.0"), "pets", 10, 5
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 1,
+        "hits": [{"dataStructure": "TEST_PERSON_PETS", "score": 5.0}],
+    }
+
+
+def test_get_data_store_paginated(client, mocker):
+    spy = mocker.patch.object(
+        metadata,
+        "find_all_datastore_versions",
+        return_value=MOCKED_DATASTORE_VERSIONS,
+    )
+    response: Response = client.get(
+        "/datastores/no.ssb.test/metadata/data-store"
+        "?limit=5&cursor=2.0.0.0&summary=true"
+    )
+    spy.assert_called_with(DATASTORE_ROOT_DIR, 5, "2.0.0.0", True)
+    assert response.status_code == 200
@@ -0,0 +1,77 @@
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from datastore_api.adapter import db
+from datastore_api.adapter.auth.dependencies import authorize_api_key
+from datastore_api.adapter.db.models import Changes, JobEvent
+from datastore_api.main import app
+
+CHANGES = Changes(
+    job_logs=[
+        JobEvent(
+            log_id=5,
+            at="2022-05-18T11:40:22.519222",
+            message="started",
+            job_id="2",
+            datastore_rdn="no.dev.test",
+        )
+    ],
+    cursor=12,
+    has_more=False,
+)
+
+
+@pytest.fixture
+def mock_db_client():
+    mock = Mock()
+    mock.get_changes.return_value = CHANGES
+    return mock
+
+
+@pytest.fixture
+def mock_api_key():
+    return Mock(return_value=None)
+
+
+@pytest.fixture
+def client(mock_db_client, mock_api_key):
+    app.dependency_overrides[db.get_database_client] = lambda: mock_db_client
+    app.dependency_overrides[authorize_api_key] = lambda: mock_api_key()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_get_changes(client, mock_db_client, mock_api_key):
+    response = client.get("/changes?cursor=10&limit=50")
+    assert response.status_code == 200
+    mock_api_key.assert_called_once()
+    mock_db_client.get_changes.assert_called_once_with(10, 50)
+    assert response.json() == {
+        "jobs": [],
+        "jobLogs": [
+            {
+                "at": "2022-05-18T11:40:22.519222",
+                "message": "started",
+                "logId": 5,
+                "jobId": "2",
+                "datastoreRdn": "no.dev.test",
+            }
+        ],
+        "targets": [],
+        "archivedJobIds": [],
+        "cursor": 12,
+        "hasMore": False,
+    }
+
+
+def test_get_changes_defaults(client, mock_db_client):
+    client.get("/changes")
+    mock_db_client.get_changes.assert_called_once_with(0, 100)
+
+
+def test_get_changes_invalid_limit(client, mock_db_client):
+    response = client.get("/changes?limit=0")
+    assert response.status_code == 400
+    mock_db_client.get_changes.assert_not_called()
@@ -102,7 +102,8 @@ def test_get_datastore_directory(client):
     assert response.json() == DATASTORE.directory
 
 
-def test_delete_datastore(client, mock_auth_deps):
+def test_delete_datastore(client, mock_db_client, mock_auth_deps):
     response = client.delete("/datastores/no.dev.test")
     mock_auth_deps["datastore_provisioner"].assert_called_once()
     assert response.status_code == 200
+    mock_db_client.delete_datastore.assert_called_once_with(1)
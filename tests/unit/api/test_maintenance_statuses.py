@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from datastore_api.adapter import db
+from datastore_api.adapter.db.models import MaintenanceStatus
 from datastore_api.main import app
 
 MAINTENANCE_STATUS_REQUEST_VALID = {"msg": "we upgrade chill", "paused": True}
@@ -96,3 +97,23 @@ def test_get_maintenance_history(client, mock_db_client):
     mock_db_client.get_maintenance_history.assert_called_once()
     assert response.status_code == 200
     assert response.json() == RESPONSE_FROM_DB
+
+
+def test_get_maintenance_history_paginated(client, mock_db_client):
+    mock_db_client.get_maintenance_history.return_value = [
+        MaintenanceStatus(maintenance_id=maintenance_id, **status)
+        for maintenance_id, status in zip([3, 2, 1], RESPONSE_FROM_DB)
+    ]
+    response = client.get("/maintenance-statuses?limit=2&cursor=4")
+    mock_db_client.get_maintenance_history.assert_called_once_with(
+        limit=3, before_maintenance_id="4"
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Next-Cursor"] == "2"
+    assert response.json() == RESPONSE_FROM_DB[:2]
+
+
+def test_get_maintenance_history_invalid_cursor(client, mock_db_client):
+    response = client.get("/maintenance-statuses?cursor=abc")
+    mock_db_client.get_maintenance_history.assert_not_called()
+    assert response.status_code == 400
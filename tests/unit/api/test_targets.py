@@ -108,7 +108,13 @@ def test_get_target(client, mock_db_client, mock_auth_deps):
     mock_auth_deps["data_administrator"].assert_called_once()
     mock_db_client.get_jobs_for_target.assert_called_once()
     mock_db_client.get_jobs_for_target.assert_called_with(
-        name="MY_DATASET", datastore_id=1
+        name="MY_DATASET",
+        datastore_id=1,
+        limit=None,
+        after_job_id=None,
+        newest_first=False,
+        include_logs=False,
+        include_bump_manifestos=False,
     )
 
     assert response.status_code == 200
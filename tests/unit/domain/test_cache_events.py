@@ -0,0 +1,75 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from datastore_api.adapter.db.models import Job, JobParameters, UserInfo
+from datastore_api.adapter.local_storage.generation_counter import (
+    GenerationCounter,
+)
+from datastore_api.domain import cache_events, warmup
+
+DATASTORE_ROOT_DIR = Path("tests/resources/test_datastore")
+
+
+def _job(operation: str) -> Job:
+    return Job(
+        job_id="123",
+        status="completed",
+        parameters=JobParameters.model_validate(
+            {"target": "MY_DATASET", "operation": operation}
+        ),
+        created_at="2022-05-18T11:40:22.519222",
+        created_by=UserInfo(
+            user_id="123", first_name="Data", last_name="Admin"
+        ),
+        datastore_rdn="no.dev.test",
+    )
+
+
+@pytest.fixture
+def generations(tmp_path, mocker):
+    counter = GenerationCounter(tmp_path / "generations")
+    mocker.patch.object(cache_events, "datastore_generations", counter)
+    mocker.patch.object(cache_events, "_seen_generations", {})
+    return counter
+
+
+@pytest.fixture
+def preload_executor(mocker):
+    executor = Mock()
+    mocker.patch.object(cache_events, "_preload_executor", executor)
+    return executor
+
+
+def test_generation_counter(tmp_path):
+    counter = GenerationCounter(tmp_path / "generations")
+    assert counter.get("no.dev.test") == 0
+    assert counter.increment("no.dev.test") == 1
+    assert counter.increment("no.dev.test") == 2
+    assert counter.get("no.dev.test") == 2
+    assert counter.get("no.dev.other") == 0
+
+
+def test_on_job_completed_only_preloads_after_bump(
+    generations, preload_executor
+):
+    cache_events.on_job_completed(_job("ADD"), DATASTORE_ROOT_DIR)
+    preload_executor.submit.assert_not_called()
+    assert generations.get(DATASTORE_ROOT_DIR.name) == 1
+
+    cache_events.on_job_completed(_job("PATCH_METADATA"), DATASTORE_ROOT_DIR)
+    preload_executor.submit.assert_not_called()
+
+
+def test_refresh_if_changed_in_other_worker(generations, preload_executor):
+    cache_events.refresh_if_changed(DATASTORE_ROOT_DIR)
+    cache_events.refresh_if_changed(DATASTORE_ROOT_DIR)
+    preload_executor.submit.assert_not_called()
+
+    generations.increment(DATASTORE_ROOT_DIR.name)
+    cache_events.refresh_if_changed(DATASTORE_ROOT_DIR)
+    cache_events.refresh_if_changed(DATASTORE_ROOT_DIR)
+    preload_executor.submit.assert_called_once_with(
+        warmup.preload_latest_version, DATASTORE_ROOT_DIR
+    )
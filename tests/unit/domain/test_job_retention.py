@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from datastore_api.domain import job_retention
+
+
+def test_archive_old_jobs_in_batches(monkeypatch):
+    monkeypatch.setattr(job_retention, "ARCHIVE_BATCH_SIZE", 2)
+    database_client = Mock()
+    database_client.archive_jobs.side_effect = [2, 2, 1]
+    assert job_retention.archive_old_jobs(database_client, 30) == 5
+    assert database_client.archive_jobs.call_count == 3
+    created_before, limit = database_client.archive_jobs.call_args.args
+    assert limit == 2
+    assert (
+        datetime.now() - timedelta(days=31)
+        < created_before
+        < datetime.now() - timedelta(days=29)
+    )
+    database_client.compact.assert_called_once()
+
+
+def test_archive_old_jobs_nothing_to_archive():
+    database_client = Mock()
+    database_client.archive_jobs.return_value = 0
+    assert job_retention.archive_old_jobs(database_client, 30) == 0
+    database_client.archive_jobs.assert_called_once()
+    database_client.compact.assert_not_called()
+
+
+def test_only_one_scheduler_archives(tmp_path):
+    lock_path = tmp_path / "job_retention.lock"
+    first = job_retention.JobRetentionScheduler(Mock(), 30, 3600, lock_path)
+    second = job_retention.JobRetentionScheduler(Mock(), 30, 3600, lock_path)
+    try:
+        assert first._acquire_lock()
+        assert not second._acquire_lock()
+        first.stop()
+        assert second._acquire_lock()
+    finally:
+        first.stop()
+        second.stop()
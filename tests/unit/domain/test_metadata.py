@@ -6,9 +6,12 @@ from typing import List
 import pytest
 
 from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
 from datastore_api.common.exceptions import (
     InvalidDraftVersionException,
     InvalidStorageFormatException,
+    NotFoundException,
+    RequestValidationException,
 )
 from datastore_api.common.models import Version
 from datastore_api.domain import metadata
@@ -80,16 +83,20 @@ def test_find_two_data_structures_without_attrs(mocker):
     assert len(actual) == 2
     income = next(
         data_structure
-        for data_structure in mocked_metadata_all["dataStructures"]
+        for data_structure in actual
         if data_structure["name"] == "TEST_PERSON_INCOME"
     )
     assert "attributeVariables" not in income
     pets = next(
         data_structure
-        for data_structure in mocked_metadata_all["dataStructures"]
+        for data_structure in actual
         if data_structure["name"] == "TEST_PERSON_PETS"
     )
     assert "attributeVariables" not in pets
+    assert all(
+        "attributeVariables" in data_structure
+        for data_structure in mocked_metadata_all["dataStructures"]
+    )
 
 
 def test_find_data_structures_no_name_filter(mocker):
@@ -110,6 +117,73 @@ def test_find_data_structures_no_name_filter(mocker):
     assert len(actual) == 2
 
 
+def test_find_data_structures_with_fields(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    get_metadata_all = mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+    for _ in range(2):
+        actual = metadata.find_data_structures(
+            DATASTORE_ROOT_DIR,
+            ["TEST_PERSON_PETS"],
+            Version.from_str("1.0.0.0"),
+            True,
+            skip_code_lists=False,
+            fields=["populationDescription", "measureVariable.label"],
+        )
+        assert actual == [
+            {
+                "populationDescription": "Alle personer som eier et kjæledyr.",
+                "measureVariable": {"label": "Kjæledyr"},
+            }
+        ]
+    get_metadata_all.assert_called_once()
+
+
+def test_find_all_metadata_with_fields(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+    actual = metadata.find_all_metadata(
+        Version.from_str("1.0.0.0"),
+        DATASTORE_ROOT_DIR,
+        fields=["name"],
+    )
+    assert actual["dataStore"] == mocked_metadata_all["dataStore"]
+    assert actual["dataStructures"] == [
+        {"name": "TEST_PERSON_INCOME"},
+        {"name": "TEST_PERSON_PETS"},
+    ]
+
+
+def test_projections_stay_within_cache_budget(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+    mocker.patch.object(metadata_cache, "max_bytes", 2000)
+    version = Version.from_str("1.0.0.0")
+    metadata_cache.pin(DATASTORE_ROOT_DIR, version)
+    for i in range(300):
+        metadata.find_all_metadata(
+            version, DATASTORE_ROOT_DIR, fields=["name", f"x{i}"]
+        )
+    stats = metadata_cache.stats()
+    assert stats.pinned_entries == 0
+    assert stats.current_bytes <= 2000
+    assert stats.evictions > 0
+
+
 def test_find_current_data_structure_status(mocker):
     with open(DATASTORE_VERSIONS_FILE_PATH, encoding="utf-8") as f:
         mocked_datastore_versions = json.load(f)
@@ -270,6 +344,8 @@ def test_get_metadata_all_skip_code_list_and_missing_values(mocker):
     with open(METADATA_ALL_NO_CODE_LIST_FILE_PATH, encoding="utf-8") as f:
         metadata_no_code_list = json.load(f)
     assert metadata_no_code_list == filtered_metadata
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        assert mocked_metadata_all == json.load(f)
 
 
 def test_find_all_metadata_skip_code_list_and_missing_values_invalid_model(
@@ -379,3 +455,143 @@ def _assert_code_list_and_missing_values(metadata_all):
             for variable in represented_variables
         ]
     )
+
+
+def test_find_code_list(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    get_metadata_all = mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+    for _ in range(2):
+        actual = metadata.find_code_list(
+            DATASTORE_ROOT_DIR,
+            Version.from_str("1.0.0.0"),
+            "TEST_PERSON_PETS",
+            "TEST_PERSON_PETS",
+            codes=["CAT", "DOG", "FISH"],
+            search="k",
+        )
+    get_metadata_all.assert_called_once()
+    assert actual["dataStructure"] == "TEST_PERSON_PETS"
+    assert actual["variable"] == "TEST_PERSON_PETS"
+    assert len(actual["representedVariables"]) == 1
+    assert actual["representedVariables"][0]["codeList"] == [
+        {"category": "Katt", "code": "CAT"},
+        {"category": "Fisk", "code": "FISH"},
+    ]
+    assert actual["representedVariables"][0]["missingValues"] == []
+
+
+def test_find_code_list_no_such_variable(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+    with pytest.raises(NotFoundException):
+        metadata.find_code_list(
+            DATASTORE_ROOT_DIR,
+            Version.from_str("1.0.0.0"),
+            "TEST_PERSON_PETS",
+            "NO_SUCH_VARIABLE",
+        )
+
+
+def test_find_metadata_diff(mocker, tmp_path):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        from_metadata_all = json.load(f)
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        to_metadata_all = json.load(f)
+    income, pets = to_metadata_all["dataStructures"]
+    to_metadata_all["dataStructures"] = [
+        {**income, "name": "TEST_PERSON_SAVINGS"},
+        pets,
+    ]
+    pets["populationDescription"] = "Alle personer med kjæledyr."
+    code_list = pets["measureVariable"]["representedVariables"][0][
+        "valueDomain"
+    ]["codeList"]
+    code_list[0]["category"] = "Katt eller kattunge"
+    code_list.pop()
+    code_list.append({"category": "Slange", "code": "SNAKE"})
+    get_metadata_all = mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        side_effect=[from_metadata_all, to_metadata_all],
+    )
+    for _ in range(2):
+        actual = metadata.find_metadata_diff(
+            tmp_path, Version.from_str("1.0.0.0"), Version.from_str("2.0.0.0")
+        )
+        assert actual == {
+            "fromVersion": "1.0.0.0",
+            "toVersion": "2.0.0.0",
+            "added": ["TEST_PERSON_SAVINGS"],
+            "removed": ["TEST_PERSON_INCOME"],
+            "changed": [
+                {
+                    "name": "TEST_PERSON_PETS",
+                    "changedFields": ["populationDescription"],
+                    "variables": [
+                        {
+                            "name": "TEST_PERSON_PETS",
+                            "change": "CHANGED",
+                            "changedFields": ["representedVariables"],
+                            "codeList": {
+                                "added": ["SNAKE"],
+                                "removed": ["HAMSTER"],
+                                "changed": ["CAT"],
+                            },
+                        }
+                    ],
+                }
+            ],
+        }
+    assert get_metadata_all.call_count == 2
+    assert (
+        tmp_path / "datastore/.cache/metadata_diff__1_0_0__2_0_0.json"
+    ).exists()
+
+
+def test_find_all_datastore_versions_paginated(mocker):
+    with open(DATASTORE_VERSIONS_FILE_PATH, encoding="utf-8") as f:
+        mocked_datastore_versions = json.load(f)
+    with open(DRAFT_VERSION_FILE_PATH, encoding="utf-8") as f:
+        mocked_draft_version = json.load(f)
+    mocker.patch.object(
+        datastore_directory,
+        "get_datastore_versions",
+        return_value=mocked_datastore_versions,
+    )
+    mocker.patch.object(
+        datastore_directory,
+        "get_draft_version",
+        return_value=mocked_draft_version,
+    )
+    first_page = metadata.find_all_datastore_versions(
+        DATASTORE_ROOT_DIR, limit=2, summary=True
+    )
+    assert [v["version"] for v in first_page["versions"]] == [
+        "0.0.0.1608000000",
+        "2.0.0.0",
+    ]
+    assert first_page["nextCursor"] == "2.0.0.0"
+    assert all("dataStructureUpdates" not in v for v in first_page["versions"])
+
+    last_page = metadata.find_all_datastore_versions(
+        DATASTORE_ROOT_DIR, limit=2, cursor=first_page["nextCursor"]
+    )
+    assert [v["version"] for v in last_page["versions"]] == ["1.0.0.0"]
+    assert "nextCursor" not in last_page
+    assert "dataStructureUpdates" in last_page["versions"][0]
+    assert len(mocked_datastore_versions["versions"]) == 2
+
+    with pytest.raises(RequestValidationException):
+        metadata.find_all_datastore_versions(
+            DATASTORE_ROOT_DIR, cursor="9.9.9.9"
+        )
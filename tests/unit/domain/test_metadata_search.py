@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from datastore_api.adapter.local_storage import datastore_directory
+from datastore_api.common.models import Version
+from datastore_api.domain import metadata_search
+
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+DATASTORE_ROOT_DIR = Path("tests/resources/test_datastore")
+VERSION = Version.from_str("1.0.0.0")
+
+
+@pytest.fixture
+def metadata_all(mocker, empty_metadata_cache):
+    with open(METADATA_ALL_FILE_PATH, encoding="utf-8") as f:
+        mocked_metadata_all = json.load(f)
+    return mocker.patch.object(
+        datastore_directory,
+        "get_metadata_all",
+        return_value=mocked_metadata_all,
+    )
+
+
+def _hits(result: metadata_search.SearchResult) -> list[tuple]:
+    return [(hit.data_structure, hit.variable) for hit in result.hits]
+
+
+def test_search_ranks_name_matches_first(metadata_all):
+    result = metadata_search.search(DATASTORE_ROOT_DIR, VERSION, "pets", 20, 0)
+    assert _hits(result) == [
+        ("TEST_PERSON_PETS", None),
+        ("TEST_PERSON_PETS", "TEST_PERSON_PETS"),
+    ]
+
+
+def test_search_code_list_categories_and_prefix(metadata_all):
+    result = metadata_search.search(DATASTORE_ROOT_DIR, VERSION, "hams", 20, 0)
+    assert _hits(result) == [("TEST_PERSON_PETS", "TEST_PERSON_PETS")]
+
+
+def test_search_requires_all_terms(metadata_all):
+    result = metadata_search.search(
+        DATASTORE_ROOT_DIR, VERSION, "kjæledyr katt", 20, 0
+    )
+    assert _hits(result) == [("TEST_PERSON_PETS", "TEST_PERSON_PETS")]
+    result = metadata_search.search(
+        DATASTORE_ROOT_DIR, VERSION, "kjæledyr inntekt", 20, 0
+    )
+    assert result.total == 0
+
+
+def test_search_paging_and_cached_index(metadata_all):
+    everything = metadata_search.search(
+        DATASTORE_ROOT_DIR, VERSION, "person", 100, 0
+    )
+    page = metadata_search.search(DATASTORE_ROOT_DIR, VERSION, "person", 2, 1)
+    assert page.total == everything.total
+    assert page.hits == everything.hits[1:3]
+    metadata_all.assert_called_once()
+
+
+def test_search_without_terms(metadata_all):
+    result = metadata_search.search(DATASTORE_ROOT_DIR, VERSION, "!?", 20, 0)
+    assert result.total == 0
+    assert result.hits == []
@@ -0,0 +1,77 @@
+import pytest
+
+from datastore_api.common.exceptions import RequestValidationException
+from datastore_api.domain import projection
+
+DATA_STRUCTURE = {
+    "name": "TEST_PERSON_PETS",
+    "populationDescription": "Alle personer med kjæledyr.",
+    "measureVariable": {
+        "name": "TEST_PERSON_PETS",
+        "label": "Kjæledyr",
+        "representedVariables": [
+            {
+                "description": "Kjæledyr",
+                "valueDomain": {
+                    "codeList": [{"category": "Katt", "code": "CAT"}],
+                    "missingValues": [],
+                },
+            },
+            {"description": "Kjæledyr uten kodeliste"},
+        ],
+    },
+}
+
+
+def test_normalize_fields():
+    assert projection.normalize_fields([" name", "label", "name"]) == (
+        "label",
+        "name",
+    )
+
+
+@pytest.mark.parametrize(
+    "field", ["", "name.", ".name", "measure Variable", "name,label"]
+)
+def test_normalize_fields_invalid(field):
+    with pytest.raises(RequestValidationException):
+        projection.normalize_fields([field])
+
+
+def test_build_field_tree_shorter_path_wins():
+    assert projection.build_field_tree(
+        ("measureVariable", "measureVariable.label", "name")
+    ) == {"measureVariable": {}, "name": {}}
+    assert projection.build_field_tree(
+        ("measureVariable.label", "measureVariable.name")
+    ) == {"measureVariable": {"label": {}, "name": {}}}
+
+
+def test_project():
+    field_tree = projection.build_field_tree(
+        (
+            "name",
+            "measureVariable.label",
+            "measureVariable.representedVariables.valueDomain.codeList",
+            "name.nested",
+            "noSuchField",
+        )
+    )
+    assert projection.project(DATA_STRUCTURE, field_tree) == {
+        "name": "TEST_PERSON_PETS",
+        "measureVariable": {
+            "label": "Kjæledyr",
+            "representedVariables": [
+                {
+                    "valueDomain": {
+                        "codeList": [{"category": "Katt", "code": "CAT"}]
+                    }
+                },
+                {},
+            ],
+        },
+    }
+
+
+def test_project_empty_tree_returns_value():
+    assert projection.project(DATA_STRUCTURE, {}) is DATA_STRUCTURE
@@ -0,0 +1,62 @@
+import gc
+import shutil
+from pathlib import Path
+
+import pytest
+
+from datastore_api.adapter.local_storage.metadata_cache import metadata_cache
+from datastore_api.common.models import Version
+from datastore_api.domain import data, warmup
+from datastore_api.domain.warmup import WarmupState, WarmupStatus
+
+METADATA_ALL_FILE_PATH = "tests/resources/fixtures/domain/metadata_all.json"
+TEST_DATASTORE_DIR = Path("tests/resources/test_datastore")
+
+
+@pytest.fixture
+def datastore_root_dir(tmp_path, empty_metadata_cache):
+    datastore_dir = tmp_path / "no.ssb.test" / "datastore"
+    shutil.copytree(TEST_DATASTORE_DIR / "datastore", datastore_dir)
+    shutil.copy(
+        METADATA_ALL_FILE_PATH, datastore_dir / "metadata_all__2_0_0.json"
+    )
+    shutil.copy(
+        datastore_dir / "data_versions__1_0.json",
+        datastore_dir / "data_versions__2_0.json",
+    )
+    yield tmp_path / "no.ssb.test"
+    gc.unfreeze()
+    warmup._set_warmup_status(WarmupStatus(state=WarmupState.DISABLED))
+
+
+def test_warm_up_datastores(datastore_root_dir, tmp_path):
+    status = warmup.warm_up_datastores(
+        [datastore_root_dir, tmp_path / "no.ssb.missing"]
+    )
+    assert status.state == WarmupState.COMPLETE
+    assert status.warmed_datastores == ["no.ssb.test"]
+    assert status.failed_datastores == ["no.ssb.missing"]
+    assert warmup.get_warmup_status() == status
+    cache_stats = metadata_cache.stats()
+    assert cache_stats.entries == 2
+    assert cache_stats.pinned_entries == 2
+
+
+def test_warmup_status_endpoint(test_app, datastore_root_dir):
+    warmup.warm_up_datastores([datastore_root_dir])
+    response = test_app.get("/health/warmup")
+    assert response.json()["state"] == "COMPLETE"
+    assert response.json()["warmedDatastores"] == ["no.ssb.test"]
+    assert test_app.get("/health/ready").status_code == 200
+
+
+def test_preload_latest_version(datastore_root_dir):
+    shutil.copytree(TEST_DATASTORE_DIR / "data", datastore_root_dir / "data")
+    warmup.preload_latest_version(datastore_root_dir)
+    # metadata, data versions and the two datasets with data files
+    assert metadata_cache.stats().entries == 4
+    misses = metadata_cache.stats().misses
+    data.get_dataset(
+        "TEST_PERSON_INCOME", Version.from_str("2.0.0.0"), datastore_root_dir
+    )
+    assert metadata_cache.stats().misses == misses